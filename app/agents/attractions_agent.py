@@ -1,11 +1,26 @@
 # app/agents/attractions_agent.py
+import asyncio
+import contextvars
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
-from app.llm.client import call_llm
-from app.llm.utils import load_prompt
+from app import tracing
+from app.llm.client import call_llm, call_llm_async
+from app.llm.messages import prefixed
+from app.llm.utils import Prompt, load_prompt
+from app.models.agent_response import AgentResponse
 from app.tools.geoapify_client import GeoapifyClient
+from app.ranking.attractions_ranker import (
+    AttractionsRanker,
+    RankedPlace,
+    RankingAccumulator,
+    place_key,
+    popularity_from_properties,
+)
+from app.tools.poi_index import PlaceIndex
+from app.taxonomy import PREFERENCE_CATEGORIES, categories_for
 
 
 # ======================================================
@@ -41,16 +56,19 @@ class AttractionsAgentOutput:
 # Preference → Geoapify category mapping
 # ======================================================
 
-CATEGORY_MAP = {
-    "food": "catering.restaurant",
-    "culture": "entertainment.culture",
-    "museum": "entertainment.museum",
-    "art": "entertainment.culture.gallery",
-    "park": "leisure.park",
-    "nature": "natural",
-    "history": "tourism.attraction",
-    "sightseeing": "tourism.sights",
-}
+# Kept for callers of the old name; resolution goes through app.taxonomy
+CATEGORY_MAP = PREFERENCE_CATEGORIES
+
+# How many places a recommendation shows / the fused prompt may choose from
+MAX_RECOMMENDATIONS = 5
+FUSED_CANDIDATES = 10
+
+# Places fetched per category (batched mode) / in total (single query)
+PER_CATEGORY_LIMIT = 15
+SINGLE_QUERY_LIMIT = 15
+
+# Per-category queries in sync mode run on this pool
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="attractions")
 
 # ======================================================
 # Agent implementation
@@ -59,81 +77,350 @@ CATEGORY_MAP = {
 class AttractionsAgent:
     """
     Suggests and ranks nearby attractions based on user preferences
-    and location. Uses Geoapify for raw places and an LLM for
-    clarification, ranking, and explanation.
+    and location. Uses Geoapify for raw places, a local scoring engine
+    for ranking, and an LLM for clarification (and, with
+    llm_reasons=True, for the per-place reason text).
+
+    With batched=True (default) every preference category is queried
+    separately and concurrently, each with its own limit, so a dense
+    category cannot crowd out the others. Results are deduped and fed
+    to the ranker as each category arrives.
+
+    geo_client / place_index can be injected so that several agents
+    (or orchestrators) share one client and tile index.
     """
 
-    def __init__(self):
-        self.prompt = load_prompt("prompts/attractions_agent.yaml")
-        self.geo_client = GeoapifyClient()
+    def __init__(
+        self,
+        ranker: Optional[AttractionsRanker] = None,
+        llm_reasons: bool = False,
+        batched: bool = True,
+        geo_client: Optional[GeoapifyClient] = None,
+        place_index: Optional[PlaceIndex] = None,
+    ):
+        self.ranker = ranker or AttractionsRanker()
+        self.llm_reasons = llm_reasons
+        self.batched = batched
+        self.geo_client = geo_client or GeoapifyClient()
+        self.place_index = place_index or PlaceIndex(self.geo_client)
+
+    # Prompts are resolved per call: load_prompt re-reads a file only
+    # after it changes, so edits apply to a running (shared) agent
+
+    @property
+    def prompt(self) -> Prompt:
+        return load_prompt("prompts/attractions_agent.yaml")
+
+    @property
+    def fused_prompt(self) -> Prompt:
+        return load_prompt("prompts/attractions_fused.yaml")
+
+    @property
+    def reasons_prompt(self) -> Prompt:
+        return load_prompt("prompts/attraction_reasons.yaml")
 
     def run(self, input: AttractionsAgentInput) -> AttractionsAgentOutput:
-        # --------------------------------------------------
-        # Basic validation
-        # --------------------------------------------------
-        if not input.city or input.lat is None or input.lon is None:
-            raise ValueError("AttractionsAgentInput missing city or coordinates")
+        normalized_prefs = self._validate(input)
 
         # --------------------------------------------------
         # Clarification FIRST (no API calls)
         # --------------------------------------------------
-        if not input.preferences:
+        if not normalized_prefs:
             return self._ask_for_clarification(input)
 
-        # Normalize preferences (lowercase, strip)
-        normalized_prefs = [
-            p.lower().strip() for p in input.preferences if p.strip()
-        ]
+        # --------------------------------------------------
+        # Fetch nearby places, ranked locally as they arrive
+        # --------------------------------------------------
+        with tracing.span("attractions.fetch_places", batched=self.batched) as span:
+            ranking = self._accumulator(input, normalized_prefs, MAX_RECOMMENDATIONS)
+            for batch in self._place_batches(input, normalized_prefs):
+                ranking.add(batch)
+            span.set(places=ranking.count)
 
-        if not normalized_prefs:
-            return self._ask_for_clarification(input)
+        if not ranking.count:
+            return self._empty_output()
 
         # --------------------------------------------------
-        # Fetch nearby places (Geoapify)
+        # Optional LLM reasons
         # --------------------------------------------------
-        places = self._fetch_places(
+        ranked = ranking.results()
+        output = self._output_from_ranking(ranked)
+
+        if self.llm_reasons and output.attractions:
+            with tracing.span("attractions.reasons"):
+                raw_response = call_llm(
+                    messages=prefixed(self.reasons_prompt, self._reasons_prompt(normalized_prefs, ranked)),
+                )
+                self._apply_reasons(output, raw_response)
+
+        return output
+
+    async def run_async(self, input: AttractionsAgentInput) -> AttractionsAgentOutput:
+        """
+        Async counterpart of run(): same stages, non-blocking I/O.
+        """
+        normalized_prefs = self._validate(input)
+
+        if not normalized_prefs:
+            return await self._ask_for_clarification_async(input)
+
+        with tracing.span("attractions.fetch_places", batched=self.batched) as span:
+            ranking = self._accumulator(input, normalized_prefs, MAX_RECOMMENDATIONS)
+            async for batch in self._place_batches_async(input, normalized_prefs):
+                ranking.add(batch)
+            span.set(places=ranking.count)
+
+        if not ranking.count:
+            return self._empty_output()
+
+        ranked = ranking.results()
+        output = self._output_from_ranking(ranked)
+
+        if self.llm_reasons and output.attractions:
+            with tracing.span("attractions.reasons"):
+                raw_response = await call_llm_async(
+                    messages=prefixed(self.reasons_prompt, self._reasons_prompt(normalized_prefs, ranked)),
+                )
+                self._apply_reasons(output, raw_response)
+
+        return output
+
+    async def prefetch_async(self, input: AttractionsAgentInput) -> None:
+        """
+        Fetch the places run_async(input) would fetch, without ranking.
+        Used for speculative prefetch: the response lands in the Geoapify
+        cache, so the later run_async call does not wait on the network.
+        """
+        normalized_prefs = self._validate(input)
+        if not normalized_prefs:
+            return
+
+        async for _ in self._place_batches_async(input, normalized_prefs):
+            pass
+
+    # ======================================================
+    # Fused mode (ranking + user-facing reply in one call)
+    # ======================================================
+
+    def run_fused(
+        self,
+        input: AttractionsAgentInput,
+        user_input: str,
+        context: Dict[str, Any],
+    ) -> Tuple[AttractionsAgentOutput, Optional[AgentResponse]]:
+        """
+        Like run(), but the ranking call also writes the final reply,
+        so the conversation responder can be skipped.
+
+        Returns (output, response). response is None when no ranking
+        call was made (clarification needed / no places found); the
+        caller should then phrase the output as usual.
+        """
+        normalized_prefs = self._validate(input)
+
+        if not normalized_prefs:
+            return self._ask_for_clarification(input), None
+
+        # Only the best local candidates go into the prompt
+        with tracing.span("attractions.fetch_places", batched=self.batched) as span:
+            ranking = self._accumulator(input, normalized_prefs, FUSED_CANDIDATES)
+            for batch in self._place_batches(input, normalized_prefs):
+                ranking.add(batch)
+            span.set(places=ranking.count)
+
+        if not ranking.count:
+            return self._empty_output(), None
+
+        places = [r.place for r in ranking.results()]
+
+        with tracing.span("attractions.rank", fused=True):
+            raw_response = call_llm(
+                messages=prefixed(
+                    self.fused_prompt,
+                    self._fused_prompt(input, normalized_prefs, places, user_input, context),
+                ),
+            )
+            return self._parse_fused(raw_response)
+
+    async def run_fused_async(
+        self,
+        input: AttractionsAgentInput,
+        user_input: str,
+        context: Dict[str, Any],
+    ) -> Tuple[AttractionsAgentOutput, Optional[AgentResponse]]:
+        """
+        Async counterpart of run_fused().
+        """
+        normalized_prefs = self._validate(input)
+
+        if not normalized_prefs:
+            return await self._ask_for_clarification_async(input), None
+
+        with tracing.span("attractions.fetch_places", batched=self.batched) as span:
+            ranking = self._accumulator(input, normalized_prefs, FUSED_CANDIDATES)
+            async for batch in self._place_batches_async(input, normalized_prefs):
+                ranking.add(batch)
+            span.set(places=ranking.count)
+
+        if not ranking.count:
+            return self._empty_output(), None
+
+        places = [r.place for r in ranking.results()]
+
+        with tracing.span("attractions.rank", fused=True):
+            raw_response = await call_llm_async(
+                messages=prefixed(
+                    self.fused_prompt,
+                    self._fused_prompt(input, normalized_prefs, places, user_input, context),
+                ),
+            )
+            return self._parse_fused(raw_response)
+
+    def _fused_prompt(
+        self,
+        input: AttractionsAgentInput,
+        preferences: List[str],
+        places: List[dict],
+        user_input: str,
+        context: Dict[str, Any],
+    ) -> str:
+        return self.fused_prompt.render(
+            "user",
+            city=input.city,
             lat=input.lat,
             lon=input.lon,
-            preferences=normalized_prefs,
+            preferences=", ".join(preferences),
             radius_km=input.radius_km,
+            places=json.dumps(places, ensure_ascii=False),
+            context=json.dumps(context, ensure_ascii=False),
+            user_message=user_input,
         )
 
-        # If nothing was found, do not waste an LLM call
-        if not places:
-            return AttractionsAgentOutput(
-                needs_clarification=False,
-                clarification_question=None,
-                attractions=[],
+    @classmethod
+    def _parse_fused(cls, raw_response: str) -> Tuple[AttractionsAgentOutput, AgentResponse]:
+        try:
+            parsed = json.loads(raw_response)
+        except json.JSONDecodeError:
+            raise ValueError(
+                f"LLM fused response is not valid JSON:\n{raw_response}"
             )
 
-        # --------------------------------------------------
-        # LLM ranking & explanation
-        # --------------------------------------------------
-        system_prompt = self.prompt["system"]
-        user_prompt = (
-            self.prompt["user"]
-            .replace("{{ city }}", input.city)
-            .replace("{{ lat }}", str(input.lat))
-            .replace("{{ lon }}", str(input.lon))
-            .replace("{{ preferences }}", ", ".join(normalized_prefs))
-            .replace("{{ radius_km }}", str(input.radius_km))
-            .replace("{{ places }}", json.dumps(places, ensure_ascii=False))
+        output = AttractionsAgentOutput(
+            needs_clarification=False,
+            clarification_question=None,
+            attractions=cls._parse_attractions(parsed.get("attractions", [])),
+        )
+        response = AgentResponse(
+            text=(parsed.get("text") or "").strip(),
+            followup_question=parsed.get("followup") or None,
+            suggested_intent=parsed.get("intent") or None,
         )
+        return output, response
 
-        raw_response = call_llm(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
+    # ======================================================
+    # Internal helpers
+    # ======================================================
+
+    def _validate(self, input: AttractionsAgentInput) -> List[str]:
+        """
+        Validate the input and return normalized preferences
+        (lowercase, stripped). An empty list means clarification is needed.
+        """
+        if not input.city or input.lat is None or input.lon is None:
+            raise ValueError("AttractionsAgentInput missing city or coordinates")
+
+        if not input.preferences:
+            return []
+
+        return [p.lower().strip() for p in input.preferences if p.strip()]
+
+    @staticmethod
+    def _empty_output() -> AttractionsAgentOutput:
+        return AttractionsAgentOutput(
+            needs_clarification=False,
+            clarification_question=None,
+            attractions=[],
+        )
+
+    def _accumulator(
+        self,
+        input: AttractionsAgentInput,
+        preferences: List[str],
+        limit: int,
+    ) -> RankingAccumulator:
+        return self.ranker.accumulator(
+            lat=input.lat,
+            lon=input.lon,
+            preferred_categories=categories_for(preferences),
+            radius_m=input.radius_km * 1000,
+            limit=limit,
         )
 
+    @staticmethod
+    def _output_from_ranking(ranked: List[RankedPlace]) -> AttractionsAgentOutput:
+        return AttractionsAgentOutput(
+            needs_clarification=False,
+            clarification_question=None,
+            attractions=[
+                AttractionItem(
+                    name=r.place["name"],
+                    category=r.matched_category or r.place["category"],
+                    reason=AttractionsAgent._default_reason(r),
+                    lat=r.place["lat"],
+                    lon=r.place["lon"],
+                )
+                for r in ranked
+            ],
+        )
+
+    @staticmethod
+    def _default_reason(ranked: RankedPlace) -> str:
+        if ranked.distance_m < 1000:
+            distance = f"{round(ranked.distance_m / 10) * 10:.0f} m"
+        else:
+            distance = f"{ranked.distance_m / 1000:.1f} km"
+
+        if ranked.matched_preference:
+            return f"Matches your interest in {ranked.matched_preference}, about {distance} away."
+        return f"A popular spot about {distance} away."
+
+    def _reasons_prompt(self, preferences: List[str], ranked: List[RankedPlace]) -> str:
+        places = [
+            {
+                "name": r.place["name"],
+                "category": r.matched_category or r.place["category"],
+                "distance_m": round(r.distance_m),
+            }
+            for r in ranked
+        ]
+        return self.reasons_prompt.render(
+            "user",
+            preferences=", ".join(preferences),
+            places=json.dumps(places, ensure_ascii=False),
+        )
+
+    @staticmethod
+    def _apply_reasons(output: AttractionsAgentOutput, raw_response: str) -> None:
+        """
+        Replace the default reasons with LLM ones. Anything malformed
+        keeps the deterministic reasons.
+        """
         try:
-            parsed = json.loads(raw_response)
-        except json.JSONDecodeError:
-            raise ValueError(
-                f"LLM response is not valid JSON:\n{raw_response}"
-            )
+            reasons = json.loads(raw_response).get("reasons")
+        except (json.JSONDecodeError, AttributeError):
+            return
+
+        if not isinstance(reasons, list) or len(reasons) != len(output.attractions):
+            return
+
+        for item, reason in zip(output.attractions, reasons):
+            if isinstance(reason, str) and reason.strip():
+                item.reason = reason.strip()
 
+    @staticmethod
+    def _parse_attractions(items: List[dict]) -> List[AttractionItem]:
         attractions: List[AttractionItem] = []
-        for item in parsed.get("attractions", []):
+        for item in items:
             try:
                 attractions.append(
                     AttractionItem(
@@ -148,15 +435,7 @@ class AttractionsAgent:
                 # Skip malformed items
                 continue
 
-        return AttractionsAgentOutput(
-            needs_clarification=parsed.get("needs_clarification", False),
-            clarification_question=parsed.get("clarification_question"),
-            attractions=attractions,
-        )
-
-    # ======================================================
-    # Internal helpers
-    # ======================================================
+        return attractions
 
     def _ask_for_clarification(
         self, input: AttractionsAgentInput
@@ -165,22 +444,32 @@ class AttractionsAgent:
         Ask a single clarification question via LLM
         (no external API calls).
         """
-        system_prompt = self.prompt["system"]
-        user_prompt = (
-            self.prompt["user"]
-            .replace("{{ city }}", input.city)
-            .replace("{{ lat }}", str(input.lat))
-            .replace("{{ lon }}", str(input.lon))
-            .replace("{{ preferences }}", "not specified")
-            .replace("{{ radius_km }}", str(input.radius_km))
-            .replace("{{ places }}", "[]")
+        raw_response = call_llm(
+            messages=prefixed(self.prompt, self._clarification_prompt(input)),
         )
+        return self._parse_clarification(raw_response)
 
-        raw_response = call_llm(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
+    async def _ask_for_clarification_async(
+        self, input: AttractionsAgentInput
+    ) -> AttractionsAgentOutput:
+        raw_response = await call_llm_async(
+            messages=prefixed(self.prompt, self._clarification_prompt(input)),
+        )
+        return self._parse_clarification(raw_response)
+
+    def _clarification_prompt(self, input: AttractionsAgentInput) -> str:
+        return self.prompt.render(
+            "user",
+            city=input.city,
+            lat=input.lat,
+            lon=input.lon,
+            preferences="not specified",
+            radius_km=input.radius_km,
+            places="[]",
         )
 
+    @staticmethod
+    def _parse_clarification(raw_response: str) -> AttractionsAgentOutput:
         try:
             parsed = json.loads(raw_response)
         except json.JSONDecodeError:
@@ -194,39 +483,130 @@ class AttractionsAgent:
             attractions=[],
         )
 
-    def _fetch_places(
+    def _place_batches(
         self,
-        lat: float,
-        lon: float,
+        input: AttractionsAgentInput,
         preferences: List[str],
-        radius_km: int,
-    ):
+    ) -> Iterator[List[dict]]:
         """
-        Adapter over GeoapifyClient.places().
-        Converts agent-level preferences into Geoapify categories
-        and normalizes the response into a simple list.
+        Yield normalized, deduped places in batches as they arrive:
+        one batch per category in batched mode, else a single batch
+        from one combined query.
         """
-        category_strings = []
-
-        for pref in preferences:
-            mapped = CATEGORY_MAP.get(pref)
-            if mapped:
-                category_strings.append(mapped)
-
-        if not category_strings:
-            return []
-
-        categories = ",".join(category_strings)
+        categories = self._categories_for(preferences)
+        if not categories:
+            return
+
+        if not self.batched:
+            yield self._query_places(categories, input, SINGLE_QUERY_LIMIT)
+            return
+
+        seen: set = set()
+        # copy_context() keeps worker-thread spans attached to the current trace
+        futures = [
+            _executor.submit(
+                contextvars.copy_context().run,
+                self._query_places, category, input, PER_CATEGORY_LIMIT,
+            )
+            for category in categories.split(",")
+        ]
+        try:
+            for future in as_completed(futures):
+                batch = self._dedupe(future.result(), seen)
+                if batch:
+                    yield batch
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def _place_batches_async(
+        self,
+        input: AttractionsAgentInput,
+        preferences: List[str],
+    ) -> AsyncIterator[List[dict]]:
+        categories = self._categories_for(preferences)
+        if not categories:
+            return
+
+        if not self.batched:
+            yield await self._query_places_async(categories, input, SINGLE_QUERY_LIMIT)
+            return
+
+        seen: set = set()
+        tasks = [
+            asyncio.ensure_future(self._query_places_async(category, input, PER_CATEGORY_LIMIT))
+            for category in categories.split(",")
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                batch = self._dedupe(await next_done, seen)
+                if batch:
+                    yield batch
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Wait for the cancelled queries to finish and retrieve every
+            # outcome, including errors of queries that failed unconsumed
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _query_places(
+        self,
+        categories: str,
+        input: AttractionsAgentInput,
+        limit: int,
+    ) -> List[dict]:
+        """
+        Adapter over the local POI tile index (backed by Geoapify).
+        Normalizes the response into a simple list.
+        """
+        raw = self.place_index.nearby(
+            categories=categories,
+            lat=input.lat,
+            lon=input.lon,
+            radius=input.radius_km * 1000,  # meters
+            limit=limit,
+            named_only=True,
+        )
+        return self._normalize_places(raw)
 
-        raw = self.geo_client.places(
+    async def _query_places_async(
+        self,
+        categories: str,
+        input: AttractionsAgentInput,
+        limit: int,
+    ) -> List[dict]:
+        raw = await self.place_index.nearby_async(
             categories=categories,
-            lat=lat,
-            lon=lon,
-            radius=radius_km * 1000,  # meters
-            limit=15,
+            lat=input.lat,
+            lon=input.lon,
+            radius=input.radius_km * 1000,  # meters
+            limit=limit,
             named_only=True,
         )
+        return self._normalize_places(raw)
+
+    @staticmethod
+    def _dedupe(places: List[dict], seen: set) -> List[dict]:
+        """
+        Drop places already seen: same place id, or, without one, same
+        name at the same coordinates (a museum and the café inside it
+        share a point but are different places).
+        """
+        unique = []
+        for place in places:
+            key = place_key(place)
+            if key in seen:
+                continue
+            seen.add(key)
+            unique.append(place)
+        return unique
+
+    @staticmethod
+    def _categories_for(preferences: List[str]) -> str:
+        return ",".join(categories_for(preferences))
 
+    @staticmethod
+    def _normalize_places(raw: dict) -> List[dict]:
         features = raw.get("features", [])
 
         normalized = []
@@ -241,7 +621,10 @@ class AttractionsAgent:
             normalized.append(
                 {
                     "name": props.get("name", "Unknown"),
+                    "place_id": props.get("place_id"),
                     "category": ", ".join(props.get("categories", [])),
+                    "categories": props.get("categories", []),
+                    "popularity": popularity_from_properties(props),
                     "lat": coords[1],
                     "lon": coords[0],
                 }
@@ -1,11 +1,18 @@
 # app/agents/wikipedia_explainer_agent.py
+import hashlib
 import json
-from dataclasses import dataclass
-from typing import List, Optional
+import os
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Union
 
-from app.llm.client import call_llm
-from app.llm.utils import load_prompt
-from app.tools.wikipedia import get_wikipedia_summary
+from app import tracing
+from app.llm.client import call_llm, call_llm_async
+from app.llm.messages import prefixed
+from app.llm.utils import Prompt, load_prompt
+from app.tools.cache import MISSING, SQLiteCache, TieredCache, TTLCache
+from app.tools.wikipedia import get_wikipedia_summary, get_wikipedia_summary_async
+
+PROMPT_PATH = "prompts/wikipedia_explainer.yaml"
 
 
 @dataclass
@@ -22,6 +29,36 @@ class WikipediaExplainerOutput:
     followup_suggestions: List[str]
 
 
+# ======================================================
+# Explanation cache
+# ======================================================
+# Explanations are content-addressed: the key hashes the prompt version,
+# title, summary text and style. The prompt is looked up on every call,
+# so editing wikipedia_explainer.yaml (or a changed Wikipedia summary)
+# never serves a stale explanation, even in a running process.
+
+_shared_cache: Optional[TieredCache] = None
+
+
+def get_explanation_cache() -> TieredCache:
+    """
+    Process-wide explanation cache.
+
+    - EXPLAINER_CACHE_SIZE: in-memory LRU size
+    - EXPLAINER_CACHE_PATH: optional SQLite file for persistence
+    """
+    global _shared_cache
+
+    if _shared_cache is None:
+        path = os.getenv("EXPLAINER_CACHE_PATH")
+        _shared_cache = TieredCache(
+            memory=TTLCache(maxsize=int(os.getenv("EXPLAINER_CACHE_SIZE", "1000"))),
+            disk=SQLiteCache(path) if path else None,
+        )
+
+    return _shared_cache
+
+
 class WikipediaExplainerAgent:
     """
     Explains a place using Wikipedia as a grounded knowledge source.
@@ -31,8 +68,14 @@ class WikipediaExplainerAgent:
     - NEVER returns str (formatting belongs to the ConversationNavigator)
     """
 
-    def __init__(self):
-        self.prompt = load_prompt("prompts/wikipedia_explainer.yaml")
+    def __init__(self, cache: Optional[TieredCache] = None):
+        self.prompt_path = PROMPT_PATH
+        self.cache = cache if cache is not None else get_explanation_cache()
+
+    @property
+    def prompt(self) -> Prompt:
+        # Resolved per call: load_prompt re-reads the file only after it changes
+        return load_prompt(self.prompt_path)
 
     # -------------------------------------------------
     # Public API (used by Orchestrator)
@@ -54,40 +97,39 @@ class WikipediaExplainerAgent:
             city=city,
         )
 
-        # If no reliable source -> return structured "not found"
-        if not isinstance(wiki_data, dict) or not wiki_data.get("found"):
-            return WikipediaExplainerOutput(
-                explanation=f"Sorry, I couldn’t find reliable information about {subject_name}.",
-                key_points=[],
-                followup_suggestions=[],
-            )
-
-        raw_summary = wiki_data.get("summary")
-        title = wiki_data.get("title") or subject_name
+        prepared = self._prepare(wiki_data, subject_name, user_style)
+        if isinstance(prepared, WikipediaExplainerOutput):
+            return prepared
 
-        if not raw_summary or not isinstance(raw_summary, str):
-            return WikipediaExplainerOutput(
-                explanation=f"Sorry, I couldn’t find reliable information about {subject_name}.",
-                key_points=[],
-                followup_suggestions=[],
-            )
+        # LLM-based explanation (grounded)
+        try:
+            return self._explain(prepared)
+        except Exception:
+            # Defensive fallback: never crash orchestrator
+            return self._format_failure(subject_name)
 
-        input_data = WikipediaExplainerInput(
-            title=title,
-            raw_summary=raw_summary,
-            user_style=user_style,
+    async def run_async(
+        self,
+        subject_name: str,
+        city: Optional[str] = None,
+        user_style: str = "friendly",
+    ) -> WikipediaExplainerOutput:
+        """
+        Async counterpart of run().
+        """
+        wiki_data = await get_wikipedia_summary_async(
+            title=subject_name,
+            city=city,
         )
 
-        # LLM-based explanation (grounded)
+        prepared = self._prepare(wiki_data, subject_name, user_style)
+        if isinstance(prepared, WikipediaExplainerOutput):
+            return prepared
+
         try:
-            return self._explain(input_data)
+            return await self._explain_async(prepared)
         except Exception:
-            # Defensive fallback: never crash orchestrator
-            return WikipediaExplainerOutput(
-                explanation=f"I found information about {subject_name}, but I couldn’t format it reliably right now.",
-                key_points=[],
-                followup_suggestions=[],
-            )
+            return self._format_failure(subject_name)
 
     # -------------------------------------------------
     # Internal helpers
@@ -109,25 +151,107 @@ class WikipediaExplainerAgent:
 
         return subject
 
+    def _prepare(
+        self,
+        wiki_data: dict,
+        subject_name: str,
+        user_style: str,
+    ) -> Union[WikipediaExplainerInput, WikipediaExplainerOutput]:
+        """
+        Validate the Wikipedia payload.
+        Returns the LLM input, or a structured "not found" output.
+        """
+        # If no reliable source -> return structured "not found"
+        if not isinstance(wiki_data, dict) or not wiki_data.get("found"):
+            return self._not_found(subject_name)
+
+        raw_summary = wiki_data.get("summary")
+        title = wiki_data.get("title") or subject_name
+
+        if not raw_summary or not isinstance(raw_summary, str):
+            return self._not_found(subject_name)
+
+        return WikipediaExplainerInput(
+            title=title,
+            raw_summary=raw_summary,
+            user_style=user_style,
+        )
+
+    @staticmethod
+    def _not_found(subject_name: str) -> WikipediaExplainerOutput:
+        return WikipediaExplainerOutput(
+            explanation=f"Sorry, I couldn’t find reliable information about {subject_name}.",
+            key_points=[],
+            followup_suggestions=[],
+        )
+
+    @staticmethod
+    def _format_failure(subject_name: str) -> WikipediaExplainerOutput:
+        return WikipediaExplainerOutput(
+            explanation=f"I found information about {subject_name}, but I couldn’t format it reliably right now.",
+            key_points=[],
+            followup_suggestions=[],
+        )
+
     def _explain(self, input: WikipediaExplainerInput) -> WikipediaExplainerOutput:
         if not input.raw_summary.strip():
             raise ValueError("Empty raw_summary")
 
-        system_prompt = self.prompt["system"]
+        with tracing.span("wikipedia_explainer.explain") as span:
+            prompt = self.prompt
+            key = self._cache_key(input, prompt)
+            cached = self.cache.get(key, namespace="explanation")
+            span.set(cache_hit=cached is not MISSING)
+            if cached is not MISSING:
+                return WikipediaExplainerOutput(**cached)
 
-        user_prompt = (
-            self.prompt["user"]
-            .replace("{{ title }}", input.title)
-            .replace("{{ raw_summary }}", input.raw_summary)
-            .replace("{{ user_style }}", input.user_style)
-        )
+            raw_response = call_llm(
+                messages=prefixed(prompt, self._explain_prompt(input, prompt)),
+                temperature=0.2,
+            )
+            output = self._parse_explanation(raw_response)
+            self.cache.set(key, asdict(output))
+            return output
+
+    async def _explain_async(self, input: WikipediaExplainerInput) -> WikipediaExplainerOutput:
+        if not input.raw_summary.strip():
+            raise ValueError("Empty raw_summary")
+
+        with tracing.span("wikipedia_explainer.explain") as span:
+            prompt = self.prompt
+            key = self._cache_key(input, prompt)
+            cached = self.cache.get(key, namespace="explanation")
+            span.set(cache_hit=cached is not MISSING)
+            if cached is not MISSING:
+                return WikipediaExplainerOutput(**cached)
+
+            raw_response = await call_llm_async(
+                messages=prefixed(prompt, self._explain_prompt(input, prompt)),
+                temperature=0.2,
+            )
+            output = self._parse_explanation(raw_response)
+            self.cache.set(key, asdict(output))
+            return output
+
+    @staticmethod
+    def _cache_key(input: WikipediaExplainerInput, prompt: Prompt) -> str:
+        digest = hashlib.sha256()
+        for part in (prompt.hash, input.title, input.raw_summary, input.user_style):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return f"explainer:{digest.hexdigest()}"
 
-        raw_response = call_llm(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            temperature=0.2,
+    @staticmethod
+    def _explain_prompt(input: WikipediaExplainerInput, prompt: Prompt) -> str:
+        return prompt.render(
+            "user",
+            title=input.title,
+            raw_summary=input.raw_summary,
+            user_style=input.user_style,
         )
 
+    @staticmethod
+    def _parse_explanation(raw_response: str) -> WikipediaExplainerOutput:
         try:
             parsed = json.loads(raw_response)
         except json.JSONDecodeError as e:
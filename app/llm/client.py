@@ -1,9 +1,18 @@
+import asyncio
 import os
+import threading
+import time
+import weakref
+from dataclasses import asdict, dataclass
 from pathlib import Path
 from dotenv import load_dotenv
-from typing import Optional, List, Dict
+from typing import AsyncIterator, Dict, Iterator, List, Optional
 
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+
+from app import tracing
+from app.llm.messages import prefix_id
+from app.tools import rate_limit
 
 # Load .env from project root
 load_dotenv(dotenv_path=Path(__file__).resolve().parents[2] / ".env")
@@ -14,6 +23,50 @@ if not OPENAI_API_KEY:
 
 client = OpenAI(api_key=OPENAI_API_KEY)
 
+# Token budget booked before a call whose usage is not known yet;
+# corrected from response.usage once it arrives
+COMPLETION_TOKENS_ESTIMATE = 300
+
+# AsyncOpenAI keeps an httpx connection pool that is bound to the event loop
+# it was first used on, so each running loop gets its own client.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_client() -> AsyncOpenAI:
+    """
+    Return the AsyncOpenAI client for the current event loop.
+    """
+    loop = asyncio.get_running_loop()
+    async_client = _async_clients.get(loop)
+    if async_client is None:
+        async_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+        _async_clients[loop] = async_client
+    return async_client
+
+
+def _build_messages(
+    system_prompt: Optional[str],
+    user_prompt: Optional[str],
+    messages: Optional[List[Dict[str, str]]],
+) -> List[Dict[str, str]]:
+    if messages:
+        return messages
+
+    full_messages = []
+    if system_prompt:
+        full_messages.append({"role": "system", "content": system_prompt})
+    if user_prompt:
+        full_messages.append({"role": "user", "content": user_prompt})
+    return full_messages
+
+
+def _estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    # ~4 characters per token for English text
+    prompt_chars = sum(len(m.get("content") or "") for m in messages)
+    return prompt_chars // 4 + COMPLETION_TOKENS_ESTIMATE
+
 
 def call_llm(
     system_prompt: Optional[str] = None,
@@ -24,24 +77,194 @@ def call_llm(
     """
     Unified interface to call the LLM (GPT-4), using either system+user or full chat messages.
     """
-
-    if messages:
+    with tracing.span("llm", model="gpt-4") as span:
+        full_messages = _build_messages(system_prompt, user_prompt, messages)
+        estimate = _estimate_tokens(full_messages)
+        prefix = prefix_id(full_messages)
+        rate_limit.acquire("openai", tokens=estimate)
         response = client.chat.completions.create(
             model="gpt-4",
-            messages=messages,
+            messages=full_messages,
             temperature=temperature,
         )
+        _record_usage(span, response.usage, estimate, prefix)
         return response.choices[0].message.content
 
-    full_messages = []
-    if system_prompt:
-        full_messages.append({"role": "system", "content": system_prompt})
-    if user_prompt:
-        full_messages.append({"role": "user", "content": user_prompt})
 
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=full_messages,
-        temperature=temperature,
+async def call_llm_async(
+    system_prompt: Optional[str] = None,
+    user_prompt: Optional[str] = None,
+    messages: Optional[List[Dict[str, str]]] = None,
+    temperature: float = 0.7,
+) -> str:
+    """
+    Async counterpart of call_llm (same arguments, same return value).
+    """
+    with tracing.span("llm", model="gpt-4") as span:
+        full_messages = _build_messages(system_prompt, user_prompt, messages)
+        estimate = _estimate_tokens(full_messages)
+        prefix = prefix_id(full_messages)
+        await rate_limit.acquire_async("openai", tokens=estimate)
+        response = await get_async_client().chat.completions.create(
+            model="gpt-4",
+            messages=full_messages,
+            temperature=temperature,
+        )
+        _record_usage(span, response.usage, estimate, prefix)
+        return response.choices[0].message.content
+
+
+def call_llm_stream(
+    system_prompt: Optional[str] = None,
+    user_prompt: Optional[str] = None,
+    messages: Optional[List[Dict[str, str]]] = None,
+    temperature: float = 0.7,
+) -> Iterator[str]:
+    """
+    Streaming variant of call_llm: yields text deltas as they arrive.
+    "".join(deltas) equals what call_llm would have returned.
+    """
+    span = tracing.open_span("llm", model="gpt-4", stream=True)
+    started = time.perf_counter()
+    stream = None
+    try:
+        full_messages = _build_messages(system_prompt, user_prompt, messages)
+        estimate = _estimate_tokens(full_messages)
+        prefix = prefix_id(full_messages)
+        rate_limit.acquire("openai", tokens=estimate, span=span)
+        stream = client.chat.completions.create(
+            model="gpt-4",
+            messages=full_messages,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        for chunk in stream:
+            _record_usage(span, chunk.usage, estimate, prefix)
+            delta = _chunk_text(chunk)
+            if delta:
+                _record_first_token(span, started)
+                yield delta
+    finally:
+        # Closing early (the consumer stopped reading) drops the
+        # connection, which stops generation on the provider side
+        if stream is not None:
+            stream.close()
+        span.finish()
+
+
+async def call_llm_stream_async(
+    system_prompt: Optional[str] = None,
+    user_prompt: Optional[str] = None,
+    messages: Optional[List[Dict[str, str]]] = None,
+    temperature: float = 0.7,
+) -> AsyncIterator[str]:
+    """
+    Async counterpart of call_llm_stream.
+    """
+    span = tracing.open_span("llm", model="gpt-4", stream=True)
+    started = time.perf_counter()
+    stream = None
+    try:
+        full_messages = _build_messages(system_prompt, user_prompt, messages)
+        estimate = _estimate_tokens(full_messages)
+        prefix = prefix_id(full_messages)
+        await rate_limit.acquire_async("openai", tokens=estimate, span=span)
+        stream = await get_async_client().chat.completions.create(
+            model="gpt-4",
+            messages=full_messages,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            _record_usage(span, chunk.usage, estimate, prefix)
+            delta = _chunk_text(chunk)
+            if delta:
+                _record_first_token(span, started)
+                yield delta
+    finally:
+        if stream is not None:
+            await stream.close()
+        span.finish()
+
+
+def _chunk_text(chunk) -> Optional[str]:
+    if not chunk.choices:
+        return None
+    return chunk.choices[0].delta.content
+
+
+def _record_usage(span, usage, estimate: int = 0, prefix: Optional[str] = None) -> None:
+    if usage is None:
+        return
+    rate_limit.record_tokens("openai", usage.total_tokens - estimate)
+    cached_tokens = _cached_tokens(usage)
+    span.add(
+        prompt_tokens=usage.prompt_tokens,
+        completion_tokens=usage.completion_tokens,
+        total_tokens=usage.total_tokens,
+        cached_tokens=cached_tokens,
     )
-    return response.choices[0].message.content
+    if prefix is not None:
+        span.set(prompt_prefix=prefix)
+        _record_prefix_cache(prefix, usage.prompt_tokens, cached_tokens)
+
+
+def _cached_tokens(usage) -> int:
+    details = getattr(usage, "prompt_tokens_details", None)
+    return (getattr(details, "cached_tokens", None) or 0) if details is not None else 0
+
+
+def _record_first_token(span, started: float) -> None:
+    if isinstance(span, tracing.Span) and "first_token_ms" not in span.attributes:
+        span.set(first_token_ms=round((time.perf_counter() - started) * 1000, 3))
+
+
+# ======================================================
+# Prompt cache statistics
+# ======================================================
+
+@dataclass
+class PromptCacheStats:
+    calls: int = 0
+    hits: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Share of prompt tokens served from the provider's prefix cache.
+        """
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+
+_prefix_stats: Dict[str, PromptCacheStats] = {}
+_stats_lock = threading.Lock()
+
+
+def prompt_cache_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Per message prefix (see app.llm.messages.prefix_id): calls, calls
+    with any cached tokens, prompt and cached token totals, hit rate.
+    """
+    with _stats_lock:
+        return {
+            prefix: {**asdict(stats), "hit_rate": round(stats.hit_rate, 4)}
+            for prefix, stats in _prefix_stats.items()
+        }
+
+
+def reset_prompt_cache_stats() -> None:
+    with _stats_lock:
+        _prefix_stats.clear()
+
+
+def _record_prefix_cache(prefix: str, prompt_tokens: int, cached_tokens: int) -> None:
+    with _stats_lock:
+        stats = _prefix_stats.setdefault(prefix, PromptCacheStats())
+        stats.calls += 1
+        stats.hits += cached_tokens > 0
+        stats.prompt_tokens += prompt_tokens
+        stats.cached_tokens += cached_tokens
@@ -0,0 +1,87 @@
+# app/llm/messages.py
+"""
+Chat message layout that keeps provider-side prompt caching effective.
+
+OpenAI caches prompts by exact prefix: a request whose first N tokens
+match a recent request (N >= 1024, in 128-token steps) reuses them.
+So every request built from a prompt file starts with the same
+messages, byte for byte, and everything that changes per turn comes
+last:
+
+    [system]                      system + format sections   (stable)
+    [user, assistant, ...]        examples section pairs     (stable)
+    [user]                        rendered user section      (volatile)
+
+Prompt file sections:
+- system:   instructions (required)
+- format:   output schema / rules, appended to the system message
+- examples: few-shot list of {user: ..., assistant: ...}
+- user:     the per-call template; should hold only volatile content
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+from app.llm.utils import Prompt
+
+Message = Dict[str, str]
+
+_prefixes: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+_lock = threading.Lock()
+
+
+def prefix_messages(prompt: Prompt) -> List[Message]:
+    """
+    The stable messages for prompt (built once per prompt content).
+    """
+    with _lock:
+        prefix = _prefixes.get(prompt.hash)
+    if prefix is None:
+        prefix = _build_prefix(prompt)
+        with _lock:
+            _prefixes[prompt.hash] = prefix
+    return [{"role": role, "content": content} for role, content in prefix]
+
+
+def prefixed(prompt: Prompt, user_content: str) -> List[Message]:
+    """
+    The stable prefix followed by one volatile user message.
+    """
+    messages = prefix_messages(prompt)
+    messages.append({"role": "user", "content": user_content})
+    return messages
+
+
+def build_messages(prompt: Prompt, **values) -> List[Message]:
+    """
+    The stable prefix followed by the rendered user section.
+    """
+    return prefixed(prompt, prompt.render("user", **values))
+
+
+def prefix_id(messages: Sequence[Message]) -> str:
+    """
+    Short hash of everything before the final message: requests with
+    the same prefix_id can share the provider's prompt cache.
+    """
+    digest = hashlib.sha256()
+    for message in messages[:-1]:
+        digest.update(message.get("role", "").encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update((message.get("content") or "").encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()[:12]
+
+
+def _build_prefix(prompt: Prompt) -> Tuple[Tuple[str, str], ...]:
+    system = prompt["system"].rstrip("\n")
+    if "format" in prompt:
+        system = f"{system}\n\n{prompt['format'].rstrip()}"
+
+    prefix = [("system", system)]
+    for example in prompt.get("examples") or ():
+        prefix.append(("user", str(example["user"]).rstrip("\n")))
+        prefix.append(("assistant", str(example["assistant"]).rstrip("\n")))
+    return tuple(prefix)
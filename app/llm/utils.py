@@ -1,11 +1,117 @@
-import yaml
+import hashlib
+import os
+import re
+import threading
 from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Tuple
+
+import yaml
+
+
+# ======================================================
+# Prompt templates
+# ======================================================
+
+_PLACEHOLDER_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class PromptRenderError(ValueError):
+    """
+    Raised when render() gets missing or unexpected variables.
+    """
+
+
+class PromptTemplate:
+    """
+    A prompt string with {{ name }} placeholders, split once into
+    literal chunks and variable names.
+
+    render() fills every placeholder in a single pass: values are
+    never re-scanned, so a value containing "{{ places }}" is inserted
+    verbatim. Variables are checked strictly (missing and unexpected
+    names both raise PromptRenderError).
+    """
+
+    __slots__ = ("source", "variables", "_literals", "_names")
+
+    def __init__(self, source: str):
+        self.source = source
+        parts = _PLACEHOLDER_RE.split(source)
+        self._literals: Tuple[str, ...] = tuple(parts[0::2])
+        self._names: Tuple[str, ...] = tuple(parts[1::2])
+        self.variables = frozenset(self._names)
+
+    def render(self, **values: Any) -> str:
+        if values.keys() != self.variables:
+            missing = sorted(self.variables - values.keys())
+            unexpected = sorted(values.keys() - self.variables)
+            raise PromptRenderError(
+                f"Prompt variables mismatch (missing: {missing}, unexpected: {unexpected})"
+            )
 
+        out = [self._literals[0]]
+        for name, literal in zip(self._names, self._literals[1:]):
+            out.append(str(values[name]))
+            out.append(literal)
+        return "".join(out)
 
+    def __str__(self) -> str:
+        return self.source
 
-def load_prompt(relative_path: str) -> dict:
+
+class Prompt(Mapping[str, Any]):
+    """
+    A loaded prompt file: its YAML sections (prompt["system"] still
+    returns the raw string), a compiled template per string section,
+    and a content hash usable as a cache-key version.
+    """
+
+    def __init__(self, sections: Dict[str, Any], content: bytes = b""):
+        self._sections = sections
+        self.templates: Dict[str, PromptTemplate] = {
+            key: PromptTemplate(value)
+            for key, value in sections.items()
+            if isinstance(value, str)
+        }
+        self.hash = hashlib.sha256(content).hexdigest()[:16]
+
+    def render(self, section: str, **values: Any) -> str:
+        return self.templates[section].render(**values)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._sections[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sections)
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+
+# ======================================================
+# Loading (parsed once per file, reloaded when it changes)
+# ======================================================
+
+_prompts: Dict[Path, Tuple[Tuple[int, int], Prompt]] = {}
+_lock = threading.Lock()
+
+
+def load_prompt(relative_path: str) -> Prompt:
     base_dir = Path(__file__).resolve().parents[1]  # app/
     prompt_path = base_dir / relative_path
 
-    with open(prompt_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    stat = os.stat(prompt_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    with _lock:
+        cached = _prompts.get(prompt_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    with open(prompt_path, "rb") as f:
+        content = f.read()
+    prompt = Prompt(yaml.safe_load(content.decode("utf-8")) or {}, content)
+
+    with _lock:
+        _prompts[prompt_path] = (signature, prompt)
+    return prompt
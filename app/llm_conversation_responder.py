@@ -1,11 +1,17 @@
 # app/llm_conversation_responder.py
 
-from typing import Optional, Union
+from typing import Callable, Optional, Union
 from app.state.conversation_state import ConversationState
 from app.agents.wikipedia_explainer_agent import WikipediaExplainerOutput
 from app.agents.attractions_agent import AttractionsAgentOutput
-from app.llm.client import call_llm
-from app.llm.utils import load_prompt
+from app.llm.client import (
+    call_llm,
+    call_llm_async,
+    call_llm_stream,
+    call_llm_stream_async,
+)
+from app.llm.messages import prefixed
+from app.llm.utils import Prompt, load_prompt
 from app.models.agent_response import AgentResponse
 
 
@@ -15,7 +21,12 @@ class LLMConversationResponder:
     and conversation state, using an LLM prompt.
     """
 
-    SYSTEM_PROMPT = load_prompt("prompts/conversation.yaml")["system"]
+    PROMPT_PATH = "prompts/conversation.yaml"
+
+    @classmethod
+    def prompt(cls) -> Prompt:
+        # Resolved per call: load_prompt re-reads the file only after it changes
+        return load_prompt(cls.PROMPT_PATH)
 
     @classmethod
     def generate_response(
@@ -23,11 +34,60 @@ class LLMConversationResponder:
         user_input: str,
         agent_output: Union[WikipediaExplainerOutput, AttractionsAgentOutput],
         conversation_state: ConversationState,
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> AgentResponse:
         """
         Builds context and generates an assistant response via LLM.
+
+        If on_token is given, the reply is streamed and on_token receives
+        the user-facing TEXT as it is generated (without the
+        TEXT/FOLLOWUP/INTENT markup). The returned AgentResponse is the
+        same as in the non-streaming path.
+        """
+        messages = prefixed(
+            cls.prompt(), cls._build_user_prompt(user_input, agent_output, conversation_state)
+        )
+
+        if on_token is None:
+            # Call the LLM
+            llm_response = call_llm(messages=messages)
+            return cls._parse_or_fallback(llm_response)
+
+        text_filter = StreamingTextFilter(on_token)
+        for delta in call_llm_stream(messages=messages):
+            text_filter.feed(delta)
+        return cls._parse_or_fallback(text_filter.finish())
+
+    @classmethod
+    async def generate_response_async(
+        cls,
+        user_input: str,
+        agent_output: Union[WikipediaExplainerOutput, AttractionsAgentOutput],
+        conversation_state: ConversationState,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> AgentResponse:
         """
+        Async counterpart of generate_response.
+        """
+        messages = prefixed(
+            cls.prompt(), cls._build_user_prompt(user_input, agent_output, conversation_state)
+        )
+
+        if on_token is None:
+            llm_response = await call_llm_async(messages=messages)
+            return cls._parse_or_fallback(llm_response)
 
+        text_filter = StreamingTextFilter(on_token)
+        async for delta in call_llm_stream_async(messages=messages):
+            text_filter.feed(delta)
+        return cls._parse_or_fallback(text_filter.finish())
+
+    @staticmethod
+    def _build_user_prompt(
+        user_input: str,
+        agent_output: Union[WikipediaExplainerOutput, AttractionsAgentOutput],
+        conversation_state: ConversationState,
+    ) -> str:
         # Build structured context for the LLM
         context = {
             "user_input": user_input,
@@ -38,23 +98,19 @@ class LLMConversationResponder:
                 [a.name for a in agent_output.attractions] if isinstance(agent_output, AttractionsAgentOutput) else []
             ),
             "city": conversation_state.city,
-            "preferences": conversation_state.preferences,
+            "preferences": list(conversation_state.preferences),
             "subject_name": conversation_state.subject_name,
             "last_action": conversation_state.last_executed_action,
         }
 
         # Construct user prompt for LLM
-        user_prompt = (
+        return (
             f"The user said:\n{user_input}\n\n"
             f"Conversation context:\n{context}"
         )
 
-        # Call the LLM
-        llm_response = call_llm(
-            system_prompt=cls.SYSTEM_PROMPT,
-            user_prompt=user_prompt
-        )
-
+    @classmethod
+    def _parse_or_fallback(cls, llm_response: str) -> AgentResponse:
         # Parse or fallback
         try:
             parsed = cls._parse_response(llm_response)
@@ -70,21 +126,116 @@ class LLMConversationResponder:
         TEXT: ...
         FOLLOWUP: ...
         INTENT: ...
+
+        Without a (non-empty) TEXT line, the text is every line that is
+        not FOLLOWUP/INTENT markup.
         """
 
         text = followup = intent = None
+        body = []
         lines = raw.strip().splitlines()
 
         for line in lines:
-            if line.startswith("TEXT:"):
-                text = line.removeprefix("TEXT:").strip()
-            elif line.startswith("FOLLOWUP:"):
-                followup = line.removeprefix("FOLLOWUP:").strip()
-            elif line.startswith("INTENT:"):
-                intent = line.removeprefix("INTENT:").strip()
+            stripped = line.lstrip()
+            if stripped.startswith("TEXT:"):
+                text = text or stripped.removeprefix("TEXT:").strip()
+            elif stripped.startswith("FOLLOWUP:"):
+                followup = stripped.removeprefix("FOLLOWUP:").strip()
+            elif stripped.startswith("INTENT:"):
+                intent = stripped.removeprefix("INTENT:").strip()
+            else:
+                body.append(line)
 
         return AgentResponse(
-            text=text or raw.strip(),
+            text=text or "\n".join(body).strip() or raw.strip(),
             followup_question=followup or None,
             suggested_intent=intent or None,
         )
+
+
+class StreamingTextFilter:
+    """
+    Incremental counterpart of LLMConversationResponder._parse_response.
+
+    Receives raw deltas of a "TEXT: ... / FOLLOWUP: ... / INTENT: ..."
+    reply, classifies each line as soon as its first characters allow,
+    and forwards to on_token only what the parser will return as text:
+    the first non-empty TEXT line, or, until one appears, every line
+    that is not FOLLOWUP/INTENT markup (the raw-text fallback).
+    """
+
+    TEXT = "TEXT:"
+    MARKUP = ("FOLLOWUP:", "INTENT:")
+
+    def __init__(self, on_token: Callable[[str], None]):
+        self.on_token = on_token
+        self._raw: list[str] = []
+        self._head = ""          # start of the current line, until classified
+        self._kind: Optional[str] = None  # "text" | "markup" | "plain"
+        self._line_emitted = False
+        self._emitted = False
+        self._text_done = False  # a non-empty TEXT line was forwarded
+        self._newlines = 0       # line breaks owed before the next token
+
+    def feed(self, delta: str) -> None:
+        self._raw.append(delta)
+
+        while delta:
+            newline = delta.find("\n")
+            if newline == -1:
+                self._feed_line(delta)
+                return
+            self._feed_line(delta[:newline])
+            self._end_line()
+            delta = delta[newline + 1:]
+
+    def finish(self) -> str:
+        """
+        Flush anything still buffered and return the full raw reply.
+        """
+        self._end_line()
+        return "".join(self._raw)
+
+    def _feed_line(self, part: str) -> None:
+        if self._kind is None:
+            self._head += part
+            head = self._head.lstrip()
+            if head.startswith(self.TEXT):
+                self._kind, part = "text", head[len(self.TEXT):]
+            elif head.startswith(self.MARKUP):
+                self._kind = "markup"
+            elif any(prefix.startswith(head) for prefix in (self.TEXT, *self.MARKUP)):
+                # Not enough characters yet to decide
+                return
+            else:
+                self._kind, part = "plain", self._head
+        self._forward(part)
+
+    def _end_line(self) -> None:
+        if self._kind is None:
+            # Line ended before it could be told apart from markup
+            self._kind = "plain"
+            self._forward(self._head)
+
+        if self._kind == "text" and self._line_emitted:
+            self._text_done = True
+        elif self._kind == "plain" and self._emitted:
+            self._newlines += 1
+
+        self._head = ""
+        self._kind = None
+        self._line_emitted = False
+
+    def _forward(self, part: str) -> None:
+        if self._text_done or self._kind == "markup":
+            return
+        if not self._emitted or (self._kind == "text" and not self._line_emitted):
+            part = part.lstrip()
+        if not part:
+            return
+
+        if self._newlines:
+            self.on_token("\n" * self._newlines)
+            self._newlines = 0
+        self._emitted = self._line_emitted = True
+        self.on_token(part)
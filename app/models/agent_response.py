@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from dataclasses import dataclass
 
 @dataclass
@@ -7,3 +7,4 @@ class AgentResponse:
     followup_question: Optional[str] = None
     suggested_intent: Optional[str] = None
     slots_to_fill: Optional[List[str]] = None
+    trace: Optional[Dict[str, Any]] = None  # per-stage timings (app.tracing)
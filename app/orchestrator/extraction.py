@@ -1,12 +1,183 @@
 # app/orchestrator/extraction.py
 
 import json
-from typing import Dict, Any
+import re
+from typing import Dict, Any, List, Optional, Tuple
 
-from app.llm.client import call_llm
+from app import tracing
+from app.llm.client import call_llm, call_llm_async
+from app.llm.messages import build_messages
 from app.llm.utils import load_prompt
+from app.taxonomy import PREFERENCE_SYNONYMS
+from app.tools.gazetteer import COUNTRY_ALIASES, City, Gazetteer, get_gazetteer, lookup_city
+from app.tools.rate_limit import RateLimitExceeded
 
-PROMPT = load_prompt("prompts/extraction.yaml")  # returns dict with "system", "user", "assistant"
+PROMPT_PATH = "prompts/extraction.yaml"  # sections: "system", "format", "user"
+
+# ======================================================
+# Rule-based fast path
+# ======================================================
+# Trivial turns ("Thanks", "museums", "I'm in Rome") are extracted
+# deterministically; anything the rules cannot fully explain goes to
+# the LLM. Only results at or above this confidence skip the LLM.
+
+FAST_PATH_MIN_CONFIDENCE = 0.85
+
+_GREETING_WORDS = {
+    "hi", "hello", "hey", "hiya", "yo", "thanks", "thank", "thx", "ty",
+    "cheers", "ok", "okay", "cool", "great", "nice", "awesome", "perfect",
+    "bye", "goodbye", "good", "morning", "evening", "afternoon", "there",
+    "you", "much", "so", "very", "yes", "yeah", "sure",
+}
+
+# Words that flip the meaning of what follows ("no museums"); a message
+# containing one is never fully explained, so it goes to the LLM
+_NEGATOR_WORDS = {
+    "no", "nope", "not", "never", "nothing", "without", "except", "neither",
+    "nor", "don't", "dont", "didn't", "isn't", "aren't", "hate", "dislike", "avoid",
+}
+
+# Words that carry no extractable signal on their own
+_FILLER_WORDS = {
+    "i", "im", "i'm", "am", "a", "an", "the", "in", "at", "to", "of", "and",
+    "or", "me", "my", "we", "we're", "are", "is", "it", "please", "just",
+    "some", "any", "like", "love", "really", "into", "interested", "currently",
+    "now", "visiting", "staying", "landed", "arrived", "here", "today",
+}
+
+_TOKEN_RE = re.compile(r"[a-zà-ÿ']+")
+_WORD_RE = re.compile(r"[a-zà-ÿ']+", re.IGNORECASE)
+
+
+def _phrase_index(phrases: Dict[str, str]) -> Dict[Tuple[str, ...], str]:
+    return {tuple(_TOKEN_RE.findall(p)): value for p, value in phrases.items()}
+
+
+_PREFERENCE_PHRASES = _phrase_index({
+    synonym: canonical
+    for canonical, synonyms in PREFERENCE_SYNONYMS.items()
+    for synonym in synonyms | {canonical}
+})
+_MAX_PHRASE_LEN = max(len(p) for p in _PREFERENCE_PHRASES)
+
+# Longest city / country name tried against the gazetteer ("rio de janeiro")
+_MAX_PLACE_LEN = 3
+
+# Never looked up as (the edge of) a place name. Greeting words are
+# looked up ("I'm in Nice"), see _is_greeting_place
+_NOT_PLACE_WORDS = _NEGATOR_WORDS | _FILLER_WORDS
+
+
+def _match_place(
+    places: Optional[Gazetteer], tokens: List[str], i: int
+) -> Tuple[int, Optional[City]]:
+    """
+    Longest city or country name starting at tokens[i], via the offline
+    gazetteer: (words matched, city or None for a country name).
+    """
+    if places is None or tokens[i] in _NOT_PLACE_WORDS:
+        return 0, None
+
+    for size in range(min(_MAX_PLACE_LEN, len(tokens) - i), 0, -1):
+        if tokens[i + size - 1] in _NOT_PLACE_WORDS:
+            continue
+        name = " ".join(tokens[i:i + size])
+        city = lookup_city(name)
+        if city is not None:
+            return size, city
+        # Bare two-letter words ("do", "la") are not taken as ISO codes
+        if (len(name) > 2 or name in COUNTRY_ALIASES) and places.country_code(name):
+            return size, None
+    return 0, None
+
+
+def _is_greeting_place(words: List[str], i: int, size: int) -> Optional[bool]:
+    """
+    For a place name made of greeting words ("Nice", "Good Hope"):
+    True if it reads as a place (capitalized mid-sentence), False if it
+    is ambiguous, None if no greeting word is involved.
+    """
+    if not any(word.lower() in _GREETING_WORDS for word in words[i:i + size]):
+        return None
+    return i > 0 and words[i][0].isupper()
+
+
+def pre_extract(user_message: str) -> Tuple[Dict[str, Any], float]:
+    """
+    Deterministic extraction for trivial turns.
+
+    Returns a normalize_extracted-shaped dict and a confidence in [0, 1].
+    Confidence is high only when every word of the message is explained
+    by a greeting, a known city / country, a preference synonym or filler.
+    Cities and countries are resolved through the offline gazetteer;
+    without one installed, place names stay unexplained. Greeting words
+    are skipped outright only when the whole message is made of them;
+    otherwise one that names a place ("I'm in Nice") is a city when
+    capitalized mid-sentence and unexplained when ambiguous.
+    """
+    words = _WORD_RE.findall(user_message)
+    tokens = [word.lower() for word in words]
+    if not tokens:
+        return normalize_extracted({}), 0.0
+
+    if all(t in _GREETING_WORDS for t in tokens):
+        return normalize_extracted({}), 0.95
+
+    places = get_gazetteer()
+
+    city = country = None
+    preferences: List[str] = []
+    greeting = False
+    unexplained = 0
+
+    i = 0
+    while i < len(tokens):
+        matched = False
+
+        # Longest phrase match first ("local food")
+        for size in range(min(_MAX_PHRASE_LEN, len(tokens) - i), 0, -1):
+            phrase = tuple(tokens[i:i + size])
+            if phrase in _PREFERENCE_PHRASES:
+                canonical = _PREFERENCE_PHRASES[phrase]
+                if canonical not in preferences:
+                    preferences.append(canonical)
+                i += size
+                matched = True
+                break
+
+        if matched:
+            continue
+
+        # Then the longest place name ("new york", "italy")
+        size, place = _match_place(places, tokens, i)
+        if size:
+            if _is_greeting_place(words, i, size) is False:
+                unexplained += size
+            elif place is not None:
+                city, country = place.name, place.country
+            i += size
+            continue
+
+        token = tokens[i]
+        if token in _GREETING_WORDS:
+            greeting = True
+        elif token in _FILLER_WORDS:
+            pass
+        else:
+            unexplained += 1
+        i += 1
+
+    if not (city or preferences or greeting):
+        return normalize_extracted({}), 0.0
+
+    raw: Dict[str, Any] = {"city": city, "country": country, "preferences": preferences}
+    if preferences:
+        raw["user_goal"] = "get_recommendations"
+        raw["goal_confidence"] = 0.8
+
+    explained_ratio = 1 - unexplained / len(tokens)
+    confidence = 0.95 if unexplained == 0 else round(0.5 * explained_ratio, 3)
+    return normalize_extracted(raw), confidence
 
 
 def normalize_extracted(raw: dict) -> dict:
@@ -32,22 +203,12 @@ def normalize_extracted(raw: dict) -> dict:
     return result
 
 
-def extract_information(user_message: str) -> Dict[str, Any]:
-    """
-    Extract structured information from the user's message.
-    """
+def _build_messages(user_message: str) -> list:
+    # Cached by load_prompt; re-parsed only when the file changes
+    return build_messages(load_prompt(PROMPT_PATH), message=user_message)
 
-    full_user_prompt = PROMPT["user"].replace("{message}", user_message)
-
-    full_prompt = [
-        {"role": "system", "content": PROMPT["system"]},
-        {"role": "user", "content": full_user_prompt},
-        {"role": "assistant", "content": PROMPT["assistant"]},
-    ]
-
-    # ⚠️ call_llm must support full messages list
-    response_text = call_llm(messages=full_prompt, temperature=0.0)
 
+def _parse_extraction(response_text: str) -> Dict[str, Any]:
     # print("[DEBUG] raw LLM extraction output:", response_text)
 
     try:
@@ -66,3 +227,43 @@ def extract_information(user_message: str) -> Dict[str, Any]:
     except json.JSONDecodeError:
         print("[ERROR] Failed to parse JSON from extraction output")
         return {}
+
+
+def extract_information(user_message: str) -> Dict[str, Any]:
+    """
+    Extract structured information from the user's message.
+    Trivial messages are handled by pre_extract without an LLM call.
+    """
+    fast, confidence = pre_extract(user_message)
+    tracing.current_span().set(fast_path=confidence >= FAST_PATH_MIN_CONFIDENCE)
+    if confidence >= FAST_PATH_MIN_CONFIDENCE:
+        return fast
+
+    # ⚠️ call_llm must support full messages list
+    try:
+        response_text = call_llm(messages=_build_messages(user_message), temperature=0.0)
+    except RateLimitExceeded:
+        # Don't fail the turn, but don't trust the rule-based read either:
+        # it is below the threshold ("no museums" reads as museums)
+        tracing.current_span().set(rate_limited=True)
+        return {}
+    return _parse_extraction(response_text)
+
+
+async def extract_information_async(user_message: str) -> Dict[str, Any]:
+    """
+    Async counterpart of extract_information.
+    """
+    fast, confidence = pre_extract(user_message)
+    tracing.current_span().set(fast_path=confidence >= FAST_PATH_MIN_CONFIDENCE)
+    if confidence >= FAST_PATH_MIN_CONFIDENCE:
+        return fast
+
+    try:
+        response_text = await call_llm_async(
+            messages=_build_messages(user_message), temperature=0.0
+        )
+    except RateLimitExceeded:
+        tracing.current_span().set(rate_limited=True)
+        return {}
+    return _parse_extraction(response_text)
@@ -1,23 +1,33 @@
 # app/orchestrator/orchestrator_agent.py
 from __future__ import annotations
 
-from typing import Optional
-
-from app.state.conversation_state import ConversationState
-from app.orchestrator.extraction import extract_information
+from typing import Callable, Optional
+
+from app.state.conversation_state import ConversationState, merge_preferences
+from app.orchestrator.extraction import extract_information_async, pre_extract
+from app.orchestrator.prefetch import (
+    SpeculativePrefetch,
+    attractions_key,
+    guess_subject,
+    wikipedia_key,
+)
 from app.llm_conversation_responder import LLMConversationResponder
 
-from app.agents.attractions_agent import (
-    AttractionsAgent,
-    AttractionsAgentInput,
-)
+from app.orchestrator.services import SharedServices, get_shared_services
 
-from app.agents.wikipedia_explainer_agent import (
-    WikipediaExplainerAgent,
-)
+from app.agents.attractions_agent import AttractionsAgentInput
 
 from app.models.agent_response import AgentResponse
-from app.tools.geoapify_client import GeoapifyClient
+from app.tools.gazetteer import lookup_city
+from app.tools.rate_limit import RateLimitExceeded
+from app.tools.wikipedia import get_wikipedia_summary_async
+from app.runtime import run_sync
+from app import tracing
+
+BUSY_REPLY = (
+    "I'm handling a lot of requests right now. "
+    "Could you ask me again in a moment?"
+)
 
 
 class OrchestratorAgent:
@@ -29,26 +39,95 @@ class OrchestratorAgent:
     - Maintain conversation state
     - Decide which agent to run
     - Return a clean AgentResponse (text only – UX handled elsewhere)
+
+    With fused=True, attractions turns rank places and write the reply
+    in a single LLM call instead of a ranking call plus a responder call.
+
+    Agents and clients come from SharedServices (process-wide by
+    default); the only per-conversation object is the state, so an
+    orchestrator is cheap to build per session (see SessionManager).
     """
 
-    def __init__(self):
-        self.state = ConversationState()
-        self.attractions_agent = AttractionsAgent()
-        self.wikipedia_agent = WikipediaExplainerAgent()
-        self.geo_client = GeoapifyClient()
+    def __init__(
+        self,
+        fused: bool = False,
+        services: Optional[SharedServices] = None,
+        state: Optional[ConversationState] = None,
+    ):
+        self.fused = fused
+        self.state = state if state is not None else ConversationState()
+
+        services = services or get_shared_services()
+        self.attractions_agent = services.attractions_agent
+        self.wikipedia_agent = services.wikipedia_agent
+        self.geo_client = services.geo_client
 
     # ======================================================
     # Public API
     # ======================================================
 
-    def handle_message(self, user_input: str) -> AgentResponse:
+    def handle_message(
+        self,
+        user_input: str,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> AgentResponse:
+        """
+        Blocking entrypoint (CLI / scripts).
+        Thin wrapper around handle_message_async.
+        """
+        return run_sync(self.handle_message_async(user_input, on_token=on_token))
+
+    async def handle_message_async(
+        self,
+        user_input: str,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> AgentResponse:
+        """
+        Run one conversation turn.
+
+        If on_token is given, the final LLM response text is streamed
+        to it as it is generated. Early replies (clarifications) are
+        not streamed, and neither are fused attractions replies (they
+        arrive inside a JSON object); callers should print
+        response.text when no token was received.
+
+        The per-stage timing breakdown is attached as response.trace
+        (see app.tracing for hooks / JSON-lines export).
+
+        Likely Wikipedia / Geoapify fetches are started speculatively
+        before extraction (see app.orchestrator.prefetch); the ones the
+        turn does not need are cancelled when it ends.
+        """
         print("=" * 60)
         # print(f"[DEBUG] Turn #{self.state.turn_count + 1} | User: {user_input}")
 
+        with tracing.trace("turn", turn=self.state.turn_count + 1) as root:
+            prefetch = self._start_prefetch(user_input)
+            try:
+                response = await self._run_turn(user_input, on_token, prefetch)
+            except RateLimitExceeded:
+                # Out of API budget even after queueing: answer, don't crash
+                root.set(rate_limited=True)
+                self.state.turn_count += 1
+                response = AgentResponse(text=BUSY_REPLY)
+            finally:
+                prefetch.discard()
+            root.set(action=self.state.last_executed_action)
+
+        response.trace = root.to_dict()
+        return response
+
+    async def _run_turn(
+        self,
+        user_input: str,
+        on_token: Optional[Callable[[str], None]],
+        prefetch: SpeculativePrefetch,
+    ) -> AgentResponse:
         # --------------------------------------------------
         # Step 1: LLM-based extraction
         # --------------------------------------------------
-        extracted = extract_information(user_input)
+        with tracing.span("extraction"):
+            extracted = await extract_information_async(user_input)
         # print("[DEBUG] extracted=", extracted)
 
         self.state.update_from_extraction(extracted)
@@ -87,10 +166,12 @@ class OrchestratorAgent:
                     text="Which place would you like to learn about?"
                 )
 
-            agent_output = self.wikipedia_agent.run(
-                subject_name=self.state.subject_name,
-                city=self.state.city,
-            )
+            with tracing.span("wikipedia_agent", subject=self.state.subject_name):
+                await prefetch.use(wikipedia_key(self.state.subject_name))
+                agent_output = await self.wikipedia_agent.run_async(
+                    subject_name=self.state.subject_name,
+                    city=self.state.city,
+                )
 
         elif action == "attractions":
             if not self.state.city:
@@ -99,9 +180,13 @@ class OrchestratorAgent:
                     text="Could you tell me which city you are in?"
                 )
 
+            # Speculative geocode + places fetch (lands in the Geoapify cache)
+            await prefetch.use(attractions_key(self.state.city, self.state.preferences))
+
             # Ensure coordinates exist
             if self.state.latitude is None or self.state.longitude is None:
-                coords = self._geocode(self.state.city)
+                with tracing.span("geocode", city=self.state.city):
+                    coords = await self._geocode_async(self.state.city)
                 if not coords:
                     self.state.turn_count += 1
                     return AgentResponse(
@@ -109,23 +194,37 @@ class OrchestratorAgent:
                     )
                 self.state.latitude, self.state.longitude = coords
 
-            agent_output = self.attractions_agent.run(
-                AttractionsAgentInput(
-                    city=self.state.city,
-                    lat=self.state.latitude,
-                    lon=self.state.longitude,
-                    preferences=self.state.preferences,
-                )
+            attractions_input = AttractionsAgentInput(
+                city=self.state.city,
+                lat=self.state.latitude,
+                lon=self.state.longitude,
+                preferences=list(self.state.preferences),
             )
 
+            if self.fused:
+                with tracing.span("attractions_agent", fused=True):
+                    agent_output, response = await self.attractions_agent.run_fused_async(
+                        attractions_input,
+                        user_input=user_input,
+                        context=self._response_context(),
+                    )
+                if response is not None and response.text:
+                    self.state.turn_count += 1
+                    return response
+            else:
+                with tracing.span("attractions_agent"):
+                    agent_output = await self.attractions_agent.run_async(attractions_input)
+
         # --------------------------------------------------
         # Step 5: Natural language response
         # --------------------------------------------------
-        response = LLMConversationResponder.generate_response(
-            user_input=user_input,
-            agent_output=agent_output,
-            conversation_state=self.state,
-        )
+        with tracing.span("responder"):
+            response = await LLMConversationResponder.generate_response_async(
+                user_input=user_input,
+                agent_output=agent_output,
+                conversation_state=self.state,
+                on_token=on_token,
+            )
 
         self.state.turn_count += 1
         return response
@@ -158,15 +257,97 @@ class OrchestratorAgent:
 
         return None
 
+    # ======================================================
+    # Speculative prefetch
+    # ======================================================
+
+    def _start_prefetch(self, user_input: str) -> SpeculativePrefetch:
+        """
+        Guess what this turn will fetch (from state and a rule-based
+        read of the message) and start it before extraction runs.
+        """
+        prefetch = SpeculativePrefetch()
+        guessed, _ = pre_extract(user_input)
+        city = guessed["city"] or self.state.city
+
+        subject = guess_subject(user_input)
+        if subject:
+            prefetch.start(
+                wikipedia_key(subject),
+                get_wikipedia_summary_async(title=subject, city=city),
+            )
+
+        # Same merge as ConversationState.update_from_extraction
+        preferences = merge_preferences(self.state.preferences, guessed["preferences"])
+        if city and preferences:
+            prefetch.start(
+                attractions_key(city, preferences),
+                self._prefetch_attractions(city, list(preferences)),
+            )
+
+        return prefetch
+
+    async def _prefetch_attractions(self, city: str, preferences: list[str]) -> None:
+        # Use the coordinates the turn itself will use
+        if self.state.latitude is not None and self.state.longitude is not None:
+            coords = (self.state.latitude, self.state.longitude)
+        else:
+            coords = await self._geocode_async(city)
+        if not coords:
+            return
+
+        await self.attractions_agent.prefetch_async(
+            AttractionsAgentInput(
+                city=city,
+                lat=coords[0],
+                lon=coords[1],
+                preferences=preferences,
+            )
+        )
+
     # ======================================================
     # Utilities
     # ======================================================
 
+    def _response_context(self) -> dict:
+        """
+        Conversation context handed to the fused ranking call
+        (the same fields the conversation responder sees).
+        """
+        return {
+            "city": self.state.city,
+            "preferences": list(self.state.preferences),
+            "subject_name": self.state.subject_name,
+            "last_action": self.state.last_executed_action,
+        }
+
     def _geocode(self, city: str) -> Optional[tuple[float, float]]:
         """
         Convert city name into (lat, lon).
+        The offline gazetteer is tried first; Geoapify only on a miss.
         """
-        geo = self.geo_client.geocode(city, limit=1)
+        coords = self._coords_from_gazetteer(city)
+        if coords:
+            return coords
+        return self._coords_from_geocode(self.geo_client.geocode(city, limit=1))
+
+    async def _geocode_async(self, city: str) -> Optional[tuple[float, float]]:
+        coords = self._coords_from_gazetteer(city)
+        if coords:
+            return coords
+        return self._coords_from_geocode(
+            await self.geo_client.geocode_async(city, limit=1)
+        )
+
+    def _coords_from_gazetteer(self, city: str) -> Optional[tuple[float, float]]:
+        match = lookup_city(city, country=self.state.country)
+        tracing.current_span().set(gazetteer_hit=match is not None)
+        if match is None:
+            return None
+        return match.lat, match.lon
+
+    @staticmethod
+    def _coords_from_geocode(geo: dict) -> Optional[tuple[float, float]]:
         features = geo.get("features", [])
         if not features:
             return None
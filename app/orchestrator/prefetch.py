@@ -0,0 +1,104 @@
+# app/orchestrator/prefetch.py
+"""
+Speculative prefetch for a conversation turn.
+
+While the extraction LLM call is in flight, the orchestrator guesses
+what the turn will need (from ConversationState and a cheap rule-based
+read of the raw text) and starts those fetches right away.
+
+The fetched data is handed over through the tools' response caches:
+once extraction settles, the orchestrator awaits the prefetch that
+matches what it is about to run (so the agent's own call is a cache
+hit) and cancels everything else.
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+from typing import Any, Awaitable, Dict, Hashable, Optional
+
+from app import tracing
+
+# "tell me about the Colosseum", "what is the Pantheon?", "history of Petra"
+_SUBJECT_RE = re.compile(
+    r"\b(?:about|explain|history of|what is|what's|who built)\s+(?:the\s+)?"
+    r"(?P<subject>[^?.!,]+?)\s*(?:[?.!,]|$)",
+    re.IGNORECASE,
+)
+
+
+def guess_subject(user_input: str) -> Optional[str]:
+    """
+    Cheap guess of the place a message asks about (None if unclear).
+    Only used to start a speculative Wikipedia lookup.
+    """
+    match = _SUBJECT_RE.search(user_input)
+    if not match:
+        return None
+
+    subject = match.group("subject").strip()
+    if not subject or subject.lower() in {"it", "this", "that", "there", "here"}:
+        return None
+    return subject
+
+
+def wikipedia_key(subject: str) -> tuple:
+    # City-independent: the plain-title lookup is shared by any city guess
+    return ("wikipedia", subject.casefold())
+
+
+def attractions_key(city: str, preferences) -> tuple:
+    return ("attractions", city.casefold(), tuple(preferences))
+
+
+class SpeculativePrefetch:
+    """
+    Set of in-flight speculative fetches for one turn, keyed by what
+    they fetch (see wikipedia_key / attractions_key).
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    def start(self, key: Hashable, coro: Awaitable[Any]) -> None:
+        if key in self._tasks:
+            coro.close()
+            return
+        self._tasks[key] = asyncio.ensure_future(self._run(key, coro))
+
+    async def use(self, key: Hashable) -> bool:
+        """
+        Wait for the prefetch matching key, if one was started.
+        Returns True if it completed; failures are swallowed (the
+        real call will simply repeat the request).
+        """
+        task = self._tasks.pop(key, None)
+        if task is None:
+            return False
+
+        tracing.current_span().set(prefetch_used=True)
+        try:
+            await task
+        except Exception:
+            return False
+        return True
+
+    def discard(self) -> None:
+        """
+        Cancel every prefetch that was not used.
+        """
+        for task in self._tasks.values():
+            if task.done():
+                if not task.cancelled():
+                    task.exception()
+            else:
+                task.cancel()
+        self._tasks.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._tasks
+
+    @staticmethod
+    async def _run(key: Hashable, coro: Awaitable[Any]) -> Any:
+        with tracing.span("prefetch", kind=key[0] if isinstance(key, tuple) else str(key)):
+            return await coro
@@ -0,0 +1,68 @@
+# app/orchestrator/services.py
+"""
+Process-wide services shared by every conversation.
+
+Clients, agents (with their loaded prompts) and the caches behind them
+are stateless with respect to a user, so one set serves all sessions.
+An OrchestratorAgent combines these shared services with one
+ConversationState; building one is cheap.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from app.agents.attractions_agent import AttractionsAgent
+from app.agents.wikipedia_explainer_agent import WikipediaExplainerAgent
+from app.tools.geoapify_client import GeoapifyClient
+from app.tools.poi_index import PlaceIndex
+
+
+@dataclass
+class SharedServices:
+    geo_client: GeoapifyClient
+    place_index: PlaceIndex
+    attractions_agent: AttractionsAgent
+    wikipedia_agent: WikipediaExplainerAgent
+
+    @classmethod
+    def create(cls, geo_client: Optional[GeoapifyClient] = None) -> "SharedServices":
+        """
+        Build a full set of services around one Geoapify client.
+        """
+        geo_client = geo_client or GeoapifyClient()
+        place_index = PlaceIndex(geo_client)
+        return cls(
+            geo_client=geo_client,
+            place_index=place_index,
+            attractions_agent=AttractionsAgent(geo_client=geo_client, place_index=place_index),
+            wikipedia_agent=WikipediaExplainerAgent(),
+        )
+
+
+_services: Optional[SharedServices] = None
+_lock = threading.Lock()
+
+
+def get_shared_services() -> SharedServices:
+    """
+    The process-wide services (created on first use).
+    """
+    global _services
+
+    if _services is None:
+        with _lock:
+            if _services is None:
+                _services = SharedServices.create()
+    return _services
+
+
+def configure(services: Optional[SharedServices]) -> None:
+    """
+    Replace the process-wide services (None: rebuild lazily).
+    """
+    global _services
+
+    with _lock:
+        _services = services
@@ -0,0 +1,273 @@
+# app/orchestrator/sessions.py
+"""
+Many concurrent conversations on one set of shared services.
+
+SessionManager keys ConversationState objects by session id. Each
+turn builds a lightweight OrchestratorAgent around the session's state
+and the shared services, so memory per user is just the state.
+
+Turns of the same session are serialized (the state is mutated in
+place); different sessions run concurrently. Sessions idle for longer
+than idle_ttl seconds are evicted, and max_sessions caps the total
+(least recently used first).
+
+With a SessionStore, a session is loaded from the store the first
+time this process sees it and written back (changed fields only,
+compare-and-swap) after every turn. Evicted or restarted sessions are
+then resumed from the store, and several workers can share sessions.
+If the write-back keeps conflicting, the reply is still returned and
+the turn's changes are written with the session's next turn.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from app.models.agent_response import AgentResponse
+from app.orchestrator.orchestrator_agent import OrchestratorAgent
+from app.orchestrator.services import SharedServices, get_shared_services
+from app.runtime import run_sync
+from app.state.conversation_state import ConversationState
+from app.state.session_store import (
+    SessionStore,
+    StoredSession,
+    changed_fields,
+    state_fields,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDLE_TTL = float(os.getenv("NAVAN_SESSION_IDLE_TTL", "1800"))
+
+# Compare-and-swap retries when other workers keep writing the session
+MAX_PERSIST_ATTEMPTS = 5
+
+
+class SessionConflict(RuntimeError):
+    """
+    A turn could not be written back: the stored session kept changing.
+    """
+
+
+class _Session:
+    __slots__ = ("state", "last_seen", "lock", "active", "loaded", "stored")
+
+    def __init__(self, state: ConversationState, now: float):
+        self.state = state
+        self.last_seen = now
+        self.lock = asyncio.Lock()
+        self.active = 0
+        self.loaded = False
+        self.stored: Optional[StoredSession] = None
+
+
+class SessionManager:
+    """
+    Serves many conversations keyed by session id.
+
+        sessions = SessionManager()
+        sid = sessions.open()
+        response = await sessions.handle_message_async(sid, "museums in Rome")
+    """
+
+    def __init__(
+        self,
+        services: Optional[SharedServices] = None,
+        fused: bool = False,
+        idle_ttl: float = DEFAULT_IDLE_TTL,
+        max_sessions: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        store: Optional[SessionStore] = None,
+    ):
+        self.services = services or get_shared_services()
+        self.store = store
+        self.fused = fused
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self._clock = clock
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ======================================================
+    # Public API
+    # ======================================================
+
+    def open(self, session_id: Optional[str] = None) -> str:
+        """
+        Start (or resume) a session and return its id.
+        """
+        session_id = session_id or uuid.uuid4().hex
+        session = self._session(session_id)
+        try:
+            if self.store is not None and not session.loaded:
+                self._apply_loaded(session, self.store.load(session_id))
+        finally:
+            session.active -= 1
+            self._touch(session_id, session)
+        return session_id
+
+    def close(self, session_id: str) -> None:
+        """
+        End a session (and delete it from the store).
+        """
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        if self.store is not None:
+            self.store.delete(session_id)
+
+    def get_state(self, session_id: str) -> Optional[ConversationState]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+        return session.state if session is not None else None
+
+    def handle_message(
+        self,
+        session_id: str,
+        user_input: str,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> AgentResponse:
+        """
+        Blocking entrypoint. Thin wrapper around handle_message_async.
+        """
+        return run_sync(self.handle_message_async(session_id, user_input, on_token=on_token))
+
+    async def handle_message_async(
+        self,
+        session_id: str,
+        user_input: str,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> AgentResponse:
+        """
+        Run one turn of a session. Unknown (or evicted) ids start a
+        fresh conversation under that id.
+        """
+        session = self._session(session_id)
+
+        try:
+            async with session.lock:
+                if self.store is not None and not session.loaded:
+                    stored = await asyncio.to_thread(self.store.load, session_id)
+                    self._apply_loaded(session, stored)
+
+                agent = OrchestratorAgent(
+                    fused=self.fused,
+                    services=self.services,
+                    state=session.state,
+                )
+                response = await agent.handle_message_async(user_input, on_token=on_token)
+
+                if self.store is not None:
+                    try:
+                        await self._persist(session_id, session)
+                    except SessionConflict as e:
+                        # The turn already ran: answer anyway and keep its
+                        # changes in memory for the next turn's write-back
+                        logger.warning("%s; reply returned unsaved", e)
+                return response
+        finally:
+            session.active -= 1
+            self._touch(session_id, session)
+
+    def evict_idle(self) -> int:
+        """
+        Drop sessions idle for longer than idle_ttl.
+        Returns the number of sessions evicted.
+        """
+        with self._lock:
+            return self._evict(self._clock())
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    # ======================================================
+    # Internal helpers
+    # ======================================================
+
+    def _session(self, session_id: str) -> _Session:
+        """
+        Get or create a session and mark it active (the caller must
+        decrement session.active). Marking happens before eviction so
+        the session being used is never the one evicted.
+        """
+        now = self._clock()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = _Session(ConversationState(), now)
+            else:
+                session.last_seen = now
+                self._sessions.move_to_end(session_id)
+            session.active += 1
+            self._evict(now)
+            return session
+
+    @staticmethod
+    def _apply_loaded(session: _Session, stored: Optional[StoredSession]) -> None:
+        if stored is not None:
+            session.state = stored.state
+        session.stored = stored
+        session.loaded = True
+
+    async def _persist(self, session_id: str, session: _Session) -> None:
+        stored = await asyncio.to_thread(
+            self.store.compare_and_swap, session_id, session.state, session.stored
+        )
+
+        if stored is None:
+            # Another worker wrote this session since we loaded it:
+            # apply this turn's changes on top of its version, and retry
+            # if it moves on again in between
+            base = session.stored or StoredSession(
+                ConversationState(), 0, state_fields(ConversationState())
+            )
+            changes = changed_fields(session.state, base)
+            for _ in range(MAX_PERSIST_ATTEMPTS):
+                fresh = await asyncio.to_thread(self.store.load, session_id)
+                state = fresh.state if fresh is not None else session.state
+                for name, value in changes.items():
+                    setattr(state, name, value)
+                stored = await asyncio.to_thread(
+                    self.store.compare_and_swap, session_id, state, fresh
+                )
+                if stored is not None:
+                    break
+            else:
+                raise SessionConflict(
+                    f"session {session_id!r} changed {MAX_PERSIST_ATTEMPTS} times while saving"
+                )
+
+        session.state = stored.state
+        session.stored = stored
+
+    def _touch(self, session_id: str, session: _Session) -> None:
+        with self._lock:
+            session.last_seen = self._clock()
+            if self._sessions.get(session_id) is session:
+                self._sessions.move_to_end(session_id)
+
+    def _evict(self, now: float) -> int:
+        # Oldest first, so this stops at the first session worth keeping
+        evicted = 0
+        for _ in range(len(self._sessions)):
+            session_id, session = next(iter(self._sessions.items()))
+            over_capacity = (
+                self.max_sessions is not None and len(self._sessions) > self.max_sessions
+            )
+            if not (over_capacity or now - session.last_seen > self.idle_ttl):
+                break
+            if session.active:
+                # Turn in progress: keep it, look at the next one
+                self._sessions.move_to_end(session_id)
+                continue
+            del self._sessions[session_id]
+            evicted += 1
+        return evicted
@@ -0,0 +1,283 @@
+# app/ranking/attractions_ranker.py
+"""
+Deterministic, vectorized ranking of nearby places.
+
+Each scorer maps the candidate places to a score in [0, 1] (one NumPy
+array per scorer); the final score is their weighted sum. The default
+scorers are:
+
+- distance:   closeness to the user, relative to the search radius
+- category:   how well a place's Geoapify categories match the user's
+              preferences (via the category hierarchy in app.taxonomy)
+- popularity: cheap notability signals (Wikidata / Wikipedia links,
+              website, opening hours)
+
+Scorers are pluggable: pass (weight, scorer) pairs to AttractionsRanker.
+Places can also be ranked incrementally, batch by batch as they arrive
+(see AttractionsRanker.accumulator).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.taxonomy import is_subcategory
+
+EARTH_RADIUS_M = 6_371_000
+
+
+@dataclass
+class RankingQuery:
+    lat: float
+    lon: float
+    radius_m: float
+    preferred_categories: Dict[str, str]  # Geoapify category -> preference
+
+
+@dataclass
+class PlaceArrays:
+    """
+    Column view of the candidate places, built once per ranking.
+    """
+    lat: np.ndarray
+    lon: np.ndarray
+    categories: List[List[str]]
+    popularity: np.ndarray
+
+    @classmethod
+    def from_places(cls, places: Sequence[dict]) -> "PlaceArrays":
+        return cls(
+            lat=np.fromiter((p["lat"] for p in places), dtype=np.float64, count=len(places)),
+            lon=np.fromiter((p["lon"] for p in places), dtype=np.float64, count=len(places)),
+            categories=[_categories_of(p) for p in places],
+            popularity=np.fromiter(
+                (p.get("popularity") or 0.0 for p in places), dtype=np.float64, count=len(places)
+            ),
+        )
+
+
+@dataclass
+class RankedPlace:
+    place: dict
+    score: float
+    distance_m: float
+    matched_category: Optional[str]
+    matched_preference: Optional[str]
+
+
+Scorer = Callable[[PlaceArrays, RankingQuery], np.ndarray]
+
+
+# ======================================================
+# Scorers
+# ======================================================
+
+def haversine_m(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Distances in meters from one point to many.
+    """
+    phi1 = np.radians(lat)
+    phi2 = np.radians(lats)
+    dphi = phi2 - phi1
+    dlmb = np.radians(lons - lon)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def distance_score(places: PlaceArrays, query: RankingQuery) -> np.ndarray:
+    distances = haversine_m(query.lat, query.lon, places.lat, places.lon)
+    return np.clip(1.0 - distances / max(query.radius_m, 1.0), 0.0, 1.0)
+
+
+def category_match(place_category: str, preferred: str) -> float:
+    """
+    Match strength between one place category and one preferred category.
+
+    exact match                          1.0
+    place is a subcategory of preferred  0.9  (catering.restaurant.pizza)
+    place is a parent of preferred       0.5  (entertainment vs entertainment.museum)
+    same top-level group                 0.25
+    """
+    if place_category == preferred:
+        return 1.0
+    if is_subcategory(place_category, preferred):
+        return 0.9
+    if is_subcategory(preferred, place_category):
+        return 0.5
+    if place_category.split(".", 1)[0] == preferred.split(".", 1)[0]:
+        return 0.25
+    return 0.0
+
+
+def best_category_match(
+    categories: List[str],
+    preferred_categories: Dict[str, str],
+) -> Tuple[float, Optional[str], Optional[str]]:
+    """
+    (strength, matched place category, matched preference) for one place.
+    """
+    best = (0.0, None, None)
+    for category in categories:
+        for preferred, preference in preferred_categories.items():
+            strength = category_match(category, preferred)
+            if strength > best[0]:
+                best = (strength, category, preference)
+    return best
+
+
+def category_score(places: PlaceArrays, query: RankingQuery) -> np.ndarray:
+    return np.fromiter(
+        (best_category_match(c, query.preferred_categories)[0] for c in places.categories),
+        dtype=np.float64,
+        count=len(places.categories),
+    )
+
+
+def popularity_score(places: PlaceArrays, query: RankingQuery) -> np.ndarray:
+    return np.clip(places.popularity, 0.0, 1.0)
+
+
+# Notability signals found in Geoapify place properties, and their weight
+POPULARITY_SIGNALS = {
+    "wikidata": 0.4,
+    "wikipedia": 0.3,
+    "website": 0.15,
+    "opening_hours": 0.15,
+}
+
+
+def popularity_from_properties(props: dict) -> float:
+    """
+    Popularity signal in [0, 1] from raw Geoapify feature properties.
+    """
+    raw = props.get("datasource", {}).get("raw", {})
+    return round(sum(
+        weight
+        for signal, weight in POPULARITY_SIGNALS.items()
+        if props.get(signal) or raw.get(signal)
+    ), 3)
+
+
+DEFAULT_SCORERS: List[Tuple[float, Scorer]] = [
+    (0.35, distance_score),
+    (0.45, category_score),
+    (0.20, popularity_score),
+]
+
+
+# ======================================================
+# Ranker
+# ======================================================
+
+class AttractionsRanker:
+    """
+    Ranks normalized places (dicts with name, lat, lon, category /
+    categories and optional popularity) by the weighted scorer sum.
+    """
+
+    def __init__(self, scorers: Optional[List[Tuple[float, Scorer]]] = None):
+        self.scorers = scorers if scorers is not None else DEFAULT_SCORERS
+
+    def rank(
+        self,
+        places: Sequence[dict],
+        lat: float,
+        lon: float,
+        preferred_categories: Dict[str, str],
+        radius_m: float,
+        limit: int = 5,
+    ) -> List[RankedPlace]:
+        accumulator = self.accumulator(lat, lon, preferred_categories, radius_m, limit)
+        accumulator.add(places)
+        return accumulator.results()
+
+    def accumulator(
+        self,
+        lat: float,
+        lon: float,
+        preferred_categories: Dict[str, str],
+        radius_m: float,
+        limit: int = 5,
+    ) -> "RankingAccumulator":
+        """
+        Incremental ranking: add() batches as they arrive,
+        results() gives the same top `limit` as rank() on all of them.
+        """
+        return RankingAccumulator(
+            self, RankingQuery(lat, lon, radius_m, preferred_categories), limit
+        )
+
+    def score(self, places: Sequence[dict], query: RankingQuery) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (scores, distances in meters) for a batch of places.
+        """
+        arrays = PlaceArrays.from_places(places)
+
+        scores = np.zeros(len(places))
+        for weight, scorer in self.scorers:
+            scores += weight * scorer(arrays, query)
+
+        return scores, haversine_m(query.lat, query.lon, arrays.lat, arrays.lon)
+
+
+class RankingAccumulator:
+    """
+    Running top-k over batches of places.
+    """
+
+    def __init__(self, ranker: AttractionsRanker, query: RankingQuery, limit: int):
+        self.ranker = ranker
+        self.query = query
+        self.limit = limit
+        self.count = 0
+        self._best: List[Tuple[float, float, str, RankedPlace]] = []
+
+    def add(self, places: Sequence[dict]) -> None:
+        if not places or self.limit <= 0:
+            return
+
+        self.count += len(places)
+        scores, distances = self.ranker.score(places, self.query)
+        keys = [place_key(place) for place in places]
+
+        # Best first; ties broken by distance, then by place key, so the
+        # result doesn't depend on which batch arrived first
+        order = np.lexsort((np.array(keys), distances, -scores))[:self.limit]
+
+        for i in order:
+            _, category, preference = best_category_match(
+                _categories_of(places[i]), self.query.preferred_categories
+            )
+            ranked = RankedPlace(
+                place=places[i],
+                score=round(float(scores[i]), 4),
+                distance_m=float(distances[i]),
+                matched_category=category,
+                matched_preference=preference,
+            )
+            self._best.append((-float(scores[i]), ranked.distance_m, keys[i], ranked))
+
+        self._best.sort(key=lambda entry: entry[:3])
+        del self._best[self.limit:]
+
+    def results(self) -> List[RankedPlace]:
+        return [entry[3] for entry in self._best]
+
+
+def place_key(place: dict) -> str:
+    """
+    Stable identity of a normalized place: its place id, or name and
+    coordinates when it has none.
+    """
+    if place.get("place_id"):
+        return f"id:{place['place_id']}"
+    return f"at:{place.get('name', '')}@{place['lat']:.5f},{place['lon']:.5f}"
+
+
+def _categories_of(place: dict) -> List[str]:
+    categories = place.get("categories")
+    if categories is None:
+        categories = [c.strip() for c in place.get("category", "").split(",")]
+    return [c for c in categories if c]
@@ -1,6 +1,7 @@
 # app/routing/place_category_resolver.py
 
 from app.routing.place_intent import PlaceIntent
+from app.taxonomy import INTENT_CATEGORIES
 
 
 class PlaceCategoryResolver:
@@ -11,18 +12,8 @@ class PlaceCategoryResolver:
     or hallucinated categories from reaching external APIs.
     """
 
-    _INTENT_TO_CATEGORY = {
-        PlaceIntent.SUPERMARKET: "commercial.supermarket",
-        PlaceIntent.RESTAURANT: "catering.restaurant",
-        PlaceIntent.CAFE: "catering.cafe",
-        PlaceIntent.PARK: "leisure.park",
-        PlaceIntent.MUSEUM: "entertainment.museum",
-        PlaceIntent.ATTRACTION: "tourism.attraction",
-        PlaceIntent.HOTEL: "accommodation.hotel",
-        PlaceIntent.BAR: "catering.bar",
-        PlaceIntent.SHOPPING: "commercial.shopping_mall",
-        PlaceIntent.PHARMACY: "commercial.health_and_beauty.pharmacy",
-    }
+    # Frozen table from app.taxonomy
+    _INTENT_TO_CATEGORY = INTENT_CATEGORIES
 
     @classmethod
     def resolve(cls, intent: PlaceIntent) -> str:
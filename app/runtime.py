@@ -0,0 +1,57 @@
+# app/runtime.py
+"""
+Bridge between the synchronous public API and the async turn pipeline.
+
+Sync callers (CLI, scripts) run coroutines on a single long-lived background
+event loop instead of calling asyncio.run() per turn. This keeps the
+loop-bound HTTP / OpenAI connection pools alive between turns.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=_loop.run_forever,
+                name="navan-event-loop",
+                daemon=True,
+            )
+            thread.start()
+        return _loop
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Raises:
+        RuntimeError: if called from inside a running event loop
+        (async callers must await the coroutine directly).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        if asyncio.iscoroutine(coro):
+            coro.close()
+        raise RuntimeError(
+            "run_sync() cannot be called from a running event loop; "
+            "await the async API instead."
+        )
+
+    future = asyncio.run_coroutine_threadsafe(coro, _get_background_loop())
+    return future.result()
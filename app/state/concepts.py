@@ -1,23 +1,2 @@
-# Canonical preference vocabulary
-PREFERENCE_SYNONYMS = {
-    "museum": {
-        "museum", "museums", "gallery", "galleries", "exhibition",
-        "art museum", "history museum"
-    },
-    "history": {
-        "history", "historical", "ancient", "ruins",
-        "roman", "medieval", "heritage"
-    },
-    "art": {
-        "art", "painting", "sculpture", "modern art"
-    },
-    "food": {
-        "food", "restaurants", "cuisine", "local food"
-    },
-    "park": {
-        "park", "parks", "garden", "nature", "green"
-    },
-    "sightseeing": {
-        "sightseeing", "landmarks", "highlights", "must see"
-    },
-}
+# Canonical preference vocabulary (defined once in app.taxonomy)
+from app.taxonomy import PREFERENCE_SYNONYMS  # noqa: F401
@@ -1,36 +1,52 @@
 # app/state/conversation_state.py
 from __future__ import annotations
 
+import struct
+import sys
+import time
+import zlib
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from typing import Optional, List, Dict, Any, Iterable
+from datetime import datetime, timedelta
+
+from app.taxonomy import PREFERENCE_MATCHER, PREFERENCE_SYNONYMS, PREFERENCES
 
 # ======================================================
-# Canonical preference vocabulary
+# Canonical preference vocabulary (see app.taxonomy)
 # ======================================================
 
-PREFERENCE_SYNONYMS = {
-    "museum": {
-        "museum", "museums", "gallery", "galleries", "exhibition",
-        "art museum", "history museum",
-    },
-    "history": {
-        "history", "historical", "ancient", "ruins",
-        "roman", "medieval", "heritage",
-    },
-    "art": {
-        "art", "painting", "sculpture", "modern art",
-    },
-    "food": {
-        "food", "restaurant", "restaurants", "cuisine", "local food",
-    },
-    "park": {
-        "park", "parks", "garden", "nature", "green",
-    },
-    "sightseeing": {
-        "sightseeing", "landmarks", "highlights", "must see",
-    },
-}
+# One bit per canonical preference (in-memory set operations only)
+PREFERENCE_BITS = {canonical: 1 << i for i, canonical in enumerate(PREFERENCES)}
+
+
+def preference_mask(preferences: Iterable[str]) -> int:
+    mask = 0
+    for pref in preferences:
+        bit = PREFERENCE_BITS.get(pref)
+        if bit is None:
+            for canonical in normalize_preferences([pref]):
+                mask |= PREFERENCE_BITS[canonical]
+        else:
+            mask |= bit
+    return mask
+
+
+def preferences_from_mask(mask: int) -> List[str]:
+    return [canonical for canonical, bit in PREFERENCE_BITS.items() if mask & bit]
+
+
+def merge_preferences(current: Iterable[str], new: Iterable[str] = ()) -> List[str]:
+    """
+    Canonical forms of current followed by those of new that it lacks
+    (insertion order, no duplicates, interned).
+    """
+    merged: List[str] = []
+    for pref in (*current, *new):
+        if not isinstance(pref, str):
+            continue
+        canonicals = [pref] if pref in PREFERENCE_BITS else normalize_preferences([pref])
+        merged.extend(sys.intern(c) for c in canonicals if c not in merged)
+    return merged
 
 
 def normalize_preferences(raw_terms: List[str]) -> List[str]:
@@ -43,21 +59,77 @@ def normalize_preferences(raw_terms: List[str]) -> List[str]:
     for term in raw_terms:
         if not isinstance(term, str):
             continue
+        normalized.update(PREFERENCE_MATCHER.match(term))
 
-        t = term.lower().strip()
-
-        for canonical, synonyms in PREFERENCE_SYNONYMS.items():
-            if canonical in t or any(s in t for s in synonyms):
-                normalized.add(canonical)
-
-    return list(normalized)
+    return [canonical for canonical in PREFERENCES if canonical in normalized]
 
 
 # ======================================================
 # Conversation State
 # ======================================================
 
-@dataclass
+def _intern(value: Optional[str]) -> Optional[str]:
+    # Many sessions name the same few cities; share one string object
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# version, flags, vocabulary size, vocabulary id, turn count, goal
+# confidence, latitude, longitude, updated_at; then the string fields
+# and the preferences in order (u8 count, u8 indexes into PREFERENCES)
+_STATE_HEADER = struct.Struct("<BBBIIdddd")
+_STATE_VERSION = 3
+_STR_LEN = struct.Struct("<H")
+_NONE_LEN = 0xFFFF
+_PREFERENCE_INDEX = {canonical: i for i, canonical in enumerate(PREFERENCES)}
+
+
+
+def _prefix_ids(keys) -> List[int]:
+    """
+    CRC32 of the first n keys, for every n (index 0: no keys).
+    """
+    ids = [0]
+    for key in keys:
+        ids.append(zlib.crc32((key + "\n").encode("utf-8"), ids[-1]))
+    return ids
+
+
+# Preference indexes only mean something under the vocabulary they were
+# written with (NAVAN_PREFERENCE_VOCAB can change it). A state records
+# the vocabulary size and the CRC32 of its keys, and loads as long as
+# the current vocabulary starts with those keys: appending keeps stored
+# states valid, any other change invalidates them.
+_VOCABULARY_SIZE = len(PREFERENCES)
+_VOCABULARY_IDS = _prefix_ids(PREFERENCES)
+
+
+def _truncate_utf8(value: str, limit: int) -> bytes:
+    data = value.encode("utf-8")
+    if len(data) <= limit:
+        return data
+    # Cut on a character boundary so the stored bytes still decode
+    return data[:limit].decode("utf-8", errors="ignore").encode("utf-8")
+
+# last_updated is a naive UTC datetime (as datetime.utcnow() was)
+_EPOCH = datetime(1970, 1, 1)
+
+_FLAG_AWAITING = 1
+_FLAG_LATITUDE = 2
+_FLAG_LONGITUDE = 4
+
+# Optional string fields, in serialization order
+_STRING_FIELDS = (
+    "user_goal",
+    "subject_name",
+    "subject_type",
+    "city",
+    "country",
+    "last_executed_action",
+    "pending_action",
+)
+
+
+@dataclass(slots=True)
 class ConversationState:
     """
     Short-term, structured conversational state.
@@ -69,6 +141,13 @@ class ConversationState:
     - NEVER decides flow
 
     All decisions belong to the Orchestrator.
+
+    The representation is kept compact (one per active session):
+    slotted, preferences as a list of interned canonical names (in
+    the order the user gave them), an epoch timestamp and interned
+    city/country strings.
+    to_bytes() / from_bytes() give a small binary form for swapping
+    sessions to an external store.
     """
 
     # =========================
@@ -115,6 +194,10 @@ class ConversationState:
     # =========================
 
     preferences: List[str] = field(default_factory=list)
+    """
+    Canonical preferences in insertion order. Synonyms passed to the
+    constructor or update_from_extraction are normalized.
+    """
 
     # =========================
     # System control (internal)
@@ -135,7 +218,115 @@ class ConversationState:
     # =========================
 
     turn_count: int = 0
-    last_updated: datetime = field(default_factory=datetime.utcnow)
+    updated_at: float = field(default_factory=time.time)
+    """
+    Epoch seconds of the last update (see last_updated).
+    """
+
+    def __post_init__(self) -> None:
+        self.city = _intern(self.city)
+        self.country = _intern(self.country)
+        self.preferences = merge_preferences(self.preferences)
+
+    # ==================================================
+    # Compact fields
+    # ==================================================
+
+    @property
+    def preference_mask(self) -> int:
+        """
+        Bitmask over PREFERENCE_BITS (order-free, for set operations).
+        """
+        return preference_mask(self.preferences)
+
+    @preference_mask.setter
+    def preference_mask(self, mask: int) -> None:
+        self.preferences = preferences_from_mask(mask)
+
+    @property
+    def last_updated(self) -> datetime:
+        return _EPOCH + timedelta(seconds=self.updated_at)
+
+    @last_updated.setter
+    def last_updated(self, value: datetime) -> None:
+        self.updated_at = (value - _EPOCH).total_seconds()
+
+    # ==================================================
+    # Serialization
+    # ==================================================
+
+    def to_bytes(self) -> bytes:
+        flags = (
+            (_FLAG_AWAITING if self.awaiting_confirmation else 0)
+            | (_FLAG_LATITUDE if self.latitude is not None else 0)
+            | (_FLAG_LONGITUDE if self.longitude is not None else 0)
+        )
+        parts = [_STATE_HEADER.pack(
+            _STATE_VERSION,
+            flags,
+            _VOCABULARY_SIZE,
+            _VOCABULARY_IDS[_VOCABULARY_SIZE],
+            self.turn_count,
+            self.goal_confidence,
+            self.latitude if self.latitude is not None else 0.0,
+            self.longitude if self.longitude is not None else 0.0,
+            self.updated_at,
+        )]
+
+        for name in _STRING_FIELDS:
+            value = getattr(self, name)
+            if value is None:
+                parts.append(_STR_LEN.pack(_NONE_LEN))
+            else:
+                data = _truncate_utf8(value, _NONE_LEN - 1)
+                parts.append(_STR_LEN.pack(len(data)))
+                parts.append(data)
+
+        preferences = merge_preferences(self.preferences)
+        parts.append(bytes([len(preferences)]))
+        parts.append(bytes(_PREFERENCE_INDEX[p] for p in preferences))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ConversationState":
+        (
+            version, flags, vocabulary_size, vocabulary_id, turn_count, goal_confidence,
+            latitude, longitude, updated_at,
+        ) = _STATE_HEADER.unpack_from(data, 0)
+        if version != _STATE_VERSION:
+            raise ValueError(f"Unsupported ConversationState version {version}")
+        if (
+            vocabulary_size >= len(_VOCABULARY_IDS)
+            or _VOCABULARY_IDS[vocabulary_size] != vocabulary_id
+        ):
+            raise ValueError(
+                "ConversationState was serialized with a different preference vocabulary"
+            )
+
+        offset = _STATE_HEADER.size
+        strings = {}
+        for name in _STRING_FIELDS:
+            (length,) = _STR_LEN.unpack_from(data, offset)
+            offset += _STR_LEN.size
+            if length == _NONE_LEN:
+                strings[name] = None
+            else:
+                strings[name] = bytes(data[offset:offset + length]).decode("utf-8")
+                offset += length
+
+        count = data[offset]
+        preferences = [PREFERENCES[i] for i in data[offset + 1:offset + 1 + count]]
+
+        return cls(
+            goal_confidence=goal_confidence,
+            latitude=latitude if flags & _FLAG_LATITUDE else None,
+            longitude=longitude if flags & _FLAG_LONGITUDE else None,
+            preferences=preferences,
+            awaiting_confirmation=bool(flags & _FLAG_AWAITING),
+            turn_count=turn_count,
+            updated_at=updated_at,
+            **strings,
+        )
 
     # ==================================================
     # Update logic (from extraction)
@@ -186,23 +377,23 @@ class ConversationState:
         # -------------------------------------------------
 
         if data.get("city"):
-            self.city = data["city"]
+            self.city = _intern(data["city"])
 
         if data.get("country"):
-            self.country = data["country"]
+            self.country = _intern(data["country"])
 
         if data.get("current_location"):
-            self.city = data["current_location"]
+            self.city = _intern(data["current_location"])
 
         location = data.get("location")
         if isinstance(location, dict):
             if location.get("city"):
-                self.city = location["city"]
+                self.city = _intern(location["city"])
             if location.get("country"):
-                self.country = location["country"]
+                self.country = _intern(location["country"])
 
         if isinstance(location, str):
-            self.city = location
+            self.city = _intern(location)
 
         if data.get("latitude") is not None:
             self.latitude = data["latitude"]
@@ -238,11 +429,7 @@ class ConversationState:
             if isinstance(rec_type, str):
                 raw_prefs.append(rec_type)
 
-        normalized = normalize_preferences(raw_prefs)
-
-        for pref in normalized:
-            if pref not in self.preferences:
-                self.preferences.append(pref)
+        self.preferences = merge_preferences(self.preferences, raw_prefs)
 
         if self.preferences and not self.user_goal:
             self.user_goal = "discover_attractions"
@@ -252,7 +439,7 @@ class ConversationState:
         # 5. Timestamp
         # -------------------------------------------------
 
-        self.last_updated = datetime.utcnow()
+        self.updated_at = time.time()
 
     # ==================================================
     # System helpers
@@ -260,7 +447,7 @@ class ConversationState:
 
     def increment_turn(self) -> None:
         self.turn_count += 1
-        self.last_updated = datetime.utcnow()
+        self.updated_at = time.time()
 
     def mark_proposal(self, action: str) -> None:
         self.pending_action = action
@@ -0,0 +1,180 @@
+# app/state/preference_matcher.py
+"""
+Single-pass preference matcher.
+
+Every synonym in the vocabulary is compiled once into an Aho–Corasick
+automaton over words (not characters), so matching a message costs one
+pass over its words no matter how large the vocabulary is:
+
+- matches respect word boundaries ("art" does not match "party")
+- words are compared in a light singular form, so plurals match
+  ("galleries" -> "gallery", "parks" -> "park"); the singular and
+  plural spellings of every vocabulary word are precomputed, so the
+  scan itself is one dict lookup per word
+- multi-word synonyms ("modern art", "must see") match as phrases,
+  and overlapping matches are all reported
+"""
+from __future__ import annotations
+
+import os
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import yaml
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def singular(word: str) -> str:
+    """
+    Light English singularization (the form vocabulary words are stored in).
+    """
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def plural(word: str) -> str:
+    if word.endswith("y") and len(word) > 2 and word[-2] not in "aeiou":
+        return word[:-1] + "ies"
+    if word.endswith(("s", "x", "ch", "sh")):
+        return word + "es"
+    return word + "s"
+
+
+def words(text: str) -> List[str]:
+    return [singular(w) for w in _WORD_RE.findall(text.casefold())]
+
+
+def load_vocabulary(path: str) -> Dict[str, List[str]]:
+    """
+    Read a {canonical: [synonyms]} YAML file (key order is kept).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    return {str(key): [str(s) for s in (synonyms or [])] for key, synonyms in data.items()}
+
+
+def merge_vocabularies(*vocabularies: Mapping[str, Iterable[str]]) -> Dict[str, List[str]]:
+    merged: Dict[str, List[str]] = {}
+    for vocabulary in vocabularies:
+        for canonical, synonyms in vocabulary.items():
+            entries = merged.setdefault(canonical, [])
+            entries.extend(s for s in synonyms if s not in entries)
+    return merged
+
+
+class PreferenceMatcher:
+    """
+    Maps free text to canonical preferences.
+
+        matcher = PreferenceMatcher({"art": ["art", "modern art"]})
+        matcher.match("Modern ART galleries")  # ["art"]
+    """
+
+    def __init__(self, vocabulary: Mapping[str, Iterable[str]]):
+        self.canonical: Tuple[str, ...] = tuple(vocabulary)
+
+        # Spelling in text -> the singular form used in the trie
+        self._forms: Dict[str, str] = {}
+
+        # Trie over words: per state, word -> next state
+        self._goto: List[Dict[str, int]] = [{}]
+        # Per state, indexes into self.canonical of every pattern ending here
+        self._out: List[Set[int]] = [set()]
+        self._fail: List[int] = [0]
+
+        for index, canonical in enumerate(self.canonical):
+            for phrase in {canonical, *vocabulary[canonical]}:
+                self._add(words(phrase), index)
+        self._build_links()
+
+    @classmethod
+    def from_yaml(cls, *paths: str) -> "PreferenceMatcher":
+        return cls(merge_vocabularies(*(load_vocabulary(p) for p in paths)))
+
+    def match(self, text: str) -> List[str]:
+        """
+        Canonical preferences mentioned in text, in vocabulary order.
+        """
+        found = set()
+        for index, _ in self._scan(text):
+            found.add(index)
+        return [self.canonical[i] for i in sorted(found)]
+
+    def find(self, text: str) -> List[Tuple[str, int]]:
+        """
+        Every match as (canonical, index of the last matched word).
+        """
+        return [(self.canonical[index], end) for index, end in self._scan(text)]
+
+    # ------------------------------------------------------------------
+    # Automaton
+    # ------------------------------------------------------------------
+
+    def _add(self, phrase: List[str], index: int) -> None:
+        if not phrase:
+            return
+        for word in phrase:
+            self._forms.update({word: word, plural(word): word})
+
+        state = 0
+        for word in phrase:
+            nxt = self._goto[state].get(word)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][word] = nxt
+                self._goto.append({})
+                self._out.append(set())
+                self._fail.append(0)
+            state = nxt
+        self._out[state].add(index)
+
+    def _build_links(self) -> None:
+        # Breadth-first, so a state's failure target is always finished first
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for word, nxt in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(word, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] |= self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def _scan(self, text: str) -> Iterable[Tuple[int, int]]:
+        goto, fail, out, forms = self._goto, self._fail, self._out, self._forms
+        state = 0
+        for position, word in enumerate(_WORD_RE.findall(text.casefold())):
+            word = forms.get(word)
+            if word is None:
+                # Not part of any synonym: no match can span this word
+                state = 0
+                continue
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for index in out[state]:
+                yield index, position
+
+
+# ----------------------------------------------------------------------
+# Default vocabulary
+# ----------------------------------------------------------------------
+
+DEFAULT_VOCABULARY_PATH = os.path.join(os.path.dirname(__file__), "preferences.yaml")
+
+
+def default_vocabulary() -> Dict[str, List[str]]:
+    """
+    preferences.yaml, plus the optional file named by
+    NAVAN_PREFERENCE_VOCAB.
+    """
+    paths = [DEFAULT_VOCABULARY_PATH]
+    extra: Optional[str] = os.getenv("NAVAN_PREFERENCE_VOCAB")
+    if extra:
+        paths.append(extra)
+    return merge_vocabularies(*(load_vocabulary(p) for p in paths))
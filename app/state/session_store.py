@@ -0,0 +1,363 @@
+# app/state/session_store.py
+"""
+External storage for ConversationState.
+
+A SessionStore persists each session as one record per state field
+plus a version number:
+
+- load(session_id) returns the state and the version it was read at
+- save(...) writes unconditionally
+- compare_and_swap(...) writes only if the stored version is still
+  the one the caller read (None on conflict)
+
+Writes are diffed: given the StoredSession a state was loaded from,
+only the fields that changed since then are passed to the backend. The
+in-memory and SQLite backends then write just those fields, so a turn
+that only bumps turn_count writes one field; the key-value backend
+trades that for atomicity and rewrites the whole record (see below).
+
+Backends:
+- InMemorySessionStore: dict in this process (tests / single worker)
+- SQLiteSessionStore: SQLite file in WAL mode, shared by the workers
+  on one host
+- KeyValueSessionStore: any key-value service with get / set / delete
+  and an atomic compare_and_set (Redis, etcd, memcached cas, ...);
+  each session is one value, so every write is a single atomic swap,
+  at the cost of a GET and a full-record rewrite per save.
+  DictKeyValue is a local stand-in with the same contract
+"""
+from __future__ import annotations
+
+import dataclasses
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Protocol, Tuple
+
+from app.state.conversation_state import ConversationState
+
+STATE_FIELDS = tuple(f.name for f in dataclasses.fields(ConversationState))
+
+# expected_version for writes that must not check the version
+ANY_VERSION = -1
+
+
+@dataclass
+class StoredSession:
+    state: ConversationState
+    version: int
+    fields: Dict[str, Any]
+    """
+    Field values as stored at `version` (the base for the next diff).
+    """
+
+
+def state_fields(state: ConversationState) -> Dict[str, Any]:
+    fields = {name: getattr(state, name) for name in STATE_FIELDS}
+    # Copy: preferences can be appended to in place after this snapshot
+    fields["preferences"] = list(fields["preferences"])
+    return fields
+
+
+def changed_fields(state: ConversationState, base: Optional[StoredSession]) -> Dict[str, Any]:
+    current = state_fields(state)
+    if base is None:
+        return current
+    return {name: value for name, value in current.items() if base.fields.get(name) != value}
+
+
+class SessionStore(ABC):
+    """
+    Base class: diffing and versioning on top of two backend primitives,
+    _read() and _write(). Backends also implement delete().
+    """
+
+    def load(self, session_id: str) -> Optional[StoredSession]:
+        record = self._read(session_id)
+        if record is None:
+            return None
+
+        version, fields = record
+        state = ConversationState(**{
+            name: value for name, value in fields.items() if name in STATE_FIELDS
+        })
+        return StoredSession(state, version, state_fields(state))
+
+    def save(
+        self,
+        session_id: str,
+        state: ConversationState,
+        base: Optional[StoredSession] = None,
+    ) -> StoredSession:
+        """
+        Write the fields changed since base (all fields without one).
+        """
+        stored = self._store(session_id, state, base, ANY_VERSION)
+        if stored is None:
+            # Backends skip the version check for ANY_VERSION
+            raise RuntimeError(f"{type(self).__name__} rejected an unconditional write")
+        return stored
+
+    def compare_and_swap(
+        self,
+        session_id: str,
+        state: ConversationState,
+        base: Optional[StoredSession],
+    ) -> Optional[StoredSession]:
+        """
+        Like save(), but only if the stored version is still base.version
+        (or, with base=None, if the session does not exist yet).
+        Returns None on conflict.
+        """
+        return self._store(session_id, state, base, base.version if base else 0)
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        ...
+
+    # ------------------------------------------------------------------
+    # Backend primitives
+    # ------------------------------------------------------------------
+
+    @abstractmethod
+    def _read(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        ...
+
+    @abstractmethod
+    def _write(
+        self,
+        session_id: str,
+        changes: Dict[str, Any],
+        expected_version: int,
+    ) -> Optional[int]:
+        """
+        Apply changes and bump the version; expected_version is the
+        version the record must have (0: absent, ANY_VERSION: don't
+        check). Returns the new version, or None on conflict.
+        """
+
+    def _store(
+        self,
+        session_id: str,
+        state: ConversationState,
+        base: Optional[StoredSession],
+        expected_version: int,
+    ) -> Optional[StoredSession]:
+        changes = changed_fields(state, base)
+        version = self._write(session_id, changes, expected_version)
+        if version is None:
+            return None
+
+        fields = dict(base.fields) if base is not None else {}
+        fields.update(changes)
+        return StoredSession(state, version, fields)
+
+
+# ----------------------------------------------------------------------
+# In-memory
+# ----------------------------------------------------------------------
+
+class InMemorySessionStore(SessionStore):
+    def __init__(self):
+        self._records: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._records.pop(session_id, None)
+
+    def _read(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        with self._lock:
+            record = self._records.get(session_id)
+            return (record[0], dict(record[1])) if record is not None else None
+
+    def _write(self, session_id: str, changes: Dict[str, Any], expected_version: int) -> Optional[int]:
+        with self._lock:
+            version, fields = self._records.get(session_id, (0, {}))
+            if expected_version != ANY_VERSION and version != expected_version:
+                return None
+            self._records[session_id] = (version + 1, {**fields, **changes})
+            return version + 1
+
+
+# ----------------------------------------------------------------------
+# SQLite (WAL)
+# ----------------------------------------------------------------------
+
+class SQLiteSessionStore(SessionStore):
+    """
+    One row per session (version) and one row per stored field.
+    WAL mode lets several worker processes read while one writes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " session_id TEXT PRIMARY KEY,"
+                " version INTEGER NOT NULL"
+                ")"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_fields ("
+                " session_id TEXT NOT NULL,"
+                " field TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " PRIMARY KEY (session_id, field)"
+                ")"
+            )
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM session_fields WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _read(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute(
+                    "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                rows = self._conn.execute(
+                    "SELECT field, value FROM session_fields WHERE session_id = ?", (session_id,)
+                ).fetchall()
+            finally:
+                self._conn.execute("COMMIT")
+
+        if row is None:
+            return None
+        return row[0], {field: json.loads(value) for field, value in rows}
+
+    def _write(self, session_id: str, changes: Dict[str, Any], expected_version: int) -> Optional[int]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                version = row[0] if row else 0
+                if expected_version != ANY_VERSION and version != expected_version:
+                    self._conn.execute("ROLLBACK")
+                    return None
+
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sessions (session_id, version) VALUES (?, ?)",
+                    (session_id, version + 1),
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO session_fields (session_id, field, value) VALUES (?, ?, ?)",
+                    [(session_id, name, json.dumps(value)) for name, value in changes.items()],
+                )
+                self._conn.execute("COMMIT")
+                return version + 1
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+
+
+# ----------------------------------------------------------------------
+# Generic key-value
+# ----------------------------------------------------------------------
+
+class KeyValueClient(Protocol):
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def compare_and_set(self, key: str, expected: Optional[bytes], value: bytes) -> bool:
+        """
+        Atomically set key to value if its current value is expected
+        (None: key absent).
+        """
+        ...
+
+
+class DictKeyValue:
+    """
+    In-process stand-in for a key-value service.
+    """
+
+    def __init__(self):
+        self.data: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self.data.get(key)
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self.data[key] = value
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self.data.pop(key, None)
+
+    def compare_and_set(self, key: str, expected: Optional[bytes], value: bytes) -> bool:
+        with self._lock:
+            if self.data.get(key) != expected:
+                return False
+            self.data[key] = value
+            return True
+
+
+class KeyValueSessionStore(SessionStore):
+    """
+    One key per session, "<prefix><id>", holding the version and every
+    stored field as a single JSON value. Saves still receive only the
+    changed fields, but merge them into the record and write it whole.
+
+    That key is the CAS point: a write reads the record, applies its
+    changes and swaps the whole value in one compare_and_set, so a
+    reader never sees a new version with old or half-written fields,
+    and concurrent writers cannot interleave.
+    """
+
+    def __init__(self, client: KeyValueClient, prefix: str = "navan:session:"):
+        self.client = client
+        self.prefix = prefix
+
+    def delete(self, session_id: str) -> None:
+        self.client.delete(self._key(session_id))
+
+    def _read(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        raw = self.client.get(self._key(session_id))
+        if raw is None:
+            return None
+        record = json.loads(raw)
+        return record["version"], record["fields"]
+
+    def _write(self, session_id: str, changes: Dict[str, Any], expected_version: int) -> Optional[int]:
+        key = self._key(session_id)
+
+        while True:
+            raw = self.client.get(key)
+            record = json.loads(raw) if raw is not None else {"version": 0, "fields": {}}
+            if expected_version != ANY_VERSION and record["version"] != expected_version:
+                return None
+
+            version = record["version"] + 1
+            value = json.dumps({"version": version, "fields": {**record["fields"], **changes}})
+            if self.client.compare_and_set(key, raw, value.encode()):
+                return version
+            # Lost the race: re-read (a versioned write will now see the conflict)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}{session_id}"
@@ -0,0 +1,184 @@
+# app/taxonomy.py
+"""
+Single source of truth for preferences, place intents and Geoapify
+categories.
+
+Everything is compiled once at import into frozen lookup tables:
+
+- PREFERENCE_SYNONYMS      canonical preference -> synonyms
+                           (app/state/preferences.yaml)
+- SYNONYM_PREFERENCES      synonym -> canonical preference
+- PREFERENCE_CATEGORIES    preference term -> Geoapify category
+- INTENT_CATEGORIES        PlaceIntent -> Geoapify category
+- TERM_CATEGORIES          any known term (canonical preference,
+                           synonym, intent value) -> Geoapify category
+- CATEGORY_ANCESTORS       category -> its parents, nearest first
+                           (entertainment.culture.gallery ->
+                           entertainment.culture, entertainment)
+- CATEGORY_DESCENDANTS     category -> known subcategories
+
+so every lookup is a single dict access.
+"""
+from __future__ import annotations
+
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, Mapping, Optional, Tuple
+
+from app.routing.place_intent import PlaceIntent
+from app.state.preference_matcher import PreferenceMatcher, default_vocabulary
+
+# ======================================================
+# Source tables
+# ======================================================
+
+# Preference term -> Geoapify category
+_PREFERENCE_CATEGORIES = {
+    "food": "catering.restaurant",
+    "culture": "entertainment.culture",
+    "museum": "entertainment.museum",
+    "art": "entertainment.culture.gallery",
+    "park": "leisure.park",
+    "nature": "natural",
+    "history": "tourism.attraction",
+    "sightseeing": "tourism.sights",
+}
+
+# Whitelist of intents that may reach the Places API
+_INTENT_CATEGORIES = {
+    PlaceIntent.SUPERMARKET: "commercial.supermarket",
+    PlaceIntent.RESTAURANT: "catering.restaurant",
+    PlaceIntent.CAFE: "catering.cafe",
+    PlaceIntent.PARK: "leisure.park",
+    PlaceIntent.MUSEUM: "entertainment.museum",
+    PlaceIntent.ATTRACTION: "tourism.attraction",
+    PlaceIntent.HOTEL: "accommodation.hotel",
+    PlaceIntent.BAR: "catering.bar",
+    PlaceIntent.SHOPPING: "commercial.shopping_mall",
+    PlaceIntent.PHARMACY: "commercial.health_and_beauty.pharmacy",
+}
+
+# ======================================================
+# Compiled tables
+# ======================================================
+
+
+def _freeze(mapping: Dict) -> Mapping:
+    return MappingProxyType(mapping)
+
+
+def _ancestors_of(category: str) -> Tuple[str, ...]:
+    parts = category.split(".")
+    return tuple(".".join(parts[:i]) for i in range(len(parts) - 1, 0, -1))
+
+
+PREFERENCE_SYNONYMS: Mapping[str, FrozenSet[str]] = _freeze({
+    canonical: frozenset(synonyms) | {canonical}
+    for canonical, synonyms in default_vocabulary().items()
+})
+
+PREFERENCES: Tuple[str, ...] = tuple(PREFERENCE_SYNONYMS)
+
+# ConversationState serializes preferences as a u8 count plus one u8
+# index into PREFERENCES each
+MAX_PREFERENCES = 255
+if len(PREFERENCES) > MAX_PREFERENCES:
+    raise ValueError(
+        f"Preference vocabulary has {len(PREFERENCES)} entries; "
+        f"at most {MAX_PREFERENCES} are supported"
+    )
+
+PREFERENCE_MATCHER = PreferenceMatcher(PREFERENCE_SYNONYMS)
+
+SYNONYM_PREFERENCES: Mapping[str, str] = _freeze({
+    synonym: canonical
+    for canonical, synonyms in reversed(list(PREFERENCE_SYNONYMS.items()))
+    for synonym in synonyms
+})
+
+PREFERENCE_CATEGORIES: Mapping[str, str] = _freeze(dict(_PREFERENCE_CATEGORIES))
+
+INTENT_CATEGORIES: Mapping[PlaceIntent, str] = _freeze(dict(_INTENT_CATEGORIES))
+
+
+def _term_categories() -> Dict[str, str]:
+    terms: Dict[str, str] = {}
+    # Lowest priority first: synonyms, then intents, then direct mappings
+    for synonym, canonical in SYNONYM_PREFERENCES.items():
+        if canonical in _PREFERENCE_CATEGORIES:
+            terms[synonym] = _PREFERENCE_CATEGORIES[canonical]
+    for intent, category in _INTENT_CATEGORIES.items():
+        terms[intent.value] = category
+    terms.update(_PREFERENCE_CATEGORIES)
+    return terms
+
+
+TERM_CATEGORIES: Mapping[str, str] = _freeze(_term_categories())
+
+_KNOWN_CATEGORIES = {
+    *_PREFERENCE_CATEGORIES.values(),
+    *_INTENT_CATEGORIES.values(),
+}
+_KNOWN_CATEGORIES |= {a for c in list(_KNOWN_CATEGORIES) for a in _ancestors_of(c)}
+
+CATEGORY_ANCESTORS: Mapping[str, Tuple[str, ...]] = _freeze({
+    category: _ancestors_of(category) for category in sorted(_KNOWN_CATEGORIES)
+})
+
+CATEGORY_DESCENDANTS: Mapping[str, FrozenSet[str]] = _freeze({
+    category: frozenset(
+        other for other, ancestors in CATEGORY_ANCESTORS.items() if category in ancestors
+    )
+    for category in CATEGORY_ANCESTORS
+})
+
+# ======================================================
+# Lookups
+# ======================================================
+
+
+def canonical_preference(term: str) -> Optional[str]:
+    """
+    Canonical preference for an exact term ("galleries" -> "museum").
+    For free text use PREFERENCE_MATCHER.
+    """
+    return SYNONYM_PREFERENCES.get(term.casefold().strip())
+
+
+def category_for(term: str) -> Optional[str]:
+    """
+    Geoapify category for a preference, synonym or intent value.
+    """
+    return TERM_CATEGORIES.get(term.casefold().strip())
+
+
+def categories_for(terms: Iterable[str]) -> Dict[str, str]:
+    """
+    {Geoapify category: term} for every term with a category
+    (first term wins when two share one).
+    """
+    categories: Dict[str, str] = {}
+    for term in terms:
+        category = category_for(term)
+        if category is not None:
+            categories.setdefault(category, term)
+    return categories
+
+
+def intent_category(intent: PlaceIntent) -> str:
+    """
+    Raises KeyError for intents outside the whitelist.
+    """
+    return INTENT_CATEGORIES[intent]
+
+
+def ancestors(category: str) -> Tuple[str, ...]:
+    known = CATEGORY_ANCESTORS.get(category)
+    return known if known is not None else _ancestors_of(category)
+
+
+def is_subcategory(category: str, parent: str) -> bool:
+    """
+    True if category lies strictly below parent
+    (entertainment.culture.gallery is below entertainment.culture).
+    """
+    return parent in ancestors(category)
@@ -0,0 +1,229 @@
+# app/tools/cache.py
+"""
+Response caches shared by the tools package.
+
+- TTLCache: in-memory LRU with per-entry TTL
+- SQLiteCache: optional on-disk store (JSON values)
+- TieredCache: memory in front of an optional disk store,
+  with hit/miss counters per namespace
+
+Values must be JSON-serializable to be stored on disk.
+A cached value may be None, so misses are reported with MISSING.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory LRU cache with per-entry expiry.
+
+    ttl=None means the entry never expires (it can still be evicted).
+    """
+
+    def __init__(self, maxsize: int = 1024, default_ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        value, _ = self.get_with_expiry(key)
+        return value
+
+    def get_with_expiry(self, key: str) -> Tuple[Any, Optional[float]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING, None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return MISSING, None
+
+            self._data.move_to_end(key)
+            return value, expires_at
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = ttl if ttl is not None else self.default_ttl
+        self.set_with_expiry(key, value, time.time() + ttl if ttl is not None else None)
+
+    def set_with_expiry(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        """
+        Snapshot of live (non-expired) entries, oldest first.
+        """
+        now = time.time()
+        with self._lock:
+            return [
+                (key, value)
+                for key, (value, expires_at) in self._data.items()
+                if expires_at is None or expires_at > now
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    Persistent key/value store backed by a single SQLite file.
+    Expired rows are ignored on read and purged lazily.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL"
+                ")"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Any:
+        value, _ = self.get_with_expiry(key)
+        return value
+
+    def get_with_expiry(self, key: str) -> Tuple[Any, Optional[float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                return MISSING, None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= time.time():
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return MISSING, None
+
+        return json.loads(value), expires_at
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set_with_expiry(key, value, time.time() + ttl if ttl is not None else None)
+
+    def set_with_expiry(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, payload, expires_at),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """
+    In-memory LRU in front of an optional persistent store.
+
+    Disk hits are promoted into memory with their remaining TTL.
+    Hit/miss counters are kept overall and per namespace
+    (e.g. one namespace per API endpoint).
+    """
+
+    def __init__(self, memory: Optional[TTLCache] = None, disk: Optional[SQLiteCache] = None):
+        self.memory = memory if memory is not None else TTLCache()
+        self.disk = disk
+        self.stats = CacheStats()
+        self.namespace_stats: Dict[str, CacheStats] = {}
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str, namespace: str = "default") -> Any:
+        value, _ = self.memory.get_with_expiry(key)
+
+        if value is MISSING and self.disk is not None:
+            value, expires_at = self.disk.get_with_expiry(key)
+            if value is not MISSING:
+                self.memory.set_with_expiry(key, value, expires_at)
+
+        self._record(namespace, hit=value is not MISSING)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        self.memory.set_with_expiry(key, value, expires_at)
+        if self.disk is not None:
+            self.disk.set_with_expiry(key, value, expires_at)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+        with self._stats_lock:
+            self.stats = CacheStats()
+            self.namespace_stats = {}
+
+    def _record(self, namespace: str, hit: bool) -> None:
+        with self._stats_lock:
+            ns = self.namespace_stats.setdefault(namespace, CacheStats())
+            if hit:
+                self.stats.hits += 1
+                ns.hits += 1
+            else:
+                self.stats.misses += 1
+                ns.misses += 1
@@ -1,16 +1,18 @@
 import os
-import requests
 from dotenv import load_dotenv
 from typing import List, Dict
 from pathlib import Path
 from datetime import datetime
 
+from app.tools import rate_limit, transport
+from app.tools.gazetteer import lookup_city
+
 load_dotenv(dotenv_path=Path(__file__).resolve().parents[2] / ".env")
 
 EVENTBRITE_API_KEY = os.getenv("EVENTBRITE_API_KEY")
 BASE_URL = "https://www.eventbriteapi.com/v3/events/search/"
 
-# Hard-coded city coordinates (minimal & reliable)
+# Hard-coded city coordinates, used when no offline gazetteer is installed
 CITY_COORDS = {
     "London": (51.5074, -0.1278),
     "New York": (40.7128, -74.0060),
@@ -29,11 +31,14 @@ def get_events_by_city(
     if not EVENTBRITE_API_KEY:
         raise ValueError("EVENTBRITE_API_KEY is not set")
 
-    if city not in CITY_COORDS:
+    match = lookup_city(city)
+    if match is not None:
+        lat, lon = match.lat, match.lon
+    elif city in CITY_COORDS:
+        lat, lon = CITY_COORDS[city]
+    else:
         return []
 
-    lat, lon = CITY_COORDS[city]
-
     headers = {
         "Authorization": f"Bearer {EVENTBRITE_API_KEY}"
     }
@@ -46,7 +51,12 @@ def get_events_by_city(
         "page_size": max_results,
     }
 
-    response = requests.get(
+    try:
+        rate_limit.acquire("eventbrite")
+    except rate_limit.RateLimitExceeded:
+        return []
+
+    response = transport.get(
         BASE_URL,
         headers=headers,
         params=params,
@@ -0,0 +1,379 @@
+# app/tools/gazetteer.py
+"""
+Offline city gazetteer.
+
+A compact binary index of world cities built from a GeoNames
+cities15000-style dump (see scripts/build_gazetteer.py). The file is
+memory-mapped and searched in place, so lookups cost a hash and a
+binary search instead of an HTTP round-trip.
+
+Every city is indexed under its normalized name, ASCII name and
+alternate names. When a name is ambiguous ("Paris", "Rome"), the most
+populous city wins unless a country (ISO code or name) is given.
+
+The index is optional: without a file, lookup_city() returns None and
+callers fall back to their remote geocoder.
+
+File layout (little-endian):
+    header    magic, version, counts and section offsets
+    cities    lat f64, lon f64, population u32, country code, name ref
+    hashes    u64 per indexed name, sorted
+    targets   u32 city index per hash (same order)
+    countries country code, name ref
+    strings   UTF-8 blob referenced by the name refs
+"""
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import re
+import struct
+import threading
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAGIC = b"NVGZ"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHIII5Q")
+_CITY = struct.Struct("<ddI2sHI")
+_COUNTRY = struct.Struct("<2sHI")
+
+DEFAULT_PATH = os.getenv(
+    "NAVAN_GAZETTEER_PATH",
+    str(Path(__file__).resolve().parents[2] / "data" / "gazetteer.bin"),
+)
+
+# Common country spellings missing from GeoNames' country names
+COUNTRY_ALIASES = {
+    "usa": "US",
+    "us": "US",
+    "america": "US",
+    "united states of america": "US",
+    "uk": "GB",
+    "england": "GB",
+    "scotland": "GB",
+    "wales": "GB",
+    "great britain": "GB",
+    "holland": "NL",
+    "czechia": "CZ",
+    "uae": "AE",
+    "korea": "KR",
+}
+
+
+@dataclass(frozen=True)
+class City:
+    name: str
+    lat: float
+    lon: float
+    country_code: str
+    country: Optional[str]
+    population: int
+
+
+# ------------------------------------------------------------------
+# Normalization
+# ------------------------------------------------------------------
+
+_PUNCT_RE = re.compile(r"[^\w\s]|_")
+
+
+def normalize(name: str) -> str:
+    """
+    Accent-, case- and punctuation-insensitive form of a place name
+    ("São Paulo" -> "sao paulo", "Frankfurt-am-Main" -> "frankfurt am main").
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(_PUNCT_RE.sub(" ", stripped.casefold()).split())
+
+
+def _name_hash(normalized: str) -> int:
+    digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+# ------------------------------------------------------------------
+# Reader
+# ------------------------------------------------------------------
+
+class Gazetteer:
+    """
+    Read-only view over a memory-mapped gazetteer file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic, version, _, self._n_cities, n_names, n_countries,
+            self._off_cities, off_hashes, off_targets, off_countries, self._off_strings,
+        ) = _HEADER.unpack_from(self._mmap, 0)
+
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a gazetteer index (version {VERSION})")
+
+        self._view = memoryview(self._mmap)
+        self._hashes = self._view[off_hashes:off_hashes + 8 * n_names].cast("Q")
+        self._targets = self._view[off_targets:off_targets + 4 * n_names].cast("I")
+
+        self._countries: Dict[str, str] = {}
+        for i in range(n_countries):
+            code, name_len, name_off = _COUNTRY.unpack_from(self._mmap, off_countries + i * _COUNTRY.size)
+            self._countries[code.decode("ascii")] = self._string(name_off, name_len)
+
+        self._country_codes = {normalize(name): code for code, name in self._countries.items()}
+        self._country_codes.update(COUNTRY_ALIASES)
+
+    def __len__(self) -> int:
+        return self._n_cities
+
+    def lookup(self, name: str, country: Optional[str] = None) -> Optional[City]:
+        """
+        Best match for a city name, or None.
+
+        Accepts "City, Country" strings; country may be an ISO code or
+        a country name. Without a country, the most populous match wins.
+        """
+        matches = self.candidates(name, country)
+        return matches[0] if matches else None
+
+    def candidates(self, name: str, country: Optional[str] = None) -> List[City]:
+        """
+        All cities indexed under name (most populous first),
+        optionally restricted to one country.
+        """
+        normalized = normalize(name)
+        indexes = self._indexes(normalized)
+
+        # "Paris, France" -> city "Paris" in country "France"
+        if not indexes and "," in name and country is None:
+            name, country = name.rsplit(",", 1)
+            indexes = self._indexes(normalize(name))
+
+        # Unknown country names are ignored rather than matching nothing
+        code = self.country_code(country) if country else None
+        if code is not None:
+            indexes = [i for i in indexes if self._city_country(i) == code]
+
+        return [self._city(i) for i in indexes]
+
+    def country_code(self, country: str) -> Optional[str]:
+        if len(country.strip()) == 2 and country.strip().upper() in self._countries:
+            return country.strip().upper()
+        return self._country_codes.get(normalize(country))
+
+    def close(self) -> None:
+        self._hashes.release()
+        self._targets.release()
+        self._view.release()
+        self._mmap.close()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _indexes(self, normalized: str) -> List[int]:
+        if not normalized:
+            return []
+
+        key = _name_hash(normalized)
+        pos = bisect_left(self._hashes, key)
+
+        indexes = []
+        while pos < len(self._hashes) and self._hashes[pos] == key:
+            indexes.append(self._targets[pos])
+            pos += 1
+        return indexes
+
+    def _city_country(self, index: int) -> str:
+        offset = self._off_cities + index * _CITY.size
+        return _CITY.unpack_from(self._mmap, offset)[3].decode("ascii")
+
+    def _city(self, index: int) -> City:
+        lat, lon, population, code, name_len, name_off = _CITY.unpack_from(
+            self._mmap, self._off_cities + index * _CITY.size
+        )
+        code = code.decode("ascii")
+        return City(
+            name=self._string(name_off, name_len),
+            lat=lat,
+            lon=lon,
+            country_code=code,
+            country=self._countries.get(code),
+            population=population,
+        )
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._off_strings + offset
+        return self._mmap[start:start + length].decode("utf-8")
+
+
+# ------------------------------------------------------------------
+# Builder
+# ------------------------------------------------------------------
+
+def read_cities(path: str) -> Iterable[Tuple[str, List[str], float, float, str, int]]:
+    """
+    Parse a GeoNames cities dump (tab-separated, cities15000.txt format).
+    Yields (name, aliases, lat, lon, country_code, population).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 15:
+                continue
+            aliases = [cols[2]] + [a for a in cols[3].split(",") if a]
+            yield (
+                cols[1],
+                aliases,
+                float(cols[4]),
+                float(cols[5]),
+                cols[8],
+                int(cols[14] or 0),
+            )
+
+
+def read_countries(path: str) -> Dict[str, str]:
+    """
+    Parse a GeoNames countryInfo.txt file into {ISO code: country name}.
+    """
+    countries = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) > 4 and len(cols[0]) == 2:
+                countries[cols[0]] = cols[4]
+    return countries
+
+
+def build_index(
+    cities_path: str,
+    out_path: str,
+    countries_path: Optional[str] = None,
+    with_aliases: bool = True,
+) -> int:
+    """
+    Build a gazetteer file from a cities dump (and optionally
+    countryInfo.txt for country-name disambiguation).
+    Returns the number of cities written.
+    """
+    # Most populous first, so the first hit for a name is the best guess
+    cities = sorted(read_cities(cities_path), key=lambda c: -c[5])
+    countries = read_countries(countries_path) if countries_path else {}
+
+    strings = bytearray()
+
+    def add_string(value: str) -> Tuple[int, int]:
+        data = value.encode("utf-8")[:0xFFFF]
+        offset = len(strings)
+        strings.extend(data)
+        return offset, len(data)
+
+    city_records = bytearray()
+    entries = set()
+    for index, (name, aliases, lat, lon, code, population) in enumerate(cities):
+        name_off, name_len = add_string(name)
+        city_records += _CITY.pack(
+            lat, lon, min(population, 0xFFFFFFFF),
+            code.encode("ascii")[:2].ljust(2), name_len, name_off,
+        )
+
+        names = [name] + (aliases if with_aliases else [])
+        for normalized in {normalize(n) for n in names}:
+            if normalized:
+                entries.add((_name_hash(normalized), index))
+
+    ordered = sorted(entries)
+
+    country_records = bytearray()
+    for code, name in sorted(countries.items()):
+        name_off, name_len = add_string(name)
+        country_records += _COUNTRY.pack(code.encode("ascii"), name_len, name_off)
+
+    off_cities = _align(_HEADER.size)
+    off_hashes = _align(off_cities + len(city_records))
+    off_targets = off_hashes + 8 * len(ordered)
+    off_countries = _align(off_targets + 4 * len(ordered))
+    off_strings = off_countries + len(country_records)
+
+    with open(out_path, "wb") as f:
+        f.write(_HEADER.pack(
+            MAGIC, VERSION, 0, len(cities), len(ordered), len(countries),
+            off_cities, off_hashes, off_targets, off_countries, off_strings,
+        ))
+        f.write(b"\0" * (off_cities - f.tell()))
+        f.write(city_records)
+        f.write(b"\0" * (off_hashes - f.tell()))
+        f.write(struct.pack(f"<{len(ordered)}Q", *(h for h, _ in ordered)))
+        f.write(struct.pack(f"<{len(ordered)}I", *(i for _, i in ordered)))
+        f.write(b"\0" * (off_countries - f.tell()))
+        f.write(country_records)
+        f.write(strings)
+
+    return len(cities)
+
+
+def _align(offset: int, size: int = 8) -> int:
+    return (offset + size - 1) // size * size
+
+
+# ------------------------------------------------------------------
+# Process-wide gazetteer
+# ------------------------------------------------------------------
+
+_gazetteer: Optional[Gazetteer] = None
+_loaded = False
+_lock = threading.Lock()
+
+
+def configure(path: Optional[str]) -> Optional[Gazetteer]:
+    """
+    Load the process-wide gazetteer from path (None disables it).
+    """
+    global _gazetteer, _loaded
+
+    with _lock:
+        old = _gazetteer
+        _gazetteer = Gazetteer(path) if path else None
+        _loaded = True
+
+    if old is not None:
+        old.close()
+    return _gazetteer
+
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """
+    The process-wide gazetteer (loaded lazily from DEFAULT_PATH),
+    or None if no index file is available.
+    """
+    global _gazetteer, _loaded
+
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                if os.path.exists(DEFAULT_PATH):
+                    _gazetteer = Gazetteer(DEFAULT_PATH)
+                _loaded = True
+    return _gazetteer
+
+
+def lookup_city(name: str, country: Optional[str] = None) -> Optional[City]:
+    """
+    Resolve a city offline. None if unknown or no index is installed.
+    """
+    gazetteer = get_gazetteer()
+    if gazetteer is None or not name:
+        return None
+    return gazetteer.lookup(name, country)
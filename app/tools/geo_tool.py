@@ -3,6 +3,8 @@
 from typing import Dict, Any, List
 
 from app.tools.geoapify_client import GeoapifyClient
+from app.tools.gazetteer import lookup_city
+from app.tools.poi_index import PlaceIndex
 from app.routing.place_intent import PlaceIntent
 from app.routing.place_category_resolver import PlaceCategoryResolver
 
@@ -17,10 +19,24 @@ class GeoTool:
     - nearby places lookup
 
     This is the single entry point for location-based queries.
+
+    Without injected geo_client / place_index it uses the process-wide
+    shared services, so it shares their client, rate limits and tiles.
     """
 
-    def __init__(self, geo_client: GeoapifyClient | None = None):
-        self.geo_client = geo_client or GeoapifyClient()
+    def __init__(
+        self,
+        geo_client: GeoapifyClient | None = None,
+        place_index: PlaceIndex | None = None,
+    ):
+        if geo_client is None and place_index is None:
+            # Imported here: the services module pulls in the LLM-backed agents
+            from app.orchestrator.services import get_shared_services
+
+            services = get_shared_services()
+            geo_client, place_index = services.geo_client, services.place_index
+        self.geo_client = geo_client or place_index.geo_client
+        self.place_index = place_index or PlaceIndex(self.geo_client)
 
     def get_places(
         self,
@@ -38,7 +54,8 @@ class GeoTool:
         lat, lon = self._geocode_city(city)
         category = PlaceCategoryResolver.resolve(intent)
 
-        places_response = self.geo_client.places(
+        # Served from the shared tile index; only missing tiles hit Geoapify
+        places_response = self.place_index.nearby(
             categories=category,
             lat=lat,
             lon=lon,
@@ -53,6 +70,10 @@ class GeoTool:
     # ------------------------
 
     def _geocode_city(self, city: str) -> tuple[float, float]:
+        match = lookup_city(city)
+        if match is not None:
+            return match.lat, match.lon
+
         geo = self.geo_client.geocode(city)
         features = geo.get("features", [])
 
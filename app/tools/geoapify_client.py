@@ -1,16 +1,119 @@
 # app/tools/geoapify_client.py
 
 import os
-import requests
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, Iterator, Tuple
 from dotenv import load_dotenv
 
+from app import tracing
+from app.tools import rate_limit, transport
+from app.tools.cache import MISSING, SQLiteCache, TieredCache, TTLCache
+from app.tools.singleflight import SingleFlight
+
 load_dotenv()
 
 # Geoapify API base URLs
 GEOAPIFY_GEOCODE_BASE_V1 = "https://api.geoapify.com/v1/geocode"
 GEOAPIFY_PLACES_BASE_V2 = "https://api.geoapify.com/v2"
 
+# Cache TTLs (seconds) per endpoint.
+# City geocodes practically never change; POI listings drift slowly.
+DEFAULT_CACHE_TTLS = {
+    "geocode/search": 30 * 24 * 3600,
+    "geocode/reverse": 30 * 24 * 3600,
+    "places": 24 * 3600,
+}
+
+_shared_cache: Optional[TieredCache] = None
+_page_cache: Optional[TieredCache] = None
+
+# Stores nothing: for callers that keep their own (smaller) copy
+_NO_CACHE = TieredCache(memory=TTLCache(maxsize=0))
+
+# Concurrent identical requests (same cache key) share one upstream call
+_flights = SingleFlight()
+
+
+def get_shared_cache() -> TieredCache:
+    """
+    Process-wide Geoapify response cache.
+
+    Configured from the environment:
+    - GEOAPIFY_CACHE_SIZE: in-memory LRU size (0 disables the memory tier)
+    - GEOAPIFY_CACHE_PATH: optional SQLite file for a persistent tier
+    """
+    global _shared_cache
+
+    if _shared_cache is None:
+        size = int(os.getenv("GEOAPIFY_CACHE_SIZE", "2048"))
+        path = os.getenv("GEOAPIFY_CACHE_PATH")
+        _shared_cache = TieredCache(
+            memory=TTLCache(maxsize=size),
+            disk=SQLiteCache(path) if path else None,
+        )
+
+    return _shared_cache
+
+
+def get_page_cache() -> TieredCache:
+    """
+    Process-wide cache for deep pages of iter_places() (offset > 0).
+
+    Kept apart from the shared cache so one long iteration cannot push
+    hot geocode / place entries out of its LRU. Memory only, sized by
+    GEOAPIFY_PAGE_CACHE_SIZE.
+    """
+    global _page_cache
+
+    if _page_cache is None:
+        _page_cache = TieredCache(
+            memory=TTLCache(maxsize=int(os.getenv("GEOAPIFY_PAGE_CACHE_SIZE", "64")))
+        )
+
+    return _page_cache
+
+
+def _cache_key(url: str, params: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Build a (endpoint, key) pair from a request.
+
+    The API key is excluded, strings are case/whitespace-normalized
+    and floats are rounded so equivalent queries share one entry.
+    """
+    endpoint = url.split("/v1/", 1)[-1].split("/v2/", 1)[-1]
+
+    parts = []
+    for name in sorted(params):
+        if name == "apiKey":
+            continue
+        value = params[name]
+        if isinstance(value, str):
+            value = " ".join(value.lower().split())
+        elif isinstance(value, float):
+            value = f"{value:.6f}"
+        parts.append(f"{name}={value}")
+
+    return endpoint, f"geoapify:{endpoint}?" + "&".join(parts)
+
+
+def normalize_feature(feature: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Flatten a Geoapify place feature into a small dict
+    (None if it has no point coordinates).
+    """
+    coords = feature.get("geometry", {}).get("coordinates", [])
+    if len(coords) != 2:
+        return None
+
+    props = feature.get("properties", {})
+    return {
+        "place_id": props.get("place_id"),
+        "name": props.get("name"),
+        "categories": props.get("categories", []),
+        "address": props.get("formatted"),
+        "lat": coords[1],
+        "lon": coords[0],
+    }
+
 
 class GeoapifyClient:
     """
@@ -21,15 +124,28 @@ class GeoapifyClient:
     - Handle API versioning (v1 geocode, v2 places)
     - Return raw JSON responses
 
+    Every endpoint has an async twin (`*_async`) with the same arguments.
+    Successful responses are cached (see DEFAULT_CACHE_TTLS).
+
     This client contains NO business logic.
     """
 
-    def __init__(self, api_key: Optional[str] = None, timeout: int = 10):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        timeout: int = 10,
+        cache: Optional[TieredCache] = None,
+        cache_ttls: Optional[Dict[str, float]] = None,
+        page_cache: Optional[TieredCache] = None,
+    ):
         self.api_key = api_key or os.getenv("GEOAPIFY_API_KEY")
         if not self.api_key:
             raise ValueError("GEOAPIFY_API_KEY is not set")
 
         self.timeout = timeout
+        self.cache = cache if cache is not None else get_shared_cache()
+        self.page_cache = page_cache if page_cache is not None else get_page_cache()
+        self.cache_ttls = {**DEFAULT_CACHE_TTLS, **(cache_ttls or {})}
 
     # ------------------------------------------------------------------
     # Geocoding (v1)
@@ -39,25 +155,37 @@ class GeoapifyClient:
         """
         Convert a place name into geographic coordinates.
         """
+        return self._get(*self._geocode_request(text, limit))
+
+    async def geocode_async(self, text: str, limit: int = 5) -> Dict[str, Any]:
+        return await self._get_async(*self._geocode_request(text, limit))
+
+    def reverse_geocode(self, lat: float, lon: float) -> Dict[str, Any]:
+        """
+        Convert coordinates into place details.
+        """
+        return self._get(*self._reverse_geocode_request(lat, lon))
+
+    async def reverse_geocode_async(self, lat: float, lon: float) -> Dict[str, Any]:
+        return await self._get_async(*self._reverse_geocode_request(lat, lon))
+
+    def _geocode_request(self, text: str, limit: int) -> Tuple[str, Dict[str, Any]]:
         url = f"{GEOAPIFY_GEOCODE_BASE_V1}/search"
         params = {
             "text": text,
             "limit": limit,
             "apiKey": self.api_key,
         }
-        return self._get(url, params)
+        return url, params
 
-    def reverse_geocode(self, lat: float, lon: float) -> Dict[str, Any]:
-        """
-        Convert coordinates into place details.
-        """
+    def _reverse_geocode_request(self, lat: float, lon: float) -> Tuple[str, Dict[str, Any]]:
         url = f"{GEOAPIFY_GEOCODE_BASE_V1}/reverse"
         params = {
             "lat": lat,
             "lon": lon,
             "apiKey": self.api_key,
         }
-        return self._get(url, params)
+        return url, params
 
     # ------------------------------------------------------------------
     # Places (v2)
@@ -85,10 +213,166 @@ class GeoapifyClient:
         Returns:
             Raw Geoapify JSON response.
         """
+        return self._get(
+            *self._places_request(categories, lat, lon, radius, limit, named_only)
+        )
+
+    async def places_async(
+        self,
+        categories: str,
+        lat: float,
+        lon: float,
+        radius: int = 3000,
+        limit: int = 10,
+        named_only: bool = True,
+    ) -> Dict[str, Any]:
+        return await self._get_async(
+            *self._places_request(categories, lat, lon, radius, limit, named_only)
+        )
+
+    def iter_places(
+        self,
+        categories: str,
+        lat: float,
+        lon: float,
+        radius: int = 3000,
+        page_size: int = 100,
+        max_results: Optional[int] = None,
+        named_only: bool = True,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily page through all places in a circle (offset paging).
+
+        Yields normalized features (see normalize_feature). The next page
+        is only requested when the caller consumes the current one, so
+        stopping early (break / max_results) saves the remaining requests
+        and only one page is held in memory at a time.
+
+        Pages after the first are cached in page_cache, not the shared
+        cache.
+        """
+        for url, params in self._page_requests(categories, lat, lon, radius, page_size, max_results, named_only):
+            features = self._get(url, params, self._page_cache_for(params)).get("features", [])
+            yield from self._page_items(features)
+            if len(features) < params["limit"]:
+                return
+
+    async def iter_places_async(
+        self,
+        categories: str,
+        lat: float,
+        lon: float,
+        radius: int = 3000,
+        page_size: int = 100,
+        max_results: Optional[int] = None,
+        named_only: bool = True,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async counterpart of iter_places().
+        """
+        for url, params in self._page_requests(categories, lat, lon, radius, page_size, max_results, named_only):
+            features = (
+                await self._get_async(url, params, self._page_cache_for(params))
+            ).get("features", [])
+            for item in self._page_items(features):
+                yield item
+            if len(features) < params["limit"]:
+                return
+
+    def _page_requests(
+        self,
+        categories: str,
+        lat: float,
+        lon: float,
+        radius: int,
+        page_size: int,
+        max_results: Optional[int],
+        named_only: bool,
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        offset = 0
+        while max_results is None or offset < max_results:
+            limit = page_size if max_results is None else min(page_size, max_results - offset)
+            url, params = self._places_request(categories, lat, lon, radius, limit, named_only)
+            if offset:
+                params["offset"] = offset
+            yield url, params
+            offset += limit
+
+    def _page_cache_for(self, params: Dict[str, Any]) -> TieredCache:
+        return self.page_cache if params.get("offset") else self.cache
+
+    @staticmethod
+    def _page_items(features) -> Iterator[Dict[str, Any]]:
+        for feature in features:
+            item = normalize_feature(feature)
+            if item is not None:
+                yield item
+
+    def places_in_rect(
+        self,
+        categories: str,
+        rect: Tuple[float, float, float, float],
+        limit: int = 500,
+        named_only: bool = True,
+        use_cache: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Fetch places inside a bounding box.
+
+        Args:
+            rect: (lon1, lat1, lon2, lat2) – west, south, east, north
+            use_cache: False skips the response cache entirely
+                (the POI tile index stores its own compact copy)
+
+        Returns:
+            Raw Geoapify JSON response.
+        """
+        return self._get(
+            *self._places_filter_request(
+                categories, "rect:" + ",".join(f"{v:.6f}" for v in rect), limit, named_only
+            ),
+            None if use_cache else _NO_CACHE,
+        )
+
+    async def places_in_rect_async(
+        self,
+        categories: str,
+        rect: Tuple[float, float, float, float],
+        limit: int = 500,
+        named_only: bool = True,
+        use_cache: bool = True,
+    ) -> Dict[str, Any]:
+        return await self._get_async(
+            *self._places_filter_request(
+                categories, "rect:" + ",".join(f"{v:.6f}" for v in rect), limit, named_only
+            ),
+            None if use_cache else _NO_CACHE,
+        )
+
+    def _places_request(
+        self,
+        categories: str,
+        lat: float,
+        lon: float,
+        radius: int,
+        limit: int,
+        named_only: bool,
+    ) -> Tuple[str, Dict[str, Any]]:
+        return self._places_filter_request(
+            categories, f"circle:{lon},{lat},{radius}", limit, named_only
+        )
+
+    def _places_filter_request(
+        self,
+        categories: str,
+        filter: str,
+        limit: int,
+        named_only: bool,
+    ) -> Tuple[str, Dict[str, Any]]:
         url = f"{GEOAPIFY_PLACES_BASE_V2}/places"
         params = {
             "categories": categories,
-            "filter": f"circle:{lon},{lat},{radius}",
+            "filter": filter,
             "limit": limit,
             "apiKey": self.api_key,
         }
@@ -96,18 +380,80 @@ class GeoapifyClient:
         if named_only:
             params["conditions"] = "named"
 
-        return self._get(url, params)
+        return url, params
 
     # ------------------------------------------------------------------
     # Internal HTTP helper
     # ------------------------------------------------------------------
 
-    def _get(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        response = requests.get(url, params=params, timeout=self.timeout)
+    def _get(
+        self, url: str, params: Dict[str, Any], cache: Optional[TieredCache] = None
+    ) -> Dict[str, Any]:
+        cache = cache if cache is not None else self.cache
+        endpoint, key = _cache_key(url, params)
+
+        with tracing.span(f"geoapify.{endpoint}") as span:
+            cached = cache.get(key, namespace=endpoint)
+            span.set(cache_hit=cached is not MISSING)
+            if cached is not MISSING:
+                return cached
+
+            return _flights.do(key, lambda: self._fetch(url, params, key, endpoint, cache))
+
+    def _fetch(
+        self, url: str, params: Dict[str, Any], key: str, endpoint: str, cache: TieredCache
+    ) -> Dict[str, Any]:
+        rate_limit.acquire("geoapify")
+        response = transport.get(url, params=params, timeout=self.timeout)
+
+        if response.status_code == 429:
+            # Still limited after the transport's retries: back every caller
+            # off and queue this request once more behind the limiter
+            rate_limit.throttle("geoapify", rate_limit.retry_after(response.headers))
+            rate_limit.acquire("geoapify")
+            response = transport.get(url, params=params, timeout=self.timeout)
 
         if not response.ok:
             raise RuntimeError(
                 f"Geoapify API error {response.status_code}: {response.text}"
             )
 
-        return response.json()
+        data = response.json()
+        cache.set(key, data, ttl=self.cache_ttls.get(endpoint))
+        return data
+
+    async def _get_async(
+        self, url: str, params: Dict[str, Any], cache: Optional[TieredCache] = None
+    ) -> Dict[str, Any]:
+        cache = cache if cache is not None else self.cache
+        endpoint, key = _cache_key(url, params)
+
+        with tracing.span(f"geoapify.{endpoint}") as span:
+            cached = cache.get(key, namespace=endpoint)
+            span.set(cache_hit=cached is not MISSING)
+            if cached is not MISSING:
+                return cached
+
+            return await _flights.do_async(
+                key, lambda: self._fetch_async(url, params, key, endpoint, cache)
+            )
+
+    async def _fetch_async(
+        self, url: str, params: Dict[str, Any], key: str, endpoint: str, cache: TieredCache
+    ) -> Dict[str, Any]:
+        await rate_limit.acquire_async("geoapify")
+        response = await transport.get_async(url, params=params, timeout=self.timeout)
+
+        if response.status_code == 429:
+            rate_limit.throttle("geoapify", rate_limit.retry_after(response.headers))
+            await rate_limit.acquire_async("geoapify")
+            response = await transport.get_async(url, params=params, timeout=self.timeout)
+
+        if response.is_error:
+            raise RuntimeError(
+                f"Geoapify API error {response.status_code}: {response.text}"
+            )
+
+        data = response.json()
+        cache.set(key, data, ttl=self.cache_ttls.get(endpoint))
+        return data
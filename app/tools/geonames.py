@@ -4,6 +4,9 @@ import requests
 from dotenv import load_dotenv
 from typing import List, Dict, Optional
 
+from app.tools import rate_limit, transport
+from app.tools.gazetteer import lookup_city
+
 load_dotenv()
 
 GEONAMES_USERNAME = os.getenv("GEONAMES_USERNAME")
@@ -12,9 +15,14 @@ BASE_URL = "http://api.geonames.org/searchJSON"
 
 def get_city_coordinates(city: str) -> Optional[Dict[str, float]]:
     """
-    Resolve a city name to its geographic coordinates using GeoNames.
+    Resolve a city name to its geographic coordinates.
+    Uses the offline gazetteer when possible, the GeoNames API otherwise.
     Returns a dict with lat/lon or None if not found.
     """
+    match = lookup_city(city)
+    if match is not None:
+        return {"lat": match.lat, "lon": match.lon}
+
     if not GEONAMES_USERNAME:
         raise ValueError("GEONAMES_USERNAME is not set in environment variables")
 
@@ -26,8 +34,9 @@ def get_city_coordinates(city: str) -> Optional[Dict[str, float]]:
     }
 
     try:
-        response = requests.get(BASE_URL, params=params, timeout=5)
-    except requests.RequestException:
+        rate_limit.acquire("geonames")
+        response = transport.get(BASE_URL, params=params, timeout=5)
+    except (requests.RequestException, rate_limit.RateLimitExceeded):
         return None
 
     if response.status_code != 200:
@@ -74,8 +83,9 @@ def get_points_of_interest(city: str, max_results: int = 5) -> List[Dict]:
     }
 
     try:
-        response = requests.get(BASE_URL, params=params, timeout=5)
-    except requests.RequestException:
+        rate_limit.acquire("geonames")
+        response = transport.get(BASE_URL, params=params, timeout=5)
+    except (requests.RequestException, rate_limit.RateLimitExceeded):
         return []
 
     if response.status_code != 200:
@@ -0,0 +1,342 @@
+# app/tools/poi_index.py
+"""
+Local spatial index of Geoapify places.
+
+Places are stored per category in fixed lat/lon grid tiles
+(TILE_DEG degrees, ~5 km). A nearby query is answered from the tiles
+its circle overlaps: tiles already in the store are read locally, and
+only missing tiles are fetched from Geoapify (one rect query per
+category and tile). Two users a few hundred meters apart therefore
+share the same tiles instead of issuing separate circle queries.
+
+Coverage is tracked per (category, named_only, tile); a tile is
+covered once it has been fetched and expires with the places TTL.
+Tiles hold compact features (see compact_feature): point geometry and
+only the properties the index, the ranker and GeoTool callers read;
+raw tile responses bypass the shared Geoapify response cache.
+
+Two cases are answered with a single circle query instead:
+- a cold query that would need more than TILE_FETCH_BUDGET tile
+  fetches (one circle request beats many rect requests queued behind
+  the Geoapify rate limit)
+- a query touching a dense tile: when Geoapify caps a tile at
+  TILE_LIMIT places its coverage is partial, so the tile is marked
+  dense rather than covered and never used to pick the nearest places
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app import tracing
+from app.ranking.attractions_ranker import POPULARITY_SIGNALS
+from app.tools.cache import MISSING, SQLiteCache, TieredCache, TTLCache
+from app.tools.geoapify_client import DEFAULT_CACHE_TTLS, GeoapifyClient
+
+TILE_DEG = float(os.getenv("POI_TILE_DEG", "0.05"))
+TILE_LIMIT = 500  # Geoapify's maximum page size
+TILE_TTL = DEFAULT_CACHE_TTLS["places"]
+TILE_FETCH_BUDGET = int(os.getenv("POI_TILE_FETCH_BUDGET", "4"))
+
+# Stored instead of a tile's features when Geoapify truncated it
+DENSE_TILE = "dense"
+
+# Feature properties kept in the tile store (Geoapify sends dozens)
+TILE_PROPERTIES = ("place_id", "name", "categories", "formatted", *POPULARITY_SIGNALS)
+
+EARTH_RADIUS_M = 6_371_000
+METERS_PER_DEG_LAT = 111_320
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="poi-index")
+
+_shared_store: Optional[TieredCache] = None
+
+
+def get_tile_store() -> TieredCache:
+    """
+    Process-wide tile store.
+
+    Configured from the environment:
+    - POI_INDEX_TILES: number of tiles kept in memory
+    - POI_INDEX_PATH: optional SQLite file for a persistent tier
+    """
+    global _shared_store
+
+    if _shared_store is None:
+        path = os.getenv("POI_INDEX_PATH")
+        _shared_store = TieredCache(
+            memory=TTLCache(maxsize=int(os.getenv("POI_INDEX_TILES", "4096"))),
+            disk=SQLiteCache(path) if path else None,
+        )
+
+    return _shared_store
+
+
+@dataclass(frozen=True)
+class Tile:
+    category: str
+    named_only: bool
+    ix: int
+    iy: int
+    size: float = TILE_DEG
+
+    @property
+    def key(self) -> str:
+        named = "named" if self.named_only else "all"
+        return f"poi:{self.size}:{self.category}:{named}:{self.ix}:{self.iy}"
+
+    @property
+    def rect(self) -> Tuple[float, float, float, float]:
+        """
+        (west, south, east, north)
+        """
+        return (
+            round(self.ix * self.size, 6),
+            round(self.iy * self.size, 6),
+            round((self.ix + 1) * self.size, 6),
+            round((self.iy + 1) * self.size, 6),
+        )
+
+
+def compact_feature(feature: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    A place feature reduced to point geometry and TILE_PROPERTIES
+    (plus the popularity signals under datasource.raw); None if it has
+    no point coordinates.
+    """
+    coords = feature.get("geometry", {}).get("coordinates", [])
+    if len(coords) != 2:
+        return None
+
+    props = feature.get("properties", {})
+    kept = {name: props[name] for name in TILE_PROPERTIES if name in props}
+    raw = props.get("datasource", {}).get("raw", {})
+    signals = {name: raw[name] for name in POPULARITY_SIGNALS if raw.get(name)}
+    if signals:
+        kept["datasource"] = {"raw": signals}
+
+    return {
+        "type": "Feature",
+        "properties": kept,
+        "geometry": {"type": "Point", "coordinates": [coords[0], coords[1]]},
+    }
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great-circle distance in meters.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def tiles_for(
+    category: str,
+    lat: float,
+    lon: float,
+    radius: float,
+    named_only: bool = True,
+    size: float = TILE_DEG,
+) -> List[Tile]:
+    """
+    Tiles overlapped by the bounding box of a circle (radius in meters).
+    """
+    dlat = radius / METERS_PER_DEG_LAT
+    dlon = dlat / max(math.cos(math.radians(lat)), 0.01)
+
+    return [
+        Tile(category, named_only, ix, iy, size)
+        for ix in range(math.floor((lon - dlon) / size), math.floor((lon + dlon) / size) + 1)
+        for iy in range(math.floor((lat - dlat) / size), math.floor((lat + dlat) / size) + 1)
+    ]
+
+
+class PlaceIndex:
+    """
+    Nearby-place lookups served from the tile store.
+
+    nearby() / nearby_async() take the same arguments as
+    GeoapifyClient.places() and return the same FeatureCollection
+    shape, with features sorted by distance from the center.
+    """
+
+    def __init__(
+        self,
+        geo_client: GeoapifyClient,
+        store: Optional[TieredCache] = None,
+        tile_deg: float = TILE_DEG,
+        fetch_budget: int = TILE_FETCH_BUDGET,
+    ):
+        self.geo_client = geo_client
+        self.store = store if store is not None else get_tile_store()
+        self.tile_deg = tile_deg
+        self.fetch_budget = fetch_budget
+
+    def nearby(
+        self,
+        categories: str,
+        lat: float,
+        lon: float,
+        radius: int = 3000,
+        limit: int = 10,
+        named_only: bool = True,
+    ) -> Dict[str, Any]:
+        with tracing.span("poi_index.nearby") as span:
+            tiles, loaded, missing, dense = self._plan(categories, lat, lon, radius, named_only)
+
+            if not dense and len(missing) <= self.fetch_budget:
+                # copy_context() keeps worker-thread spans attached to the current trace
+                futures = [
+                    _executor.submit(contextvars.copy_context().run, self._fetch_tile, tile)
+                    for tile in missing
+                ]
+                for tile, future in zip(missing, futures):
+                    loaded[tile] = future.result()
+                dense = any(features is None for features in loaded.values())
+
+            span.set(tiles=len(tiles), fetched_tiles=len(missing))
+            if dense or len(missing) > self.fetch_budget:
+                span.set(circle_fallback=True)
+                return self.geo_client.places(categories, lat, lon, radius, limit, named_only)
+            return self._select(loaded, lat, lon, radius, limit)
+
+    async def nearby_async(
+        self,
+        categories: str,
+        lat: float,
+        lon: float,
+        radius: int = 3000,
+        limit: int = 10,
+        named_only: bool = True,
+    ) -> Dict[str, Any]:
+        with tracing.span("poi_index.nearby") as span:
+            tiles, loaded, missing, dense = self._plan(categories, lat, lon, radius, named_only)
+
+            if not dense and len(missing) <= self.fetch_budget:
+                fetched = await asyncio.gather(*(self._fetch_tile_async(tile) for tile in missing))
+                loaded.update(zip(missing, fetched))
+                dense = any(features is None for features in fetched)
+
+            span.set(tiles=len(tiles), fetched_tiles=len(missing))
+            if dense or len(missing) > self.fetch_budget:
+                span.set(circle_fallback=True)
+                return await self.geo_client.places_async(
+                    categories, lat, lon, radius, limit, named_only
+                )
+            return self._select(loaded, lat, lon, radius, limit)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _plan(
+        self,
+        categories: str,
+        lat: float,
+        lon: float,
+        radius: int,
+        named_only: bool,
+    ) -> Tuple[List[Tile], Dict[Tile, List[dict]], List[Tile], bool]:
+        """
+        Split the tiles a query needs into already-covered and missing,
+        and report whether any of them is known to be dense.
+        """
+        tiles = [
+            tile
+            for category in _split_categories(categories)
+            for tile in tiles_for(category, lat, lon, radius, named_only, self.tile_deg)
+        ]
+
+        loaded: Dict[Tile, List[dict]] = {}
+        missing: List[Tile] = []
+        dense = False
+        for tile in tiles:
+            features = self.store.get(tile.key, namespace="tile")
+            if features is MISSING:
+                missing.append(tile)
+            elif features == DENSE_TILE:
+                dense = True
+            else:
+                loaded[tile] = features
+
+        return tiles, loaded, missing, dense
+
+    def _fetch_tile(self, tile: Tile) -> Optional[List[dict]]:
+        data = self.geo_client.places_in_rect(
+            tile.category, tile.rect, limit=TILE_LIMIT, named_only=tile.named_only,
+            use_cache=False,
+        )
+        return self._store_tile(tile, data)
+
+    async def _fetch_tile_async(self, tile: Tile) -> Optional[List[dict]]:
+        data = await self.geo_client.places_in_rect_async(
+            tile.category, tile.rect, limit=TILE_LIMIT, named_only=tile.named_only,
+            use_cache=False,
+        )
+        return self._store_tile(tile, data)
+
+    def _store_tile(self, tile: Tile, data: Dict[str, Any]) -> Optional[List[dict]]:
+        """
+        Store a fetched tile; None (and a dense marker) if Geoapify
+        capped it, since its places are then not the complete set.
+        """
+        features = data.get("features", [])
+        if len(features) >= TILE_LIMIT:
+            tracing.current_span().set(truncated_tiles=True)
+            self.store.set(tile.key, DENSE_TILE, ttl=TILE_TTL)
+            return None
+
+        compact = [c for c in map(compact_feature, features) if c is not None]
+        self.store.set(tile.key, compact, ttl=TILE_TTL)
+        return compact
+
+    @staticmethod
+    def _select(
+        loaded: Dict[Tile, List[dict]],
+        lat: float,
+        lon: float,
+        radius: int,
+        limit: int,
+    ) -> Dict[str, Any]:
+        """
+        Merge tile contents, keep places inside the circle,
+        dedupe and return the closest `limit` as a FeatureCollection.
+        """
+        seen = set()
+        ranked = []
+
+        for features in loaded.values():
+            for feature in features:
+                coords = feature.get("geometry", {}).get("coordinates", [])
+                if len(coords) != 2:
+                    continue
+
+                props = feature.get("properties", {})
+                identity = props.get("place_id") or (props.get("name"), coords[0], coords[1])
+                if identity in seen:
+                    continue
+
+                distance = haversine_m(lat, lon, coords[1], coords[0])
+                if distance > radius:
+                    continue
+
+                seen.add(identity)
+                ranked.append((distance, feature))
+
+        ranked.sort(key=lambda item: item[0])
+        return {
+            "type": "FeatureCollection",
+            "features": [feature for _, feature in ranked[:limit]],
+        }
+
+
+def _split_categories(categories: str) -> List[str]:
+    return sorted({c.strip() for c in categories.split(",") if c.strip()})
@@ -0,0 +1,325 @@
+# app/tools/rate_limit.py
+"""
+Client-side rate limiting for external APIs.
+
+Every provider (Geoapify, Wikipedia, GeoNames, Eventbrite, OpenAI) has
+a token bucket for requests per second; OpenAI can additionally have
+one for tokens per minute (off unless NAVAN_RATE_OPENAI_TPM is set,
+since the right budget depends on the account tier). Callers acquire
+from the bucket before each request. When the bucket is empty they
+queue (sleep until their reservation is due) instead of failing; only
+a caller whose wait would exceed its deadline gets RateLimitExceeded.
+
+Limits come from the environment, e.g.
+    NAVAN_RATE_GEOAPIFY_RPS=5   NAVAN_RATE_GEOAPIFY_BURST=10
+    NAVAN_RATE_OPENAI_TPM=10000
+and can be changed at runtime with configure(). usage() returns a
+snapshot of every budget.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app import tracing
+
+DEFAULT_MAX_WAIT = float(os.getenv("NAVAN_RATE_MAX_WAIT", "10"))
+
+# provider -> (requests/sec, burst, tokens/min or None)
+DEFAULT_LIMITS: Dict[str, Tuple[float, float, Optional[float]]] = {
+    "geoapify": (5.0, 10.0, None),
+    "wikipedia": (50.0, 100.0, None),
+    "geonames": (0.25, 5.0, None),  # ~1000 credits/hour
+    "eventbrite": (0.5, 5.0, None),  # ~2000 calls/hour
+    "openai": (8.0, 20.0, None),  # ~500 RPM; TPM is opt-in
+}
+
+
+class RateLimitExceeded(RuntimeError):
+    """
+    Raised when a call cannot be admitted before its deadline.
+    """
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    reserve() hands out tokens immediately when available, otherwise it
+    books future tokens (the level goes negative) and returns how long
+    the caller must wait. Later callers queue behind earlier ones.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._level = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Book `amount` tokens. Returns the seconds to wait before using
+        them, or None (nothing booked) if that exceeds max_wait.
+        """
+        with self._lock:
+            self._refill()
+            wait = max(amount - self._level, 0.0) / self.rate if self.rate > 0 else (
+                0.0 if amount <= self._level else float("inf")
+            )
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._level -= amount
+            return wait
+
+    def refund(self, amount: float) -> None:
+        """
+        Give back booked tokens (or charge more with a negative amount).
+        """
+        with self._lock:
+            self._refill()
+            self._level = min(self._level + amount, self.capacity)
+
+    def drain(self, seconds: float) -> None:
+        """
+        Empty the bucket so nothing is admitted for `seconds`
+        (used when the provider itself answers 429).
+        """
+        with self._lock:
+            self._refill()
+            self._level = min(self._level, -seconds * self.rate)
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._level
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+@dataclass
+class LimiterStats:
+    admitted: int = 0
+    rejected: int = 0
+    waited: int = 0
+    throttled: int = 0
+    wait_seconds: float = 0.0
+
+
+class ProviderLimiter:
+    """
+    Request bucket (+ optional tokens-per-minute bucket) for one provider.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_sec: float,
+        burst: float,
+        tokens_per_min: Optional[float] = None,
+    ):
+        self.name = name
+        self.requests = TokenBucket(requests_per_sec, burst)
+        self.tokens = (
+            TokenBucket(tokens_per_min / 60.0, tokens_per_min) if tokens_per_min else None
+        )
+        self.stats = LimiterStats()
+        self._stats_lock = threading.Lock()
+
+    def reserve(self, tokens: float = 0, max_wait: Optional[float] = None) -> float:
+        max_wait = DEFAULT_MAX_WAIT if max_wait is None else max_wait
+
+        wait = self.requests.reserve(1, max_wait)
+        if wait is not None and self.tokens is not None and tokens:
+            token_wait = self.tokens.reserve(min(tokens, self.tokens.capacity), max_wait)
+            if token_wait is None:
+                self.requests.refund(1)
+                wait = None
+            else:
+                wait = max(wait, token_wait)
+
+        with self._stats_lock:
+            if wait is None:
+                self.stats.rejected += 1
+            else:
+                self.stats.admitted += 1
+                if wait > 0:
+                    self.stats.waited += 1
+                    self.stats.wait_seconds += wait
+
+        if wait is None:
+            raise RateLimitExceeded(
+                f"{self.name} rate limit: no capacity within {max_wait:.1f}s"
+            )
+        return wait
+
+    def record_tokens(self, delta: float) -> None:
+        """
+        Correct the token budget once the real usage is known
+        (delta = actual - estimated; positive charges more).
+        """
+        if self.tokens is not None and delta:
+            self.tokens.refund(-delta)
+
+    def throttle(self, retry_after: float) -> None:
+        """
+        The provider rejected a request: hold back every caller for
+        retry_after seconds.
+        """
+        self.requests.drain(retry_after)
+        with self._stats_lock:
+            self.stats.throttled += 1
+
+    def usage(self) -> Dict[str, float]:
+        snapshot = {
+            "requests_available": round(self.requests.available(), 3),
+            "requests_capacity": self.requests.capacity,
+            "requests_per_sec": self.requests.rate,
+            "admitted": self.stats.admitted,
+            "rejected": self.stats.rejected,
+            "waited": self.stats.waited,
+            "throttled": self.stats.throttled,
+            "wait_seconds": round(self.stats.wait_seconds, 3),
+        }
+        if self.tokens is not None:
+            snapshot["tokens_available"] = round(self.tokens.available(), 1)
+            snapshot["tokens_per_min"] = self.tokens.capacity
+        return snapshot
+
+
+# ----------------------------------------------------------------------
+# Process-wide limiters
+# ----------------------------------------------------------------------
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_lock = threading.Lock()
+
+
+def _from_env(provider: str) -> ProviderLimiter:
+    rps, burst, tpm = DEFAULT_LIMITS.get(provider, (10.0, 10.0, None))
+    prefix = f"NAVAN_RATE_{provider.upper()}_"
+    tpm_env = os.getenv(prefix + "TPM")
+    return ProviderLimiter(
+        provider,
+        requests_per_sec=float(os.getenv(prefix + "RPS", rps)),
+        burst=float(os.getenv(prefix + "BURST", burst)),
+        tokens_per_min=float(tpm_env) if tpm_env else tpm,
+    )
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    with _lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = _limiters[provider] = _from_env(provider)
+        return limiter
+
+
+def configure(
+    provider: str,
+    requests_per_sec: Optional[float] = None,
+    burst: Optional[float] = None,
+    tokens_per_min: Optional[float] = None,
+) -> ProviderLimiter:
+    """
+    Replace a provider's limits (unspecified values keep their defaults).
+    """
+    current = _from_env(provider)
+    limiter = ProviderLimiter(
+        provider,
+        requests_per_sec=requests_per_sec if requests_per_sec is not None else current.requests.rate,
+        burst=burst if burst is not None else current.requests.capacity,
+        tokens_per_min=tokens_per_min if tokens_per_min is not None else (
+            current.tokens.capacity if current.tokens else None
+        ),
+    )
+    with _lock:
+        _limiters[provider] = limiter
+    return limiter
+
+
+def reset() -> None:
+    """
+    Forget all limiters (they are rebuilt from the environment).
+    """
+    with _lock:
+        _limiters.clear()
+
+
+def acquire(
+    provider: str,
+    tokens: float = 0,
+    max_wait: Optional[float] = None,
+    span: Any = None,
+) -> float:
+    """
+    Block until the provider admits one request (and `tokens` tokens).
+    Raises RateLimitExceeded if that would take longer than max_wait.
+    Returns the time waited; it is also added to span (default: the
+    current span) as rate_limit_wait_ms.
+    """
+    wait = get_limiter(provider).reserve(tokens, max_wait)
+    if wait > 0:
+        _record_wait(span, wait)
+        time.sleep(wait)
+    return wait
+
+
+async def acquire_async(
+    provider: str,
+    tokens: float = 0,
+    max_wait: Optional[float] = None,
+    span: Any = None,
+) -> float:
+    """
+    Async counterpart of acquire().
+    """
+    wait = get_limiter(provider).reserve(tokens, max_wait)
+    if wait > 0:
+        _record_wait(span, wait)
+        await asyncio.sleep(wait)
+    return wait
+
+
+def _record_wait(span: Any, wait: float) -> None:
+    (span or tracing.current_span()).add(rate_limit_wait_ms=round(wait * 1000, 3))
+
+
+def record_tokens(provider: str, delta: float) -> None:
+    get_limiter(provider).record_tokens(delta)
+
+
+def throttle(provider: str, retry_after: float) -> None:
+    get_limiter(provider).throttle(retry_after)
+
+
+def retry_after(headers, default: float = 1.0) -> float:
+    """
+    Seconds from a Retry-After header (only the delta-seconds form).
+    """
+    try:
+        return max(float(headers.get("Retry-After")), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+def usage() -> Dict[str, Dict[str, float]]:
+    """
+    Snapshot of every provider's budget and counters.
+    """
+    with _lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.usage() for limiter in limiters}
@@ -0,0 +1,121 @@
+# app/tools/singleflight.py
+"""
+Request coalescing ("single-flight") for the tools package.
+
+When several callers ask for the same key at the same time, only the
+first one (the leader) runs the upstream call; the others wait for it
+and receive the same result or exception. Once the call finishes the
+key is forgotten, so later callers start a new flight (normally they
+are served by a response cache by then).
+
+Sync callers (threads) and async callers (per event loop) are
+coalesced separately.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app import tracing
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _AsyncCall:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls.
+
+        flights = SingleFlight()
+        data = flights.do(key, lambda: fetch(url))
+        data = await flights.do_async(key, lambda: fetch_async(url))
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, _AsyncCall]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    # ------------------------------------------------------------------
+    # Sync (threads)
+    # ------------------------------------------------------------------
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            tracing.current_span().set(coalesced=True)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    # ------------------------------------------------------------------
+    # Async (per event loop)
+    # ------------------------------------------------------------------
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        The upstream call runs in its own task. A cancelled waiter does
+        not cancel it for the others; it is only cancelled once every
+        waiter has gone.
+        """
+        calls = self._async_calls.setdefault(asyncio.get_running_loop(), {})
+
+        call = calls.get(key)
+        if call is None:
+            call = calls[key] = _AsyncCall(asyncio.ensure_future(fn()))
+            call.task.add_done_callback(lambda _: calls.pop(key, None))
+        else:
+            tracing.current_span().set(coalesced=True)
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def in_flight(self) -> int:
+        """
+        Number of keys currently being fetched (sync + current loop).
+        """
+        with self._lock:
+            count = len(self._calls)
+        try:
+            count += len(self._async_calls.get(asyncio.get_running_loop(), {}))
+        except RuntimeError:
+            pass
+        return count
@@ -0,0 +1,235 @@
+# app/tools/transport.py
+"""
+Shared HTTP transport for the tools package.
+
+Responsibilities:
+- One pooled keep-alive requests.Session per host (sync)
+- One pooled httpx.AsyncClient per host and event loop (async;
+  httpx pools are bound to the loop they run on)
+- Retries with exponential backoff on 429 / 5xx and connection errors
+- A consistent default timeout for every call
+
+Tools call the module-level get() / get_async() helpers; configure()
+swaps the process-wide transport (pool size, retries, timeout).
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = float(os.getenv("NAVAN_HTTP_TIMEOUT", "10"))
+DEFAULT_POOL_SIZE = int(os.getenv("NAVAN_HTTP_POOL_SIZE", "20"))
+DEFAULT_MAX_RETRIES = int(os.getenv("NAVAN_HTTP_MAX_RETRIES", "3"))
+DEFAULT_BACKOFF_FACTOR = float(os.getenv("NAVAN_HTTP_BACKOFF_FACTOR", "0.5"))
+MAX_BACKOFF = 10.0
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HttpTransport:
+    """
+    Pooled HTTP transport with per-host sessions and retry policy.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        timeout: float = DEFAULT_TIMEOUT,
+        async_transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.async_transport = async_transport
+
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    # ------------------------------------------------------------------
+    # Sync (requests)
+    # ------------------------------------------------------------------
+
+    def session_for(self, url: str) -> requests.Session:
+        host = _host(url)
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._new_session()
+                self._sessions[host] = session
+            return session
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> requests.Response:
+        return self.session_for(url).get(
+            url,
+            params=params,
+            headers=headers,
+            timeout=timeout if timeout is not None else self.timeout,
+        )
+
+    def _new_session(self) -> requests.Session:
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            backoff_max=MAX_BACKOFF,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    # ------------------------------------------------------------------
+    # Async (httpx)
+    # ------------------------------------------------------------------
+
+    def async_client_for(self, url: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        host = _host(url)
+
+        clients = self._async_clients.setdefault(loop, {})
+        client = clients.get(host)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                ),
+                transport=self.async_transport,
+            )
+            clients[host] = client
+        return client
+
+    async def get_async(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        client = self.async_client_for(url)
+        timeout = timeout if timeout is not None else self.timeout
+
+        attempt = 0
+        while True:
+            try:
+                response = await client.get(
+                    url, params=params, headers=headers, timeout=timeout
+                )
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+
+                retry_after = _retry_after(response)
+                if retry_after is not None:
+                    await asyncio.sleep(min(retry_after, MAX_BACKOFF))
+                    attempt += 1
+                    continue
+
+            await asyncio.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.backoff_factor * (2 ** attempt), MAX_BACKOFF)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def close(self) -> None:
+        """
+        Close sync sessions. Async clients are released with their loop.
+        """
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+def _host(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
+
+
+# ----------------------------------------------------------------------
+# Process-wide transport
+# ----------------------------------------------------------------------
+
+_transport = HttpTransport()
+
+
+def configure(**kwargs: Any) -> HttpTransport:
+    """
+    Replace the process-wide transport (e.g. configure(pool_size=50)).
+    """
+    global _transport
+
+    old = _transport
+    _transport = HttpTransport(**kwargs)
+    old.close()
+    return _transport
+
+
+def get_transport() -> HttpTransport:
+    return _transport
+
+
+def get(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+) -> requests.Response:
+    return _transport.get(url, params=params, headers=headers, timeout=timeout)
+
+
+async def get_async(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+) -> httpx.Response:
+    return await _transport.get_async(url, params=params, headers=headers, timeout=timeout)
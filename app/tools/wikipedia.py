@@ -1,40 +1,201 @@
 # app/tools/wikipedia.py
-import requests
-from urllib.parse import quote
+import json
+import os
 
-WIKIPEDIA_API_URL = "https://en.wikipedia.org/api/rest_v1/page/summary/"
+from app import tracing
+from app.tools import rate_limit, transport
+from app.tools.cache import MISSING, TieredCache, TTLCache
+from app.tools.singleflight import SingleFlight
 
+WIKIPEDIA_QUERY_URL = "https://en.wikipedia.org/w/api.php"
+WIKIPEDIA_HEADERS = {"User-Agent": "TravelAssistant/1.0"}
 
-def _fetch(title: str) -> dict | None:
-    url = WIKIPEDIA_API_URL + quote(title.replace(" ", "_"))
+# Summary length: the opening sentences of the lead section, about what
+# the REST page/summary endpoint returns
+SUMMARY_SENTENCES = 4
 
-    response = requests.get(
-        url,
-        headers={"User-Agent": "TravelAssistant/1.0"}
-    )
+# Concurrent lookups of the same title share one upstream request
+_flights = SingleFlight()
 
-    if response.status_code != 200:
-        return None
+# ------------------------------------------------------------------
+# Summary cache
+# ------------------------------------------------------------------
+# Hits are kept for a long time; known-missing titles (404 / empty
+# extract) are cached briefly so candidate fallbacks are not re-tried
+# on every lookup. Transient errors (429 / 5xx) are never cached.
 
-    data = response.json()
+SUMMARY_TTL = 7 * 24 * 3600
+NEGATIVE_TTL = 10 * 60
 
-    if not data.get("extract"):
-        return None
+_cache = TieredCache(
+    TTLCache(maxsize=int(os.getenv("WIKIPEDIA_CACHE_SIZE", "5000")))
+)
+
+
+def _cache_key(title: str) -> str:
+    return "wikipedia:" + " ".join(title.replace("_", " ").split()).casefold()
+
+
+def _store(title: str, status_code: int, result: dict | None) -> None:
+    if result:
+        _cache.set(_cache_key(title), result, ttl=SUMMARY_TTL)
+    elif status_code in (200, 404):
+        _cache.set(_cache_key(title), None, ttl=NEGATIVE_TTL)
+
+
+def warm_cache(path: str) -> int:
+    """
+    Pre-load summaries from a JSON file mapping title -> summary dict
+    (the format written by export_cache). Returns the number loaded.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+
+    loaded = 0
+    for title, result in entries.items():
+        if isinstance(result, dict) and result.get("found"):
+            _cache.set(_cache_key(title), result, ttl=SUMMARY_TTL)
+            loaded += 1
+
+    return loaded
+
+
+def export_cache(path: str) -> int:
+    """
+    Write all cached hits to a JSON file usable by warm_cache.
+    """
+    entries = {
+        key.removeprefix("wikipedia:"): result
+        for key, result in _cache.memory.items()
+        if result
+    }
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
 
+    return len(entries)
+
+
+def cache_stats():
+    return _cache.stats
+
+
+def clear_cache() -> None:
+    _cache.clear()
+
+
+# ------------------------------------------------------------------
+# Fetching
+# ------------------------------------------------------------------
+# A lookup tries up to 4 ranked candidate titles. Candidates not yet
+# in the cache are fetched together in one MediaWiki query
+# (titles=a|b|c); a lone candidate goes through the same query, so a
+# title gets the same summary however many candidates it came with.
+
+def _query_params(titles: list[str]) -> dict:
     return {
-        "found": True,
-        "title": data.get("title"),
-        "summary": data.get("extract"),
-        "url": data.get("content_urls", {}).get("desktop", {}).get("page"),
-        "source": "wikipedia"
+        "action": "query",
+        "format": "json",
+        "formatversion": "2",
+        "prop": "extracts|info",
+        "exintro": "1",
+        "explaintext": "1",
+        "exsentences": str(SUMMARY_SENTENCES),
+        "exlimit": "max",
+        "inprop": "url",
+        "redirects": "1",
+        "titles": "|".join(titles),
     }
 
 
-def get_wikipedia_summary(title: str, city: str | None = None) -> dict:
+def _parse(titles: list[str], status_code: int, data_fn) -> dict | None:
     """
-    Deterministic Wikipedia summary fetch with safe fallbacks.
+    Map each requested title to its summary (or None) through the
+    query's normalizations and redirects. None for a failed request.
     """
+    if status_code != 200:
+        return None
+
+    query = data_fn().get("query")
+    if query is None:
+        return None
+
+    normalized = {n["from"]: n["to"] for n in query.get("normalized", [])}
+    redirects = {r["from"]: r["to"] for r in query.get("redirects", [])}
+    pages = {page.get("title"): page for page in query.get("pages", [])}
+
+    results = {}
+    for title in titles:
+        resolved = normalized.get(title, title)
+        page = pages.get(redirects.get(resolved, resolved), {})
+        results[title] = {
+            "found": True,
+            "title": page.get("title"),
+            "summary": page.get("extract"),
+            "url": page.get("fullurl"),
+            "source": "wikipedia"
+        } if page.get("extract") else None
+
+    return results
+
+
+def _results(titles: list[str], response) -> dict:
+    results = _parse(titles, response.status_code, response.json)
+    if results is None:
+        return {}
+
+    for title, result in results.items():
+        _store(title, response.status_code, result)
 
+    return results
+
+
+def _first_cached(candidates: list[str]) -> tuple[dict | None, list[str]]:
+    """
+    Walk the candidates in rank order through the cache.
+
+    Returns the first cached hit, or the candidates from the first
+    uncached one on (earlier ones are known misses).
+    """
+    for i, candidate in enumerate(candidates):
+        cached = _cache.get(_cache_key(candidate), namespace="summary")
+        if cached is MISSING:
+            return None, candidates[i:]
+        if cached:
+            return cached, []
+
+    return None, []
+
+
+def _fetch(titles: list[str], span) -> dict:
+    key = "|".join(map(_cache_key, titles))
+    return _flights.do(key, lambda: _download(titles, span))
+
+
+async def _fetch_async(titles: list[str], span) -> dict:
+    key = "|".join(map(_cache_key, titles))
+    return await _flights.do_async(key, lambda: _download_async(titles, span))
+
+
+def _download(titles: list[str], span) -> dict:
+    rate_limit.acquire("wikipedia")
+    response = transport.get(
+        WIKIPEDIA_QUERY_URL, params=_query_params(titles), headers=WIKIPEDIA_HEADERS
+    )
+    span.set(status=response.status_code)
+    return _results(titles, response)
+
+
+async def _download_async(titles: list[str], span) -> dict:
+    await rate_limit.acquire_async("wikipedia")
+    response = await transport.get_async(
+        WIKIPEDIA_QUERY_URL, params=_query_params(titles), headers=WIKIPEDIA_HEADERS
+    )
+    span.set(status=response.status_code)
+    return _results(titles, response)
+
+
+def _candidates(title: str, city: str | None) -> list[str]:
     candidates = []
 
     if city:
@@ -45,15 +206,56 @@ def get_wikipedia_summary(title: str, city: str | None = None) -> dict:
         ])
 
     candidates.append(title)
+    return candidates
+
 
-    for candidate in candidates:
-        result = _fetch(candidate)
-        if result:
-            return result
+def _best(candidates: list[str], results: dict) -> dict | None:
+    return next((results[c] for c in candidates if results.get(c)), None)
 
+
+def _not_found(title: str) -> dict:
     return {
         "found": False,
         "title": title,
         "summary": None,
         "source": "wikipedia"
     }
+
+
+def get_wikipedia_summary(title: str, city: str | None = None) -> dict:
+    """
+    Deterministic Wikipedia summary fetch with safe fallbacks.
+
+    Candidates are ranked ("{title} ({city})" first, plain title last)
+    and the highest-ranked hit wins. Uncached candidates are fetched in
+    a single request, so a lookup costs at most one round-trip.
+    """
+    candidates = _candidates(title, city)
+
+    with tracing.span("wikipedia.fetch", title=title) as span:
+        hit, missing = _first_cached(candidates)
+        span.set(cache_hit=not missing)
+        if missing:
+            hit = _best(missing, _fetch(missing, span))
+
+    return hit or _not_found(title)
+
+
+async def get_wikipedia_summary_async(title: str, city: str | None = None) -> dict:
+    """
+    Async counterpart of get_wikipedia_summary (same fallback order).
+    """
+    candidates = _candidates(title, city)
+
+    with tracing.span("wikipedia.fetch", title=title) as span:
+        hit, missing = _first_cached(candidates)
+        span.set(cache_hit=not missing)
+        if missing:
+            hit = _best(missing, await _fetch_async(missing, span))
+
+    return hit or _not_found(title)
+
+
+_warm_file = os.getenv("WIKIPEDIA_CACHE_WARM_FILE")
+if _warm_file and os.path.exists(_warm_file):
+    warm_cache(_warm_file)
@@ -0,0 +1,199 @@
+# app/tracing.py
+"""
+Lightweight per-turn tracing.
+
+A turn is wrapped in trace(...); every stage inside it (extraction,
+geocoding, Geoapify, Wikipedia, LLM calls, ...) opens a nested span(...).
+Spans record wall-clock start/end plus free-form attributes such as
+token counts or cache-hit flags.
+
+The active span lives in a ContextVar, so spans opened inside asyncio
+tasks attach to the span that was active when the task was created.
+Outside of a trace, span() is a no-op, so tools pay (almost) nothing
+when nobody is tracing.
+
+Finished traces are handed to hooks (see add_hook); JsonLinesExporter
+is a ready-made hook. Setting NAVAN_TRACE_FILE registers one at import.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+@dataclass
+class Span:
+    name: str
+    start: float = field(default_factory=time.time)
+    end: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    children: List["Span"] = field(default_factory=list)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add(self, **counters: float) -> None:
+        """
+        Accumulate numeric attributes (e.g. tokens over several LLM calls).
+        """
+        for key, value in counters.items():
+            self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def finish(self) -> None:
+        if self.end is None:
+            self.end = time.time()
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end is None:
+            return None
+        return round((self.end - self.start) * 1000, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "start": self.start,
+            "end": self.end,
+            "duration_ms": self.duration_ms,
+            "attributes": dict(self.attributes),
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class _NullSpan:
+    """
+    Returned by span() when no trace is active. Ignores everything.
+    """
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def add(self, **counters: float) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+_current_span: ContextVar[Optional[Span]] = ContextVar("navan_current_span", default=None)
+
+TraceHook = Callable[[Span], None]
+_hooks: List[TraceHook] = []
+
+
+# ------------------------------------------------------------------
+# Public API
+# ------------------------------------------------------------------
+
+@contextmanager
+def trace(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Start a root span (one per turn). Hooks run when it finishes.
+    """
+    root = Span(name=name, attributes=dict(attributes))
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.set(error=type(e).__name__)
+        raise
+    finally:
+        root.end = time.time()
+        _current_span.reset(token)
+        _emit(root)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Open a child span of the current span (no-op outside a trace).
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield _NULL_SPAN
+        return
+
+    child = Span(name=name, attributes=dict(attributes))
+    parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.set(error=type(e).__name__)
+        raise
+    finally:
+        child.end = time.time()
+        _current_span.reset(token)
+
+
+def open_span(name: str, **attributes: Any) -> Any:
+    """
+    Attach a child span to the current span without making it current.
+
+    For generators, where a context manager would leak the active span
+    into the consumer between yields. The caller must call finish().
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return _NULL_SPAN
+
+    child = Span(name=name, attributes=dict(attributes))
+    parent.children.append(child)
+    return child
+
+
+def current_span() -> Any:
+    """
+    The innermost active span, or a no-op span outside a trace.
+    """
+    return _current_span.get() or _NULL_SPAN
+
+
+def add_hook(hook: TraceHook) -> None:
+    _hooks.append(hook)
+
+
+def remove_hook(hook: TraceHook) -> None:
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+
+def _emit(root: Span) -> None:
+    for hook in list(_hooks):
+        try:
+            hook(root)
+        except Exception as e:
+            # Tracing must never break a conversation turn
+            print(f"[ERROR] trace hook failed: {e}")
+
+
+# ------------------------------------------------------------------
+# Exporters
+# ------------------------------------------------------------------
+
+class JsonLinesExporter:
+    """
+    Trace hook that appends one JSON object per finished trace.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, root: Span) -> None:
+        line = json.dumps(root.to_dict(), ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+_trace_file = os.getenv("NAVAN_TRACE_FILE")
+if _trace_file:
+    add_hook(JsonLinesExporter(_trace_file))
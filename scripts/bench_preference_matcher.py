@@ -0,0 +1,79 @@
+# scripts/bench_preference_matcher.py
+"""
+Micro-benchmark: precompiled PreferenceMatcher vs the old nested
+substring scan, on messages of growing length and growing vocabulary.
+
+The matcher's time per word should stay flat as messages and the
+vocabulary grow (one automaton step per word); the naive scan grows
+with vocabulary size x text length.
+
+Run it as a module from the repository root, so `app` is importable:
+
+    python -m scripts.bench_preference_matcher
+"""
+import argparse
+import random
+import timeit
+
+from app.state.conversation_state import PREFERENCE_SYNONYMS
+from app.state.preference_matcher import PreferenceMatcher
+
+FILLER = (
+    "we are staying near the old town and would like to walk around "
+    "tomorrow morning before lunch with the kids maybe somewhere quiet"
+).split()
+
+
+def naive_match(vocabulary, text):
+    t = text.lower()
+    return {
+        canonical
+        for canonical, synonyms in vocabulary.items()
+        if canonical in t or any(s in t for s in synonyms)
+    }
+
+
+def make_message(n_words, vocabulary, rng, hit_rate):
+    synonyms = [s for values in vocabulary.values() for s in values]
+    return " ".join(
+        rng.choice(synonyms) if rng.random() < hit_rate else rng.choice(FILLER)
+        for _ in range(n_words)
+    )
+
+
+def grow_vocabulary(factor):
+    vocabulary = {k: set(v) for k, v in PREFERENCE_SYNONYMS.items()}
+    for i in range(factor - 1):
+        vocabulary[f"topic{i}"] = {f"topic{i} word{j}" for j in range(20)} | {f"term{i}x{j}" for j in range(20)}
+    return vocabulary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    print(
+        f"{'vocab':>6} {'words':>7} {'hits':>5} {'naive ms':>10} "
+        f"{'matcher ms':>11} {'matcher ns/word':>16}"
+    )
+
+    for factor in (1, 10, 50):
+        vocabulary = grow_vocabulary(factor)
+        matcher = PreferenceMatcher(vocabulary)
+
+        # hit_rate 0: no preference mentioned, the naive scan's worst case
+        for hit_rate in (0.05, 0.0):
+            for n_words in (10, 100, 1_000, 10_000):
+                text = make_message(n_words, vocabulary, rng, hit_rate)
+                naive = timeit.timeit(lambda: naive_match(vocabulary, text), number=args.repeat) / args.repeat
+                fast = timeit.timeit(lambda: matcher.match(text), number=args.repeat) / args.repeat
+                print(
+                    f"{len(vocabulary):>6} {n_words:>7} {hit_rate:>5.2f} {naive * 1e3:>10.3f} "
+                    f"{fast * 1e3:>11.3f} {fast / n_words * 1e9:>16.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# scripts/build_gazetteer.py
+"""
+Build the offline city gazetteer used by app.tools.gazetteer.
+
+Download the GeoNames dumps first:
+    https://download.geonames.org/export/dump/cities15000.zip
+    https://download.geonames.org/export/dump/countryInfo.txt
+
+Then, from the repository root (so `app` is importable):
+    python -m scripts.build_gazetteer cities15000.txt --countries countryInfo.txt
+"""
+import argparse
+import time
+
+from app.tools.gazetteer import DEFAULT_PATH, Gazetteer, build_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline city gazetteer")
+    parser.add_argument("cities", help="GeoNames cities dump (cities15000.txt format)")
+    parser.add_argument("--countries", help="GeoNames countryInfo.txt (enables country names)")
+    parser.add_argument("--out", default=DEFAULT_PATH, help=f"output file (default: {DEFAULT_PATH})")
+    parser.add_argument("--no-aliases", action="store_true", help="index primary names only")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    count = build_index(
+        args.cities,
+        args.out,
+        countries_path=args.countries,
+        with_aliases=not args.no_aliases,
+    )
+    print(f"Wrote {count} cities to {args.out} in {time.perf_counter() - started:.1f}s")
+
+    gazetteer = Gazetteer(args.out)
+    for name in ("Rome", "Paris, France", "New York"):
+        print(f"  {name!r} -> {gazetteer.lookup(name)}")
+    gazetteer.close()
+
+
+if __name__ == "__main__":
+    main()
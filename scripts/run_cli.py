@@ -1,5 +1,7 @@
 # scripts/run_cli.py
 
+import os
+
 from app.orchestrator.orchestrator_agent import OrchestratorAgent
 from app.conversation.navigator import ConversationNavigator
 
@@ -8,7 +10,7 @@ def run_cli():
     print("🧭 Travel Assistant CLI")
     print("Type 'exit' to quit\n")
 
-    orchestrator = OrchestratorAgent()
+    orchestrator = OrchestratorAgent(fused=os.getenv("NAVAN_FUSED") == "1")
     navigator = ConversationNavigator()
 
     # ✅ Static greeting
@@ -29,14 +31,25 @@ def run_cli():
             break
 
         try:
-            # 1️⃣ Orchestrator decides
-            output = orchestrator.handle_message(user_input)
+            streamed = []
+
+            def print_token(delta: str):
+                if not streamed:
+                    print("\nAssistant: ", end="", flush=True)
+                streamed.append(delta)
+                print(delta, end="", flush=True)
+
+            # 1️⃣ Orchestrator decides (final text is streamed as it arrives)
+            output = orchestrator.handle_message(user_input, on_token=print_token)
 
             # 2️⃣ Navigator renders UX
             nav_response = navigator.navigate(output)
 
-            # Print assistant response
-            print(f"\nAssistant: {nav_response.text}")
+            # Print assistant response (unless it was already streamed)
+            if streamed:
+                print()
+            else:
+                print(f"\nAssistant: {nav_response.text}")
             if nav_response.next_question:
                 print(f"→ {nav_response.next_question}")
             print()
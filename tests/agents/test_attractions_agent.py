@@ -0,0 +1,133 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.agents.attractions_agent import AttractionsAgent, AttractionsAgentInput
+
+PLACES = [{"name": "Museo", "category": "entertainment.museum", "lat": 41.9, "lon": 12.5}]
+
+FUSED_REPLY = json.dumps({
+    "attractions": [
+        {"name": "Museo", "category": "museum", "reason": "Great art", "lat": 41.9, "lon": 12.5},
+        {"name": "Broken"},
+    ],
+    "text": "Museo is a lovely start.",
+    "followup": "Want something nearby?",
+    "intent": "discover_attractions",
+})
+
+INPUT = AttractionsAgentInput(city="Rome", lat=41.9, lon=12.5, preferences=["Museum"])
+
+
+@patch("app.agents.attractions_agent.call_llm", return_value=FUSED_REPLY)
+@patch.object(AttractionsAgent, "_query_places", return_value=PLACES)
+def test_fused_run_returns_output_and_reply(mock_places, mock_llm):
+    output, response = AttractionsAgent().run_fused(INPUT, "museums please", {"city": "Rome"})
+
+    assert [a.name for a in output.attractions] == ["Museo"]
+    assert response.text == "Museo is a lovely start."
+    assert response.followup_question == "Want something nearby?"
+    assert response.suggested_intent == "discover_attractions"
+    assert mock_llm.call_count == 1
+    assert "museums please" in mock_llm.call_args.kwargs["messages"][-1]["content"]
+
+
+@patch("app.agents.attractions_agent.call_llm")
+@patch.object(AttractionsAgent, "_query_places", return_value=[])
+def test_fused_run_without_places_skips_llm(mock_places, mock_llm):
+    output, response = AttractionsAgent().run_fused(INPUT, "museums please", {})
+
+    assert output.attractions == []
+    assert response is None
+    mock_llm.assert_not_called()
+
+
+@patch("app.agents.attractions_agent.call_llm")
+@patch.object(AttractionsAgent, "_query_places", return_value=PLACES)
+def test_run_ranks_locally_without_llm(mock_places, mock_llm):
+    output = AttractionsAgent().run(INPUT)
+
+    assert [a.name for a in output.attractions] == ["Museo"]
+    assert output.attractions[0].category == "entertainment.museum"
+    assert output.attractions[0].reason.startswith("Matches your interest in museum")
+    mock_llm.assert_not_called()
+
+
+@patch(
+    "app.agents.attractions_agent.call_llm",
+    return_value=json.dumps({"reasons": ["Home of great art."]}),
+)
+@patch.object(AttractionsAgent, "_query_places", return_value=PLACES)
+def test_llm_reasons_are_optional(mock_places, mock_llm):
+    output = AttractionsAgent(llm_reasons=True).run(INPUT)
+
+    assert output.attractions[0].reason == "Home of great art."
+    assert output.attractions[0].lat == 41.9
+    assert mock_llm.call_count == 1
+
+
+def _feature(place_id, name, lat, lon, category):
+    return {
+        "properties": {"place_id": place_id, "name": name, "categories": [category]},
+        "geometry": {"coordinates": [lon, lat]},
+    }
+
+
+def test_batched_mode_queries_each_category_and_dedupes():
+    responses = {
+        "catering.restaurant": [_feature(f"r{i}", f"R{i}", 41.9 + i * 1e-4, 12.5, "catering.restaurant") for i in range(15)],
+        "entertainment.museum": [
+            _feature("m1", "Museo", 41.901, 12.501, "entertainment.museum"),
+            # Same place listed under both categories
+            _feature("r0", "R0", 41.9, 12.5, "catering.restaurant"),
+        ],
+    }
+
+    def nearby(categories, lat, lon, radius, limit, named_only):
+        assert limit == 15
+        return {"features": responses[categories]}
+
+    agent = AttractionsAgent()
+    with patch.object(agent.place_index, "nearby", side_effect=nearby) as mock_nearby:
+        batches = list(agent._place_batches(
+            AttractionsAgentInput("Rome", 41.9, 12.5, ["food", "museum"]), ["food", "museum"]
+        ))
+
+    assert sorted(call.kwargs["categories"] for call in mock_nearby.call_args_list) == [
+        "catering.restaurant", "entertainment.museum",
+    ]
+    names = [p["name"] for batch in batches for p in batch]
+    assert len(names) == 16
+    assert names.count("R0") == 1
+    assert "Museo" in names
+
+
+def test_batched_mode_settles_every_category_query_on_error():
+    async def nearby_async(categories, **kwargs):
+        if categories == "entertainment.museum":
+            await asyncio.sleep(10)
+        raise RuntimeError(f"Geoapify API error for {categories}")
+
+    async def consume(agent):
+        with pytest.raises(RuntimeError):
+            async for _ in agent._place_batches_async(
+                AttractionsAgentInput("Rome", 41.9, 12.5, ["food", "museum"]), ["food", "museum"]
+            ):
+                pass
+        # The slow query was cancelled and has finished, not left running
+        return asyncio.all_tasks() - {asyncio.current_task()}
+
+    agent = AttractionsAgent()
+    with patch.object(agent.place_index, "nearby_async", side_effect=nearby_async):
+        assert asyncio.run(consume(agent)) == set()
+
+
+def test_dedupe_keeps_distinct_places_at_the_same_point():
+    seen = set()
+    museum = {"name": "Museo", "place_id": None, "lat": 41.9, "lon": 12.5}
+    cafe = {"name": "Caffè del Museo", "place_id": None, "lat": 41.9, "lon": 12.5}
+
+    assert AttractionsAgent._dedupe([museum, cafe], seen) == [museum, cafe]
+    assert AttractionsAgent._dedupe([dict(museum)], seen) == []
@@ -0,0 +1,64 @@
+import json
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import app
+from app.agents.wikipedia_explainer_agent import (
+    PROMPT_PATH,
+    WikipediaExplainerAgent,
+    WikipediaExplainerInput,
+)
+from app.tools.cache import SQLiteCache, TieredCache, TTLCache
+
+LLM_REPLY = json.dumps({
+    "explanation": "The Colosseum is a huge ancient arena in Rome.",
+    "key_points": ["Ancient amphitheatre"],
+    "followup_suggestions": ["What else is nearby?"],
+})
+
+INPUT = WikipediaExplainerInput(
+    title="Colosseum",
+    raw_summary="The Colosseum is an ancient amphitheatre in Rome.",
+)
+
+
+@patch("app.agents.wikipedia_explainer_agent.call_llm", return_value=LLM_REPLY)
+def test_identical_explanations_are_memoized(mock_llm):
+    agent = WikipediaExplainerAgent(cache=TieredCache(TTLCache()))
+
+    first = agent._explain(INPUT)
+    second = agent._explain(INPUT)
+
+    assert first == second
+    assert mock_llm.call_count == 1
+
+    agent._explain(WikipediaExplainerInput(INPUT.title, INPUT.raw_summary, "concise"))
+
+    assert mock_llm.call_count == 2
+
+
+@patch("app.agents.wikipedia_explainer_agent.call_llm", return_value=LLM_REPLY)
+def test_prompt_change_invalidates_cache(mock_llm, tmp_path):
+    disk = SQLiteCache(str(tmp_path / "explainer.sqlite"))
+    prompt_file = tmp_path / "explainer.yaml"
+    prompt_file.write_text(
+        (Path(app.__file__).parent / PROMPT_PATH).read_text(encoding="utf-8"), encoding="utf-8"
+    )
+
+    first = WikipediaExplainerAgent(cache=TieredCache(TTLCache(), disk))
+    first.prompt_path = str(prompt_file)
+    first._explain(INPUT)
+
+    agent = WikipediaExplainerAgent(cache=TieredCache(TTLCache(), disk))
+    agent.prompt_path = str(prompt_file)
+    agent._explain(INPUT)
+    assert mock_llm.call_count == 1
+
+    # Edit the prompt file under the running agent
+    prompt_file.write_text(prompt_file.read_text(encoding="utf-8") + "# edited\n", encoding="utf-8")
+    stat = os.stat(prompt_file)
+    os.utime(prompt_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    agent._explain(INPUT)
+    assert mock_llm.call_count == 2
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+# Clients refuse to start without keys; tests never hit the APIs.
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("GEOAPIFY_API_KEY", "test-key")
+
+from app.tools import gazetteer, rate_limit, wikipedia
+from app.tools.geoapify_client import get_page_cache, get_shared_cache
+from app.tools.poi_index import get_tile_store
+
+# Never pick up a locally built data/gazetteer.bin
+gazetteer.configure(None)
+
+# A handful of cities for the extraction fast path:
+# name, alternate names, lat, lon, country code, population
+TEST_CITIES = [
+    ("Rome", "Roma", "41.89193", "12.51133", "IT", "2318895"),
+    ("Paris", "Parigi", "48.85341", "2.3488", "FR", "2138551"),
+    ("New York City", "New York,NYC", "40.71427", "-74.00597", "US", "8804190"),
+    ("London", "", "51.50853", "-0.12574", "GB", "8961989"),
+    ("Nice", "Nizza", "43.70313", "7.26608", "FR", "342669"),
+]
+TEST_COUNTRIES = [("IT", "Italy"), ("FR", "France"), ("US", "United States"), ("GB", "United Kingdom")]
+
+
+@pytest.fixture(scope="session")
+def test_gazetteer_path(tmp_path_factory):
+    root = tmp_path_factory.mktemp("gazetteer")
+    cities = root / "cities.txt"
+    cities.write_text("".join(
+        "\t".join([str(i), name, name, alts, lat, lon, "P", "PPL", cc, "", "", "", "", "", pop, "", "", "", ""]) + "\n"
+        for i, (name, alts, lat, lon, cc, pop) in enumerate(TEST_CITIES)
+    ), encoding="utf-8")
+    countries = root / "countryInfo.txt"
+    countries.write_text(
+        "".join(f"{code}\tXXX\t000\tXX\t{name}\n" for code, name in TEST_COUNTRIES),
+        encoding="utf-8",
+    )
+
+    out = root / "gazetteer.bin"
+    gazetteer.build_index(str(cities), str(out), countries_path=str(countries))
+    return str(out)
+
+
+@pytest.fixture(autouse=True)
+def test_gazetteer(test_gazetteer_path):
+    gazetteer.configure(test_gazetteer_path)
+    yield
+    gazetteer.configure(None)
+
+
+@pytest.fixture(autouse=True)
+def clear_tool_caches():
+    wikipedia.clear_cache()
+    get_shared_cache().clear()
+    get_page_cache().clear()
+    get_tile_store().clear()
+    rate_limit.reset()
+    yield
@@ -0,0 +1,105 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.orchestrator.extraction import (
+    FAST_PATH_MIN_CONFIDENCE,
+    extract_information,
+    pre_extract,
+)
+from app.tools import gazetteer
+from app.tools.rate_limit import RateLimitExceeded
+
+
+@pytest.mark.parametrize("message", ["Thanks!", "hi there", "Ok, cool", "thank you so much"])
+def test_pleasantries_take_the_fast_path(message):
+    extracted, confidence = pre_extract(message)
+
+    assert confidence >= FAST_PATH_MIN_CONFIDENCE
+    assert extracted["user_goal"] is None
+    assert extracted["city"] is None
+    assert extracted["preferences"] == []
+
+
+def test_short_preference_answer():
+    extracted, confidence = pre_extract("museums and local food")
+
+    assert confidence >= FAST_PATH_MIN_CONFIDENCE
+    assert extracted["preferences"] == ["museum", "food"]
+    assert extracted["user_goal"] == "get_recommendations"
+
+
+def test_city_with_country():
+    extracted, confidence = pre_extract("Hi, I'm in New York")
+
+    assert confidence >= FAST_PATH_MIN_CONFIDENCE
+    assert extracted["city"] == "New York City"
+    assert extracted["country"] == "United States"
+
+
+def test_cities_come_from_the_gazetteer():
+    extracted, confidence = pre_extract("I'm in Roma, Italy")
+    assert extracted["city"] == "Rome"
+    assert confidence >= FAST_PATH_MIN_CONFIDENCE
+
+    gazetteer.configure(None)
+    extracted, confidence = pre_extract("I'm in Rome")
+    assert extracted["city"] is None
+    assert confidence < FAST_PATH_MIN_CONFIDENCE
+
+
+def test_greeting_word_city_is_not_dropped():
+    extracted, confidence = pre_extract("I'm in Nice")
+    assert extracted["city"] == "Nice"
+    assert extracted["country"] == "France"
+    assert confidence >= FAST_PATH_MIN_CONFIDENCE
+
+    # Lowercase or sentence-initial, "nice" may be either: ask the LLM
+    for message in ("i'm in nice", "Nice museums"):
+        extracted, confidence = pre_extract(message)
+        assert extracted["city"] is None
+        assert confidence < FAST_PATH_MIN_CONFIDENCE
+
+    _, confidence = pre_extract("Nice, thanks!")
+    assert confidence >= FAST_PATH_MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize("message", [
+    "no museums",
+    "no thanks, no food",
+    "nope",
+    "not museums in Rome",
+    "I don't like parks",
+])
+def test_negated_replies_fall_back_to_llm(message):
+    _, confidence = pre_extract(message)
+
+    assert confidence < FAST_PATH_MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize("message", [
+    "Tell me about the Colosseum",
+    "What else should I see nearby?",
+    "Good museums in Lyon?",
+])
+def test_open_questions_fall_back_to_llm(message):
+    _, confidence = pre_extract(message)
+
+    assert confidence < FAST_PATH_MIN_CONFIDENCE
+
+
+@patch("app.orchestrator.extraction.call_llm")
+def test_fast_path_skips_llm(mock_llm):
+    extracted = extract_information("I'm in Rome, Italy")
+
+    assert extracted["city"] == "Rome"
+    mock_llm.assert_not_called()
+
+
+@pytest.mark.parametrize("message", ["no museums please", "not into history, I want food"])
+@patch("app.orchestrator.extraction.call_llm", side_effect=RateLimitExceeded("openai rate limit"))
+def test_rate_limited_extraction_drops_the_unreliable_rule_read(mock_llm, message):
+    assert pre_extract(message)[0]["preferences"]
+
+    assert extract_information(message) == {}
+    mock_llm.assert_called_once()
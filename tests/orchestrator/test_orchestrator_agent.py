@@ -0,0 +1,49 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+from app.agents.attractions_agent import AttractionsAgent
+from app.orchestrator.orchestrator_agent import BUSY_REPLY, OrchestratorAgent
+from app.tools.rate_limit import RateLimitExceeded
+
+PLACES = [{"name": "Museo", "category": "entertainment.museum", "lat": 41.9, "lon": 12.5}]
+
+FUSED_REPLY = json.dumps({
+    "attractions": [
+        {"name": "Museo", "category": "museum", "reason": "Great art", "lat": 41.9, "lon": 12.5},
+    ],
+    "text": "Start with Museo.",
+    "followup": None,
+    "intent": "discover_attractions",
+})
+
+
+@patch("app.orchestrator.orchestrator_agent.LLMConversationResponder.generate_response_async")
+@patch("app.agents.attractions_agent.call_llm_async", new_callable=AsyncMock, return_value=FUSED_REPLY)
+@patch.object(AttractionsAgent, "_query_places_async", new_callable=AsyncMock, return_value=PLACES)
+def test_fused_attractions_turn_makes_one_llm_call(mock_places, mock_llm, mock_responder):
+    agent = OrchestratorAgent(fused=True)
+    agent.state.latitude, agent.state.longitude = 41.9, 12.5
+
+    # "museums in Rome" is handled by the extraction fast path (no LLM)
+    response = agent.handle_message("museums in Rome")
+
+    assert response.text == "Start with Museo."
+    assert mock_llm.await_count == 1
+    mock_responder.assert_not_called()
+    assert agent.state.turn_count == 1
+
+
+@patch.object(
+    OrchestratorAgent,
+    "_run_turn",
+    new_callable=AsyncMock,
+    side_effect=RateLimitExceeded("openai rate limit"),
+)
+def test_rate_limited_turn_degrades_instead_of_raising(mock_turn):
+    agent = OrchestratorAgent()
+
+    response = agent.handle_message("hello there")
+
+    assert response.text == BUSY_REPLY
+    assert response.trace["attributes"]["rate_limited"] is True
+    assert agent.state.turn_count == 1
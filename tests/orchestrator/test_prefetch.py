@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from app.orchestrator.prefetch import SpeculativePrefetch, guess_subject
+
+
+@pytest.mark.parametrize("message, subject", [
+    ("Tell me about the Colosseum", "Colosseum"),
+    ("What is the Pantheon?", "Pantheon"),
+    ("history of Petra, please", "Petra"),
+    ("Tell me more about it", None),
+    ("museums in Rome", None),
+])
+def test_guess_subject(message, subject):
+    assert guess_subject(message) == subject
+
+
+def test_used_prefetch_is_awaited_and_others_are_cancelled():
+    fetched = []
+
+    async def fetch(name, delay):
+        await asyncio.sleep(delay)
+        fetched.append(name)
+
+    async def turn():
+        prefetch = SpeculativePrefetch()
+        prefetch.start(("wikipedia", "colosseum"), fetch("wiki", 0))
+        prefetch.start(("attractions", "rome", ()), fetch("places", 10))
+
+        used = await prefetch.use(("wikipedia", "colosseum"))
+        missing = await prefetch.use(("wikipedia", "pantheon"))
+        prefetch.discard()
+        await asyncio.sleep(0)
+        return used, missing
+
+    used, missing = asyncio.run(turn())
+
+    assert used is True
+    assert missing is False
+    assert fetched == ["wiki"]
+
+
+def test_failed_prefetch_is_swallowed():
+    async def boom():
+        raise RuntimeError("network down")
+
+    async def turn():
+        prefetch = SpeculativePrefetch()
+        prefetch.start("k", boom())
+        return await prefetch.use("k")
+
+    assert asyncio.run(turn()) is False
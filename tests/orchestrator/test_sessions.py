@@ -0,0 +1,101 @@
+import asyncio
+from unittest.mock import patch
+
+from app.models.agent_response import AgentResponse
+from app.orchestrator.orchestrator_agent import OrchestratorAgent
+from app.orchestrator.services import get_shared_services
+from app.orchestrator.sessions import SessionManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_orchestrators_share_services():
+    first, second = OrchestratorAgent(), OrchestratorAgent()
+
+    services = get_shared_services()
+    assert first.attractions_agent is second.attractions_agent is services.attractions_agent
+    assert first.geo_client is services.attractions_agent.geo_client
+    assert first.state is not second.state
+
+
+@patch.object(OrchestratorAgent, "_decide_action", return_value=None)
+def test_sessions_keep_separate_state(_):
+    sessions = SessionManager()
+    rome, paris = sessions.open(), sessions.open()
+
+    sessions.handle_message(rome, "I'm in Rome")
+    sessions.handle_message(rome, "hello")
+    sessions.handle_message(paris, "I'm in Paris")
+
+    assert sessions.get_state(rome).turn_count == 2
+    assert sessions.get_state(paris).turn_count == 1
+    assert len(sessions) == 2
+
+
+def test_idle_sessions_are_evicted():
+    clock = FakeClock()
+    sessions = SessionManager(idle_ttl=60, clock=clock)
+    old = sessions.open()
+
+    clock.now = 30
+    recent = sessions.open()
+
+    clock.now = 70
+    assert sessions.evict_idle() == 1
+    assert old not in sessions
+    assert recent in sessions
+
+
+def test_max_sessions_evicts_least_recently_used():
+    sessions = SessionManager(max_sessions=2)
+    first, second = sessions.open(), sessions.open()
+    sessions.open(first)  # touch
+    sessions.open()
+
+    assert first in sessions
+    assert second not in sessions
+
+
+def test_turns_of_one_session_are_serialized():
+    running = []
+    overlaps = []
+
+    async def turn(self, user_input, on_token=None):
+        overlaps.append([other for other in running if other[0] == user_input[0]])
+        running.append(user_input)
+        await asyncio.sleep(0.01)
+        running.remove(user_input)
+        return AgentResponse(text=user_input)
+
+    async def main(sessions):
+        await asyncio.gather(
+            sessions.handle_message_async("a", "a1"),
+            sessions.handle_message_async("a", "a2"),
+            sessions.handle_message_async("b", "b1"),
+        )
+
+    with patch.object(OrchestratorAgent, "handle_message_async", turn):
+        asyncio.run(main(SessionManager()))
+
+    assert overlaps == [[], [], []]
+
+
+def test_new_session_survives_eviction_when_older_ones_are_active():
+    sessions = SessionManager(max_sessions=1)
+    busy = sessions.open()
+    sessions._sessions[busy].active += 1  # a turn is in progress
+
+    async def turn(self, user_input, on_token=None):
+        return AgentResponse(text=user_input)
+
+    with patch.object(OrchestratorAgent, "handle_message_async", turn):
+        sessions.handle_message("fresh", "hello")
+
+    assert "fresh" in sessions
+    assert busy in sessions
@@ -0,0 +1,92 @@
+import numpy as np
+
+from app.ranking.attractions_ranker import (
+    AttractionsRanker,
+    category_match,
+    haversine_m,
+    popularity_from_properties,
+)
+
+MUSEUM = "entertainment.museum"
+
+
+def place(name, lat, lon, categories, popularity=0.0):
+    return {"name": name, "lat": lat, "lon": lon, "categories": categories, "popularity": popularity}
+
+
+def test_category_match_follows_hierarchy():
+    assert category_match(MUSEUM, MUSEUM) == 1.0
+    assert category_match("catering.restaurant.pizza", "catering.restaurant") == 0.9
+    assert category_match("entertainment", MUSEUM) == 0.5
+    assert category_match("entertainment.zoo", MUSEUM) == 0.25
+    assert category_match("leisure.park", MUSEUM) == 0.0
+
+
+def test_haversine_is_vectorized():
+    d = haversine_m(41.0, 12.0, np.array([41.0, 42.0]), np.array([12.0, 12.0]))
+
+    assert d[0] == 0.0
+    assert abs(d[1] - 111_195) < 100
+
+
+def test_popularity_signals():
+    props = {"website": "https://x", "datasource": {"raw": {"wikidata": "Q1"}}}
+
+    assert popularity_from_properties(props) == 0.55
+    assert popularity_from_properties({}) == 0.0
+
+
+def test_rank_prefers_matching_close_popular_places():
+    places = [
+        place("Far museum", 41.925, 12.5, [MUSEUM]),
+        place("Park", 41.9, 12.5, ["leisure.park"]),
+        place("Near museum", 41.901, 12.5, [MUSEUM], popularity=0.7),
+    ]
+
+    ranked = AttractionsRanker().rank(
+        places, 41.9, 12.5, {MUSEUM: "museum"}, radius_m=3000, limit=2
+    )
+
+    assert [r.place["name"] for r in ranked] == ["Near museum", "Far museum"]
+    assert ranked[0].matched_preference == "museum"
+    assert ranked[0].matched_category == MUSEUM
+    assert 100 < ranked[0].distance_m < 120
+
+
+def test_scorers_are_pluggable():
+    places = [place("A", 41.9, 12.5, []), place("B", 41.95, 12.5, [])]
+    farthest_first = [(1.0, lambda arrays, query: arrays.lat - query.lat)]
+
+    ranked = AttractionsRanker(scorers=farthest_first).rank(places, 41.9, 12.5, {}, 10_000)
+
+    assert [r.place["name"] for r in ranked] == ["B", "A"]
+
+
+def test_incremental_ranking_matches_one_shot():
+    places = [
+        place(f"p{i}", 41.9 + (i % 7) * 0.002, 12.5, [MUSEUM if i % 3 else "leisure.park"], popularity=(i % 5) / 5)
+        for i in range(40)
+    ]
+    ranker = AttractionsRanker()
+
+    one_shot = ranker.rank(places, 41.9, 12.5, {MUSEUM: "museum"}, 3000, limit=6)
+
+    accumulator = ranker.accumulator(41.9, 12.5, {MUSEUM: "museum"}, 3000, limit=6)
+    for start in range(0, len(places), 9):
+        accumulator.add(places[start:start + 9])
+
+    assert accumulator.count == 40
+    assert [r.place["name"] for r in accumulator.results()] == [r.place["name"] for r in one_shot]
+
+
+def test_ties_do_not_depend_on_batch_arrival_order():
+    places = [dict(place(name, 41.9, 12.5, [MUSEUM]), place_id=name) for name in "dcba"]
+    ranker = AttractionsRanker()
+
+    def top(batches):
+        accumulator = ranker.accumulator(41.9, 12.5, {MUSEUM: "museum"}, 3000, limit=2)
+        for batch in batches:
+            accumulator.add(batch)
+        return [r.place["name"] for r in accumulator.results()]
+
+    assert top([places[:2], places[2:]]) == top([places[2:], places[:2]]) == ["a", "b"]
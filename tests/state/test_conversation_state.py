@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import pytest
+
+from app.state.conversation_state import ConversationState
+from app.taxonomy import PREFERENCES
+
+
+def test_preferences_keep_insertion_order():
+    state = ConversationState()
+    state.update_from_extraction({"preferences": ["food", "museums"], "request": "old ruins"})
+    state.update_from_extraction({"preferences": ["parks", "food"]})
+
+    assert state.preferences == ["food", "museum", "history", "park"]
+    assert state.user_goal == "discover_attractions"
+    assert isinstance(state.preference_mask, int)
+
+
+def test_preferences_init_argument_and_append():
+    state = ConversationState(preferences=["galleries", "food"])
+    assert state.preferences == ["museum", "food"]
+
+    # Appended synonyms are canonicalized on the next update
+    state.preferences.append("parks")
+    state.update_from_extraction({"preferences": ["food"]})
+
+    assert state.preferences == ["museum", "food", "park"]
+
+
+def test_long_strings_are_cut_on_a_character_boundary():
+    state = ConversationState(subject_name="é" * 40_000)
+
+    restored = ConversationState.from_bytes(state.to_bytes())
+
+    assert restored.subject_name == "é" * 32_767
+
+
+def test_state_is_slotted_and_interns_cities():
+    first = ConversationState()
+    first.update_from_extraction({"city": "".join(["Ro", "me"])})
+    second = ConversationState(city="".join(["Ro", "me"]))
+
+    assert first.city is second.city
+    with pytest.raises(AttributeError):
+        first.unknown_field = 1
+
+
+def test_last_updated_is_derived_from_epoch_seconds():
+    state = ConversationState()
+    state.last_updated = datetime(2024, 5, 1, 12, 30)
+
+    assert state.updated_at == 1714566600
+    assert state.last_updated == datetime(2024, 5, 1, 12, 30)
+
+
+def test_bytes_round_trip():
+    state = ConversationState(
+        user_goal="learn_about_place",
+        goal_confidence=0.8,
+        subject_name="Colosseo",
+        city="Roma",
+        country="Italia",
+        latitude=41.89,
+        longitude=0.0,
+        awaiting_confirmation=True,
+        turn_count=3,
+    )
+    state.preferences = ["history", "art"]
+
+    data = state.to_bytes()
+    restored = ConversationState.from_bytes(data)
+
+    assert restored == state
+    assert restored.preferences == ["history", "art"]
+    assert restored.subject_type is None
+    assert len(data) < 128
+
+
+def test_from_bytes_rejects_unknown_versions():
+    data = bytearray(ConversationState().to_bytes())
+    data[0] = 99
+
+    with pytest.raises(ValueError):
+        ConversationState.from_bytes(bytes(data))
+
+
+def test_from_bytes_rejects_a_different_vocabulary(monkeypatch):
+    data = ConversationState(preferences=["history"]).to_bytes()
+    monkeypatch.setattr("app.state.conversation_state._VOCABULARY_IDS", [0] * 256)
+
+    with pytest.raises(ValueError, match="vocabulary"):
+        ConversationState.from_bytes(data)
+
+
+def test_states_survive_appended_vocabulary(monkeypatch):
+    # Written before the last key was appended
+    monkeypatch.setattr(
+        "app.state.conversation_state._VOCABULARY_SIZE", len(PREFERENCES) - 1
+    )
+    data = ConversationState(preferences=["history"]).to_bytes()
+    monkeypatch.undo()
+
+    assert ConversationState.from_bytes(data).preferences == ["history"]
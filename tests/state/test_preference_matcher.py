@@ -0,0 +1,51 @@
+import pytest
+
+from app.state.conversation_state import normalize_preferences
+from app.state.preference_matcher import PreferenceMatcher, load_vocabulary
+
+VOCABULARY = {
+    "art": ["art", "modern art", "painting"],
+    "museum": ["museum", "gallery", "art museum"],
+    "sightseeing": ["must see", "landmark"],
+}
+
+
+@pytest.fixture
+def matcher():
+    return PreferenceMatcher(VOCABULARY)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("I love Modern Art", ["art"]),
+    ("any good galleries?", ["museum"]),
+    ("paintings and museums", ["art", "museum"]),
+    ("the art museum", ["art", "museum"]),
+    ("what's a must-see landmark here", ["sightseeing"]),
+    ("a party at the apartment", []),
+    ("must have seen it", []),
+])
+def test_match(matcher, text, expected):
+    assert matcher.match(text) == expected
+
+
+def test_find_reports_overlapping_matches(matcher):
+    # "modern art" / "art" end on word 1, "art museum" / "museum" on word 2
+    assert sorted(matcher.find("modern art museum")) == [("art", 1), ("museum", 2)]
+
+
+def test_vocabulary_is_loaded_from_yaml(tmp_path):
+    base = tmp_path / "base.yaml"
+    base.write_text("food:\n  - restaurant\n", encoding="utf-8")
+    extra = tmp_path / "extra.yaml"
+    extra.write_text("food:\n  - street food\nnightlife:\n  - bar\n  - club\n", encoding="utf-8")
+
+    matcher = PreferenceMatcher.from_yaml(str(base), str(extra))
+
+    assert load_vocabulary(str(extra))["nightlife"] == ["bar", "club"]
+    assert matcher.match("street food, then bars") == ["food", "nightlife"]
+    assert matcher.match("restaurants") == ["food"]
+
+
+def test_normalize_preferences_uses_word_boundaries():
+    assert normalize_preferences(["Museums and ancient ruins", 3, "party"]) == ["museum", "history"]
+    assert normalize_preferences(["art"]) == ["art"]
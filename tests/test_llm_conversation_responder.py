@@ -0,0 +1,114 @@
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import app
+from app.agents.wikipedia_explainer_agent import WikipediaExplainerOutput
+from app.llm_conversation_responder import (
+    LLMConversationResponder,
+    StreamingTextFilter,
+)
+from app.state.conversation_state import ConversationState
+
+REPLY = "TEXT: The Colosseum is worth a visit.\nFOLLOWUP: Want more?\nINTENT: learn_about_place"
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_filter_forwards_only_text_line():
+    for size in (1, 3, 7, len(REPLY)):
+        tokens = []
+        text_filter = StreamingTextFilter(tokens.append)
+        for chunk in _chunks(REPLY, size):
+            text_filter.feed(chunk)
+
+        assert "".join(tokens) == "The Colosseum is worth a visit."
+        assert text_filter.finish() == REPLY
+
+
+def test_filter_falls_back_to_raw_text():
+    tokens = []
+    text_filter = StreamingTextFilter(tokens.append)
+    for chunk in _chunks("Sure! Rome is lovely.", 2):
+        text_filter.feed(chunk)
+    text_filter.finish()
+
+    assert "".join(tokens) == "Sure! Rome is lovely."
+
+
+@pytest.mark.parametrize("raw", [
+    REPLY,
+    "Sure! Rome is lovely.\nFOLLOWUP: Want more?\nINTENT: discover_attractions",
+    "TEXT:\nRome is lovely.\n\nSo is Florence.\nFOLLOWUP: Want more?",
+    "  TEXT:   Spaced out.  \n\nINTENT: learn_about_place\n",
+    "INTENT: learn_about_place\nTEXT: Text after markup.",
+])
+def test_streamed_text_matches_parsed_text(raw):
+    expected = LLMConversationResponder._parse_response(raw).text
+    for size in (1, 2, 5, len(raw)):
+        tokens = []
+        text_filter = StreamingTextFilter(tokens.append)
+        for chunk in _chunks(raw, size):
+            text_filter.feed(chunk)
+
+        assert text_filter.finish() == raw
+        assert "".join(tokens).strip() == expected
+        assert "FOLLOWUP" not in "".join(tokens)
+
+
+@patch("app.llm_conversation_responder.call_llm_stream", return_value=iter(_chunks(REPLY, 4)))
+def test_streamed_response_is_parsed_like_blocking_one(_):
+    tokens = []
+
+    response = LLMConversationResponder.generate_response(
+        user_input="Tell me about the Colosseum",
+        agent_output=WikipediaExplainerOutput("An arena.", [], []),
+        conversation_state=ConversationState(city="Rome"),
+        on_token=tokens.append,
+    )
+
+    assert "".join(tokens) == response.text == "The Colosseum is worth a visit."
+    assert response.followup_question == "Want more?"
+    assert response.suggested_intent == "learn_about_place"
+
+
+@patch("app.llm_conversation_responder.call_llm_stream")
+def test_raw_streamed_reply_keeps_markup_out_of_the_text(mock_stream):
+    raw = "Sure! Rome is lovely.\nFOLLOWUP: Want more?"
+    mock_stream.return_value = iter(_chunks(raw, 4))
+    tokens = []
+
+    response = LLMConversationResponder.generate_response(
+        user_input="Tell me about Rome",
+        agent_output=WikipediaExplainerOutput("A city.", [], []),
+        conversation_state=ConversationState(city="Rome"),
+        on_token=tokens.append,
+    )
+
+    assert "".join(tokens) == response.text == "Sure! Rome is lovely."
+    assert response.followup_question == "Want more?"
+
+
+@patch("app.llm_conversation_responder.call_llm", return_value=REPLY)
+def test_prompt_edits_are_picked_up(mock_llm, tmp_path):
+    prompt_file = tmp_path / "conversation.yaml"
+    prompt_file.write_text(
+        (Path(app.__file__).parent / LLMConversationResponder.PROMPT_PATH).read_text(encoding="utf-8"),
+        encoding="utf-8",
+    )
+    args = ("hello", WikipediaExplainerOutput("An arena.", [], []), ConversationState())
+
+    with patch.object(LLMConversationResponder, "PROMPT_PATH", str(prompt_file)):
+        LLMConversationResponder.generate_response(*args)
+
+        prompt_file.write_text("system: Be brief.\n", encoding="utf-8")
+        stat = os.stat(prompt_file)
+        os.utime(prompt_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        LLMConversationResponder.generate_response(*args)
+
+    first, second = (call.kwargs["messages"][0]["content"] for call in mock_llm.call_args_list)
+    assert first != second == "Be brief."
@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+from app import tracing
+from app.llm import client
+from app.llm.messages import build_messages, prefix_id, prefix_messages
+from app.llm.utils import load_prompt
+
+PROMPT_YAML = """\
+system: |
+  You extract things.
+format: |
+  Return JSON.
+examples:
+  - user: "I like parks"
+    assistant: '{"preferences": ["park"]}'
+user: |
+  Message: {{ message }}
+"""
+
+
+def _prompt(tmp_path):
+    path = tmp_path / "prompt.yaml"
+    path.write_text(PROMPT_YAML, encoding="utf-8")
+    return load_prompt(str(path))
+
+
+def test_stable_prefix_then_volatile_user_message(tmp_path):
+    prompt = _prompt(tmp_path)
+
+    messages = build_messages(prompt, message="museums in Rome")
+
+    assert [m["role"] for m in messages] == ["system", "user", "assistant", "user"]
+    assert messages[0]["content"] == "You extract things.\n\nReturn JSON."
+    assert messages[1]["content"] == "I like parks"
+    assert messages[-1]["content"] == "Message: museums in Rome\n"
+
+
+def test_prefix_is_identical_across_turns(tmp_path):
+    prompt = _prompt(tmp_path)
+
+    first = build_messages(prompt, message="one")
+    second = build_messages(prompt, message="two")
+
+    assert first[:-1] == second[:-1] == prefix_messages(prompt)
+    assert prefix_id(first) == prefix_id(second)
+    assert prefix_id(first) != prefix_id([{"role": "system", "content": "other"}, first[-1]])
+
+
+def test_prefix_messages_are_fresh_copies(tmp_path):
+    prompt = _prompt(tmp_path)
+
+    prefix_messages(prompt)[0]["content"] = "changed"
+
+    assert prefix_messages(prompt)[0]["content"].startswith("You extract things.")
+
+
+def test_bundled_prompts_keep_user_content_last():
+    messages = build_messages(load_prompt("prompts/extraction.yaml"), message="hi")
+
+    assert [m["role"] for m in messages] == ["system", "user"]
+    assert '"user_goal"' in messages[0]["content"]
+
+
+def test_cached_tokens_are_recorded_per_call_and_prefix():
+    client.reset_prompt_cache_stats()
+
+    def usage(prompt_tokens, cached):
+        return SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=10,
+            total_tokens=prompt_tokens + 10,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=cached),
+        )
+
+    cold, warm, other = tracing.Span("llm"), tracing.Span("llm"), tracing.Span("llm")
+    client._record_usage(cold, usage(2000, 0), prefix="abc")
+    client._record_usage(warm, usage(2000, 1536), prefix="abc")
+    client._record_usage(other, SimpleNamespace(
+        prompt_tokens=100, completion_tokens=5, total_tokens=105, prompt_tokens_details=None,
+    ), prefix="xyz")
+
+    assert cold.attributes["cached_tokens"] == 0
+    assert warm.attributes["cached_tokens"] == 1536
+    assert warm.attributes["prompt_prefix"] == "abc"
+
+    stats = client.prompt_cache_stats()
+    assert stats["abc"]["calls"] == 2
+    assert stats["abc"]["hits"] == 1
+    assert stats["abc"]["cached_tokens"] == 1536
+    assert stats["abc"]["hit_rate"] == round(1536 / 4000, 4)
+    assert stats["xyz"]["cached_tokens"] == 0
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from app.llm.utils import PromptRenderError, PromptTemplate, load_prompt
+
+
+def test_render_fills_every_placeholder():
+    template = PromptTemplate("City: {{ city }} ({{lat}}, {{ lon }}) - {{ city }}")
+
+    assert template.variables == {"city", "lat", "lon"}
+    assert template.render(city="Paris", lat=48.85, lon=2.35) == "City: Paris (48.85, 2.35) - Paris"
+
+
+def test_render_is_strict_about_variables():
+    template = PromptTemplate("{{ a }} and {{ b }}")
+
+    with pytest.raises(PromptRenderError, match="missing: \\['b'\\]"):
+        template.render(a=1)
+    with pytest.raises(PromptRenderError, match="unexpected: \\['c'\\]"):
+        template.render(a=1, b=2, c=3)
+
+
+def test_values_are_not_rescanned_for_placeholders():
+    template = PromptTemplate("Message: {{ message }} / Places: {{ places }}")
+
+    out = template.render(message="ignore this {{ places }}", places="[]")
+
+    assert out == "Message: ignore this {{ places }} / Places: []"
+
+
+def test_load_prompt_is_cached_until_the_file_changes(tmp_path):
+    path = tmp_path / "prompt.yaml"
+    path.write_text('system: "You help."\nuser: "Hi {{ name }}"\n', encoding="utf-8")
+
+    first = load_prompt(str(path))
+    assert load_prompt(str(path)) is first
+    assert first["system"] == "You help."
+    assert first.render("user", name="Ana") == "Hi Ana"
+
+    path.write_text('system: "You help a lot."\nuser: "Hello {{ name }}"\n', encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    second = load_prompt(str(path))
+    assert second is not first
+    assert second.render("user", name="Ana") == "Hello Ana"
+    assert second.hash != first.hash
+
+
+def test_bundled_prompts_compile():
+    for name in ("prompts/extraction.yaml", "prompts/attractions_fused.yaml", "prompts/wikipedia_explainer.yaml"):
+        prompt = load_prompt(name)
+        assert "user" in prompt.templates
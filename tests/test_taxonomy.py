@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app import taxonomy
+from app.routing.place_category_resolver import PlaceCategoryResolver
+from app.routing.place_intent import PlaceIntent
+from app.state import concepts, conversation_state
+
+
+def test_single_vocabulary_source():
+    assert concepts.PREFERENCE_SYNONYMS is taxonomy.PREFERENCE_SYNONYMS
+    assert conversation_state.PREFERENCE_SYNONYMS is taxonomy.PREFERENCE_SYNONYMS
+    assert "museum" in taxonomy.PREFERENCE_SYNONYMS["museum"]
+
+
+def test_tables_are_frozen():
+    with pytest.raises(TypeError):
+        taxonomy.TERM_CATEGORIES["food"] = "catering.cafe"
+
+
+@pytest.mark.parametrize("term, category", [
+    ("museum", "entertainment.museum"),
+    ("Galleries", "entertainment.museum"),
+    ("restaurants", "catering.restaurant"),
+    ("cafe", "catering.cafe"),
+    ("culture", "entertainment.culture"),
+    ("unknown", None),
+])
+def test_category_for_terms(term, category):
+    assert taxonomy.category_for(term) == category
+
+
+def test_category_hierarchy():
+    assert taxonomy.CATEGORY_ANCESTORS["entertainment.culture.gallery"] == (
+        "entertainment.culture",
+        "entertainment",
+    )
+    assert "entertainment.culture.gallery" in taxonomy.CATEGORY_DESCENDANTS["entertainment.culture"]
+    assert taxonomy.is_subcategory("entertainment.culture.gallery", "entertainment.culture")
+    assert not taxonomy.is_subcategory("entertainment.culture", "entertainment.culture")
+    assert taxonomy.is_subcategory("catering.restaurant.pizza", "catering")
+
+
+def test_intent_resolution_shares_the_taxonomy():
+    assert PlaceCategoryResolver.resolve(PlaceIntent.MUSEUM) == taxonomy.intent_category(PlaceIntent.MUSEUM)
+    assert taxonomy.categories_for(["art", "painting", "park"]) == {
+        "entertainment.culture.gallery": "art",
+        "leisure.park": "park",
+    }
+
+
+def test_oversized_vocabulary_is_rejected(tmp_path):
+    vocab = tmp_path / "extra.yaml"
+    vocab.write_text("".join(f"pref{i}: [term{i}]\n" for i in range(300)), encoding="utf-8")
+
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.taxonomy"],
+        env={**os.environ, "NAVAN_PREFERENCE_VOCAB": str(vocab)},
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode != 0
+    assert "at most 255" in result.stderr
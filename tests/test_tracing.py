@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+from app import tracing
+
+
+def test_spans_nest_under_the_active_trace():
+    with tracing.trace("turn") as root:
+        with tracing.span("extraction") as span:
+            span.add(total_tokens=10)
+            span.add(total_tokens=5)
+        with tracing.span("responder"):
+            with tracing.span("llm", model="gpt-4"):
+                pass
+
+    data = root.to_dict()
+
+    assert [c["name"] for c in data["children"]] == ["extraction", "responder"]
+    assert data["children"][0]["attributes"]["total_tokens"] == 15
+    assert data["children"][1]["children"][0]["attributes"]["model"] == "gpt-4"
+    assert data["duration_ms"] >= 0
+
+
+def test_span_is_noop_outside_a_trace():
+    with tracing.span("geoapify.places") as span:
+        span.set(cache_hit=True)
+
+    assert tracing.current_span() is span
+
+
+def test_concurrent_tasks_attach_to_parent_span():
+    async def fetch(title):
+        with tracing.span("wikipedia.fetch", title=title):
+            await asyncio.sleep(0)
+
+    async def run():
+        with tracing.trace("turn") as root:
+            with tracing.span("wikipedia_agent"):
+                await asyncio.gather(fetch("a"), fetch("b"))
+        return root
+
+    root = asyncio.run(run())
+
+    agent = root.children[0]
+    assert sorted(c.attributes["title"] for c in agent.children) == ["a", "b"]
+
+
+def test_json_lines_exporter(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = tracing.JsonLinesExporter(str(path))
+    tracing.add_hook(exporter)
+    try:
+        with tracing.trace("turn", turn=1):
+            with tracing.span("extraction"):
+                pass
+    finally:
+        tracing.remove_hook(exporter)
+
+    line = json.loads(path.read_text().strip())
+    assert line["attributes"] == {"turn": 1}
+    assert line["children"][0]["name"] == "extraction"
@@ -0,0 +1,83 @@
+import pytest
+
+from app.tools import gazetteer
+from app.tools.gazetteer import Gazetteer, build_index, normalize
+
+# geonameid, name, asciiname, alternatenames, lat, lon, class, code, country, cc2,
+# admin1-4, population, elevation, dem, timezone, modified
+CITIES = [
+    ("3169070", "Rome", "Rome", "Roma,Rom,Rzym", "41.89193", "12.51133", "IT", "2318895"),
+    ("4219762", "Rome", "Rome", "", "34.25704", "-85.16467", "US", "36303"),
+    ("2988507", "Paris", "Paris", "Lutetia,Parigi", "48.85341", "2.3488", "FR", "2138551"),
+    ("4717560", "Paris", "Paris", "", "33.66094", "-95.55551", "US", "24782"),
+    ("3448439", "São Paulo", "Sao Paulo", "Sampa", "-23.5475", "-46.63611", "BR", "10021295"),
+]
+
+COUNTRIES = [("IT", "Italy"), ("US", "United States"), ("FR", "France"), ("BR", "Brazil")]
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    cities = tmp_path / "cities.txt"
+    cities.write_text("".join(
+        "\t".join([gid, name, ascii_name, alts, lat, lon, "P", "PPL", cc, "", "", "", "", "", pop, "", "", "", ""]) + "\n"
+        for gid, name, ascii_name, alts, lat, lon, cc, pop in CITIES
+    ), encoding="utf-8")
+
+    countries = tmp_path / "countryInfo.txt"
+    countries.write_text(
+        "#ISO\tISO3\tISO-Numeric\tfips\tCountry\n"
+        + "".join(f"{code}\tXXX\t000\tXX\t{name}\n" for code, name in COUNTRIES),
+        encoding="utf-8",
+    )
+
+    out = tmp_path / "gazetteer.bin"
+    assert build_index(str(cities), str(out), countries_path=str(countries)) == len(CITIES)
+    return str(out)
+
+
+def test_normalize():
+    assert normalize("  São  Paulo ") == "sao paulo"
+    assert normalize("Frankfurt-am-Main") == "frankfurt am main"
+
+
+def test_most_populous_match_wins(index_path):
+    g = Gazetteer(index_path)
+
+    rome = g.lookup("rome")
+    assert (rome.name, rome.country_code, rome.country) == ("Rome", "IT", "Italy")
+    assert [c.country_code for c in g.candidates("Rome")] == ["IT", "US"]
+    g.close()
+
+
+def test_aliases_and_accents(index_path):
+    g = Gazetteer(index_path)
+
+    assert g.lookup("Roma").name == "Rome"
+    assert g.lookup("sao paulo").name == "São Paulo"
+    assert g.lookup("Sampa").country_code == "BR"
+    assert g.lookup("Atlantis") is None
+    g.close()
+
+
+def test_country_disambiguation(index_path):
+    g = Gazetteer(index_path)
+
+    assert g.lookup("Paris", country="US").lat == pytest.approx(33.66094)
+    assert g.lookup("Paris", country="united states").country_code == "US"
+    assert g.lookup("Paris", country="USA").country_code == "US"
+    assert g.lookup("Paris, France").country_code == "FR"
+    assert g.lookup("Rome", country="Brazil") is None
+    # Unknown country names do not hide the match
+    assert g.lookup("Rome", country="Narnia").country_code == "IT"
+    g.close()
+
+
+def test_lookup_city_uses_configured_index(index_path):
+    try:
+        gazetteer.configure(index_path)
+        assert gazetteer.lookup_city("Parigi").name == "Paris"
+    finally:
+        gazetteer.configure(None)
+
+    assert gazetteer.lookup_city("Paris") is None
@@ -0,0 +1,25 @@
+from unittest.mock import MagicMock
+
+from app.orchestrator import services
+from app.orchestrator.services import SharedServices
+from app.tools.geo_tool import GeoTool
+
+
+def test_geo_tool_uses_the_shared_services():
+    shared = SharedServices.create(geo_client=MagicMock())
+    services.configure(shared)
+    try:
+        tool = GeoTool()
+    finally:
+        services.configure(None)
+
+    assert tool.geo_client is shared.geo_client
+    assert tool.place_index is shared.place_index
+
+
+def test_geo_tool_builds_an_index_around_an_injected_client():
+    client = MagicMock()
+
+    tool = GeoTool(geo_client=client)
+
+    assert tool.place_index.geo_client is client
@@ -0,0 +1,144 @@
+from unittest.mock import patch
+
+from app.tools.cache import SQLiteCache, TieredCache, TTLCache
+from app.tools.geoapify_client import GeoapifyClient
+
+GEOCODE_RESPONSE = {
+    "features": [
+        {
+            "geometry": {"coordinates": [12.4964, 41.9028]},
+            "properties": {"city": "Rome", "lat": 41.9028, "lon": 12.4964},
+        }
+    ]
+}
+
+
+def _client(cache=None, api_key="test-key"):
+    return GeoapifyClient(api_key=api_key, cache=cache or TieredCache(TTLCache()))
+
+
+@patch("app.tools.geoapify_client.transport.get")
+def test_geocode_is_served_from_cache(mock_get):
+    mock_get.return_value.ok = True
+    mock_get.return_value.json.return_value = GEOCODE_RESPONSE
+    client = _client()
+
+    first = client.geocode("Rome", limit=1)
+    second = client.geocode("  rome ", limit=1)
+
+    assert first == second == GEOCODE_RESPONSE
+    assert mock_get.call_count == 1
+    assert client.cache.namespace_stats["geocode/search"].hits == 1
+    assert client.cache.namespace_stats["geocode/search"].misses == 1
+
+
+@patch("app.tools.geoapify_client.transport.get")
+def test_cache_key_ignores_api_key(mock_get):
+    mock_get.return_value.ok = True
+    mock_get.return_value.json.return_value = GEOCODE_RESPONSE
+    cache = TieredCache(TTLCache())
+
+    _client(cache, api_key="key-a").geocode("Rome")
+    _client(cache, api_key="key-b").geocode("Rome")
+
+    assert mock_get.call_count == 1
+
+
+@patch("app.tools.geoapify_client.transport.get")
+def test_expired_entries_are_refetched(mock_get):
+    mock_get.return_value.ok = True
+    mock_get.return_value.json.return_value = {"features": []}
+    client = GeoapifyClient(
+        api_key="test-key",
+        cache=TieredCache(TTLCache()),
+        cache_ttls={"places": -1},
+    )
+
+    client.places("catering.restaurant", lat=41.9, lon=12.5)
+    client.places("catering.restaurant", lat=41.9, lon=12.5)
+
+    assert mock_get.call_count == 2
+
+
+@patch("app.tools.geoapify_client.transport.get")
+def test_errors_are_not_cached(mock_get):
+    mock_get.return_value.ok = False
+    mock_get.return_value.status_code = 500
+    client = _client()
+
+    for _ in range(2):
+        try:
+            client.reverse_geocode(41.9, 12.5)
+        except RuntimeError:
+            pass
+
+    assert mock_get.call_count == 2
+
+
+@patch("app.tools.geoapify_client.transport.get")
+def test_disk_tier_survives_new_memory_tier(mock_get, tmp_path):
+    mock_get.return_value.ok = True
+    mock_get.return_value.json.return_value = GEOCODE_RESPONSE
+    disk = SQLiteCache(str(tmp_path / "geoapify.sqlite"))
+
+    _client(TieredCache(TTLCache(), disk)).geocode("Rome")
+    result = _client(TieredCache(TTLCache(), disk)).geocode("Rome")
+
+    assert result == GEOCODE_RESPONSE
+    assert mock_get.call_count == 1
+
+
+def _page(start, count):
+    return {"features": [
+        {
+            "properties": {"place_id": f"p{i}", "name": f"Place {i}", "categories": ["tourism.sights"]},
+            "geometry": {"coordinates": [12.5, 41.9]},
+        }
+        for i in range(start, start + count)
+    ]}
+
+
+@patch("app.tools.geoapify_client.transport.get")
+def test_iter_places_pages_by_offset(mock_get):
+    pages = [_page(0, 2), _page(2, 2), _page(4, 1)]
+    mock_get.return_value.ok = True
+    mock_get.return_value.json.side_effect = pages
+
+    items = list(_client().iter_places("tourism.sights", 41.9, 12.5, page_size=2))
+
+    assert [i["place_id"] for i in items] == ["p0", "p1", "p2", "p3", "p4"]
+    assert items[0] == {
+        "place_id": "p0", "name": "Place 0", "categories": ["tourism.sights"],
+        "address": None, "lat": 41.9, "lon": 12.5,
+    }
+    offsets = [call.kwargs["params"].get("offset") for call in mock_get.call_args_list]
+    assert offsets == [None, 2, 4]
+
+
+@patch("app.tools.geoapify_client.transport.get")
+def test_iter_places_stops_early(mock_get):
+    mock_get.return_value.ok = True
+    mock_get.return_value.json.side_effect = [_page(0, 3), _page(0, 3), _page(3, 1)]
+
+    items = _client().iter_places("tourism.sights", 41.9, 12.5, page_size=3)
+    first = next(items)
+
+    assert first["place_id"] == "p0"
+    assert mock_get.call_count == 1
+
+    limited = list(_client().iter_places("tourism.sights", 41.9, 12.5, page_size=3, max_results=4))
+    assert len(limited) == 4
+    assert mock_get.call_args.kwargs["params"]["limit"] == 1
+
+
+@patch("app.tools.geoapify_client.transport.get")
+def test_deep_pages_stay_out_of_the_shared_cache(mock_get):
+    mock_get.return_value.ok = True
+    mock_get.return_value.json.side_effect = [_page(0, 2), _page(2, 2), _page(4, 1)]
+    shared, pages = TieredCache(TTLCache()), TieredCache(TTLCache(maxsize=8))
+    client = GeoapifyClient(api_key="test-key", cache=shared, page_cache=pages)
+
+    list(client.iter_places("tourism.sights", 41.9, 12.5, page_size=2))
+
+    assert len(shared.memory) == 1  # first page only
+    assert len(pages.memory) == 2
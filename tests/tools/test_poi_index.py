@@ -0,0 +1,159 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+from app.tools.cache import TieredCache, TTLCache
+from app.tools.geoapify_client import GeoapifyClient, get_shared_cache
+from app.tools.poi_index import PlaceIndex, Tile, haversine_m, tiles_for
+
+
+def feature(place_id, lat, lon, name=None):
+    return {
+        "type": "Feature",
+        "properties": {"place_id": place_id, "name": name or place_id},
+        "geometry": {"type": "Point", "coordinates": [lon, lat]},
+    }
+
+
+def fake_client(features):
+    """
+    Geoapify stand-in: returns the given features that fall inside the rect.
+    """
+    def in_rect(categories, rect, limit=500, named_only=True, use_cache=True):
+        west, south, east, north = rect
+        return {"features": [
+            f for f in features
+            if west <= f["geometry"]["coordinates"][0] <= east
+            and south <= f["geometry"]["coordinates"][1] <= north
+        ]}
+
+    async def in_rect_async(*args, **kwargs):
+        return in_rect(*args, **kwargs)
+
+    client = MagicMock()
+    client.places_in_rect.side_effect = in_rect
+    client.places_in_rect_async.side_effect = in_rect_async
+    client.places.return_value = {"type": "FeatureCollection", "features": ["circle"]}
+    return client
+
+
+PLACES = [
+    feature("near", 41.9000, 12.5000),
+    feature("close", 41.9050, 12.5050),
+    feature("far", 41.9900, 12.6000),
+]
+
+
+def test_haversine():
+    # One degree of latitude is ~111 km
+    assert abs(haversine_m(41.0, 12.0, 42.0, 12.0) - 111_195) < 100
+
+
+def test_tiles_cover_the_circle():
+    tiles = tiles_for("catering.cafe", 41.9, 12.5, radius=3000)
+
+    assert len(tiles) >= 2
+    assert all(isinstance(t, Tile) and t.category == "catering.cafe" for t in tiles)
+    assert Tile("x", True, 250, 838).rect == (12.5, 41.9, 12.55, 41.95)
+
+
+def test_nearby_filters_by_radius_and_sorts_by_distance():
+    index = PlaceIndex(fake_client(PLACES), store=TieredCache(TTLCache()))
+
+    result = index.nearby("catering.cafe", 41.9001, 12.5001, radius=1500, limit=10)
+
+    assert [f["properties"]["place_id"] for f in result["features"]] == ["near", "close"]
+
+
+def test_second_query_nearby_is_served_from_tiles():
+    client = fake_client(PLACES)
+    index = PlaceIndex(client, store=TieredCache(TTLCache()), fetch_budget=8)
+
+    index.nearby("catering.cafe,entertainment.museum", 41.9001, 12.5001, radius=1000)
+    fetched = client.places_in_rect.call_count
+    assert fetched > 0
+
+    # A few hundred meters away: same tiles, no new requests
+    result = index.nearby("entertainment.museum,catering.cafe", 41.9030, 12.5030, radius=1000)
+
+    assert client.places_in_rect.call_count == fetched
+    assert len(result["features"]) == 2
+
+
+def test_async_nearby_fetches_only_missing_tiles():
+    client = fake_client(PLACES)
+    store = TieredCache(TTLCache())
+    PlaceIndex(client, store=store).nearby("catering.cafe", 41.9001, 12.5001, radius=1000)
+
+    index = PlaceIndex(client, store=store)
+    result = asyncio.run(index.nearby_async("catering.cafe", 41.9001, 12.5001, radius=1000, limit=1))
+
+    client.places_in_rect_async.assert_not_called()
+    assert [f["properties"]["place_id"] for f in result["features"]] == ["near"]
+
+
+def test_cold_query_over_the_fetch_budget_uses_one_circle_query():
+    client = fake_client(PLACES)
+    index = PlaceIndex(client, store=TieredCache(TTLCache()), fetch_budget=1)
+
+    result = index.nearby("catering.cafe", 41.9001, 12.5001, radius=1000)
+
+    assert result["features"] == ["circle"]
+    client.places_in_rect.assert_not_called()
+    client.places.assert_called_once()
+
+
+def test_truncated_tiles_are_not_treated_as_covered(monkeypatch):
+    monkeypatch.setattr("app.tools.poi_index.TILE_LIMIT", 1)
+    client = fake_client(PLACES)
+    index = PlaceIndex(client, store=TieredCache(TTLCache()))
+
+    # The tile holding "near" and "close" hits the (patched) cap
+    assert index.nearby("catering.cafe", 41.9001, 12.5001, radius=1000)["features"] == ["circle"]
+    fetched = client.places_in_rect.call_count
+
+    # Dense tile is remembered: straight to the circle query, no tile refetch
+    assert index.nearby("catering.cafe", 41.9001, 12.5001, radius=1000)["features"] == ["circle"]
+    assert client.places_in_rect.call_count == fetched
+    assert client.places.call_count == 2
+
+
+def test_tiles_store_compact_features():
+    rich = feature("near", 41.9000, 12.5000)
+    rich["properties"].update({
+        "categories": ["catering.cafe"],
+        "website": "https://example.org",
+        "address_line2": "Via Roma 1",
+        "datasource": {"raw": {"wikidata": "Q1", "osm_id": 42, "addr:street": "Via Roma"}},
+    })
+    rich["bbox"] = [12.4, 41.8, 12.6, 42.0]
+    index = PlaceIndex(fake_client([rich]), store=TieredCache(TTLCache()))
+
+    (stored,) = index.nearby("catering.cafe", 41.9001, 12.5001, radius=1000)["features"]
+
+    assert stored == {
+        "type": "Feature",
+        "properties": {
+            "place_id": "near",
+            "name": "near",
+            "categories": ["catering.cafe"],
+            "website": "https://example.org",
+            "datasource": {"raw": {"wikidata": "Q1"}},
+        },
+        "geometry": {"type": "Point", "coordinates": [12.5, 41.9]},
+    }
+
+
+@patch("app.tools.geoapify_client.transport.get")
+def test_raw_tile_responses_stay_out_of_the_shared_cache(mock_get):
+    rich = feature("near", 41.9000, 12.5000)
+    rich["properties"]["big"] = "x" * 1000
+    mock_get.return_value.ok = True
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = {"features": [rich]}
+    index = PlaceIndex(GeoapifyClient(api_key="test-key"), store=TieredCache(TTLCache()))
+
+    result = index.nearby("catering.cafe", 41.9001, 12.5001, radius=1000)
+
+    assert mock_get.called
+    assert "big" not in result["features"][0]["properties"]
+    assert len(get_shared_cache().memory) == 0
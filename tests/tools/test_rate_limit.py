@@ -0,0 +1,114 @@
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.tools import rate_limit
+from app.tools.geoapify_client import GeoapifyClient
+from app.tools.rate_limit import RateLimitExceeded, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_admits_burst_then_queues_callers_in_order():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=clock)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+    clock.now = 1.0
+    assert bucket.reserve() == pytest.approx(0.5)
+
+
+def test_bucket_rejects_reservations_past_the_deadline_without_booking():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=1, clock=clock)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve(max_wait=0.5) is None
+    assert bucket.reserve(max_wait=1.0) == pytest.approx(1.0)
+
+
+def test_drain_holds_back_callers():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=5, clock=clock)
+
+    bucket.drain(2.0)
+    assert bucket.reserve() == pytest.approx(3.0)
+
+
+def test_acquire_queues_instead_of_failing():
+    rate_limit.configure("geoapify", requests_per_sec=20, burst=1)
+
+    started = time.perf_counter()
+    for _ in range(3):
+        rate_limit.acquire("geoapify")
+    elapsed = time.perf_counter() - started
+
+    assert 0.08 <= elapsed < 1.0
+    usage = rate_limit.usage()["geoapify"]
+    assert usage["admitted"] == 3
+    assert usage["waited"] == 2
+
+
+def test_acquire_raises_when_deadline_cannot_be_met():
+    rate_limit.configure("geonames", requests_per_sec=0.1, burst=1)
+
+    rate_limit.acquire("geonames")
+    with pytest.raises(RateLimitExceeded):
+        rate_limit.acquire("geonames", max_wait=0.5)
+
+    assert rate_limit.usage()["geonames"]["rejected"] == 1
+
+
+def test_openai_token_budget_is_corrected_from_usage():
+    limiter = rate_limit.configure("openai", requests_per_sec=100, burst=100, tokens_per_min=6000)
+
+    rate_limit.acquire("openai", tokens=1000)
+    rate_limit.record_tokens("openai", 500)  # used 1500, not 1000
+
+    assert limiter.tokens.available() == pytest.approx(4500, abs=5)
+    assert rate_limit.usage()["openai"]["tokens_per_min"] == 6000
+
+
+def test_acquire_async_waits_for_its_turn():
+    rate_limit.configure("wikipedia", requests_per_sec=20, burst=1)
+
+    async def burst():
+        await asyncio.gather(*(rate_limit.acquire_async("wikipedia") for _ in range(3)))
+
+    started = time.perf_counter()
+    asyncio.run(burst())
+    assert time.perf_counter() - started >= 0.08
+
+
+def test_geoapify_429_throttles_and_retries_once():
+    rate_limit.configure("geoapify", requests_per_sec=100, burst=10)
+    limited = MagicMock(status_code=429, ok=False, headers={"Retry-After": "0.05"})
+    success = MagicMock(status_code=200, ok=True)
+    success.json.return_value = {"features": []}
+
+    with patch("app.tools.geoapify_client.transport.get", side_effect=[limited, success]) as get:
+        data = GeoapifyClient(api_key="k").geocode("Rome")
+
+    assert data == {"features": []}
+    assert get.call_count == 2
+    assert rate_limit.usage()["geoapify"]["throttled"] == 1
+
+
+def test_openai_token_budget_is_opt_in(monkeypatch):
+    assert rate_limit.get_limiter("openai").tokens is None
+
+    monkeypatch.setenv("NAVAN_RATE_OPENAI_TPM", "30000")
+    rate_limit.reset()
+    assert rate_limit.get_limiter("openai").tokens.capacity == 30000
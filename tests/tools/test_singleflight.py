@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.tools.singleflight import SingleFlight
+
+
+def test_concurrent_sync_calls_share_one_upstream_call():
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(2)
+        return {"city": "Rome"}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flights.do, "geocode:rome", fetch) for _ in range(8)]
+        time.sleep(0.05)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert all(r == {"city": "Rome"} for r in results)
+    assert flights.in_flight() == 0
+
+
+def test_sync_errors_reach_every_waiter():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(2)
+        raise RuntimeError("429")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(flights.do, "k", fail) for _ in range(3)]
+        time.sleep(0.05)
+        release.set()
+        for f in futures:
+            with pytest.raises(RuntimeError):
+                f.result()
+
+
+def test_async_calls_coalesce_and_survive_a_cancelled_waiter():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "summary"
+
+    async def main():
+        first = asyncio.ensure_future(flights.do_async("wikipedia:colosseum", fetch))
+        others = [asyncio.ensure_future(flights.do_async("wikipedia:colosseum", fetch)) for _ in range(4)]
+        await asyncio.sleep(0)
+        first.cancel()
+        return await asyncio.gather(*others)
+
+    assert asyncio.run(main()) == ["summary"] * 4
+    assert len(calls) == 1
+
+
+def test_async_upstream_is_cancelled_when_every_waiter_leaves():
+    flights = SingleFlight()
+    cancelled = []
+
+    async def fetch():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        waiter = asyncio.ensure_future(flights.do_async("k", fetch))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert cancelled == [True]
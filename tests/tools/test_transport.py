@@ -0,0 +1,58 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+
+from app.tools.transport import RETRY_STATUSES, HttpTransport
+
+
+def test_sessions_are_pooled_per_host():
+    transport = HttpTransport(pool_size=7, max_retries=2)
+
+    a = transport.session_for("https://api.geoapify.com/v1/geocode/search")
+    b = transport.session_for("https://api.geoapify.com/v2/places")
+    c = transport.session_for("https://en.wikipedia.org/api/rest_v1/page/summary/Rome")
+
+    assert a is b
+    assert a is not c
+
+    adapter = a.get_adapter("https://api.geoapify.com/")
+    assert adapter._pool_maxsize == 7
+    assert adapter.max_retries.total == 2
+    assert set(adapter.max_retries.status_forcelist) == set(RETRY_STATUSES)
+
+
+def test_default_timeout_is_applied():
+    transport = HttpTransport(timeout=3)
+
+    with patch("requests.Session.get") as mock_get:
+        transport.get("https://en.wikipedia.org/api/rest_v1/page/summary/Rome")
+
+    assert mock_get.call_args.kwargs["timeout"] == 3
+
+
+def test_async_get_retries_on_429():
+    responses = iter([
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(503),
+        httpx.Response(200, json={"ok": True}),
+    ])
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return next(responses)
+
+    transport = HttpTransport(
+        max_retries=3,
+        backoff_factor=0,
+        async_transport=httpx.MockTransport(handler),
+    )
+
+    async def run():
+        return await transport.get_async("https://api.geoapify.com/v2/places")
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert len(calls) == 3
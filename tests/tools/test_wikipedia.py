@@ -1,35 +1,142 @@
-import pytest
-from unittest.mock import patch
-from app.tools.wikipedia import get_wikipedia_summary
+import asyncio
 
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.tools import wikipedia
+from app.tools.wikipedia import get_wikipedia_summary, get_wikipedia_summary_async
 
-@patch("app.tools.wikipedia.requests.get")
-def test_wikipedia_success(mock_get):
-    mock_get.return_value.status_code = 200
-    mock_get.return_value.json.return_value = {
-        "title": "Colosseum",
-        "extract": "The Colosseum is an ancient amphitheatre in Rome.",
-        "content_urls": {
-            "desktop": {
-                "page": "https://en.wikipedia.org/wiki/Colosseum"
-            }
-        }
-    }
 
+def _query_response(url, params=None, **kwargs):
+    """
+    MediaWiki query stand-in: only "Colosseum" and "Colosseum (Rome)" exist,
+    and "Colosseum, Rome" redirects to the former.
+    """
+    assert url == wikipedia.WIKIPEDIA_QUERY_URL
+    titles = params["titles"].split("|")
+    existing = {"Colosseum", "Colosseum (Rome)"}
+    redirects = [{"from": "Colosseum, Rome", "to": "Colosseum"}] if "Colosseum, Rome" in titles else []
+    pages = [
+        {"title": t, "extract": f"{t} is an ancient amphitheatre.", "fullurl": "https://en.wikipedia.org/wiki/" + t}
+        if t in existing else {"title": t, "missing": True}
+        for t in {r["to"] for r in redirects} | (set(titles) - {r["from"] for r in redirects})
+    ]
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"query": {"redirects": redirects, "pages": pages}}
+    return response
+
+
+@patch("app.tools.wikipedia.transport.get", side_effect=_query_response)
+def test_wikipedia_success(mock_get):
     result = get_wikipedia_summary("Colosseum")
 
     assert result["found"] is True
     assert result["title"] == "Colosseum"
     assert "amphitheatre" in result["summary"]
+    assert result["url"] == "https://en.wikipedia.org/wiki/Colosseum"
     assert result["source"] == "wikipedia"
 
 
-@patch("app.tools.wikipedia.requests.get")
+@patch("app.tools.wikipedia.transport.get", side_effect=_query_response)
 def test_wikipedia_not_found(mock_get):
-    mock_get.return_value.status_code = 404
-
     result = get_wikipedia_summary("NonExistingPlace123")
 
     assert result["found"] is False
     assert result["summary"] is None
     assert result["source"] == "wikipedia"
+
+
+@patch("app.tools.wikipedia.transport.get", side_effect=_query_response)
+def test_wikipedia_summary_is_the_same_alone_or_with_other_candidates(mock_get):
+    alone = get_wikipedia_summary("Colosseum")
+    wikipedia.clear_cache()
+    with_city = get_wikipedia_summary("Colosseum", city="Paris")
+
+    assert alone == with_city
+    requests = [call.kwargs["params"] for call in mock_get.call_args_list]
+    assert [p["titles"].count("|") for p in requests] == [0, 3]
+    assert all(p["exsentences"] == str(wikipedia.SUMMARY_SENTENCES) for p in requests)
+
+
+@patch("app.tools.wikipedia.transport.get", side_effect=_query_response)
+def test_wikipedia_candidates_are_fetched_in_one_request(mock_get):
+    result = get_wikipedia_summary("Colosseum", city="Rome")
+
+    assert result["title"] == "Colosseum (Rome)"
+    assert result["url"] == "https://en.wikipedia.org/wiki/Colosseum (Rome)"
+    assert mock_get.call_count == 1
+    assert mock_get.call_args.kwargs["params"]["titles"] == (
+        "Colosseum (Rome)|Colosseum, Rome|Colosseum Rome|Colosseum"
+    )
+
+
+@patch("app.tools.wikipedia.transport.get_async", new_callable=AsyncMock)
+def test_wikipedia_async_falls_back_to_lower_ranked_candidates(mock_get):
+    mock_get.side_effect = _query_response
+
+    result = asyncio.run(get_wikipedia_summary_async("Pantheon", city="Rome"))
+    assert result["found"] is False
+
+    result = asyncio.run(get_wikipedia_summary_async("Colosseum", city="Paris"))
+    assert result["title"] == "Colosseum"
+    assert mock_get.await_count == 2
+
+
+@patch("app.tools.wikipedia.transport.get", side_effect=_query_response)
+def test_wikipedia_batch_follows_redirects(mock_get):
+    result = get_wikipedia_summary("Colosseum, Rome", city="Paris")
+
+    assert result["title"] == "Colosseum"
+    assert mock_get.call_count == 1
+
+
+@patch("app.tools.wikipedia.transport.get", side_effect=_query_response)
+def test_wikipedia_hits_and_misses_are_cached(mock_get):
+    get_wikipedia_summary("Colosseum", city="Rome")
+    get_wikipedia_summary("colosseum", city="Rome")
+
+    # First lookup: one batch; second lookup served from cache
+    assert mock_get.call_count == 1
+
+    get_wikipedia_summary("Pantheon", city="Rome")
+    get_wikipedia_summary("Pantheon", city="Rome")
+
+    # Known misses are not re-requested
+    assert mock_get.call_count == 2
+    assert wikipedia.cache_stats().hits == 5
+
+
+@patch("app.tools.wikipedia.transport.get")
+def test_wikipedia_batch_errors_are_not_cached(mock_get):
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = {"error": {"code": "maxlag"}}
+
+    assert get_wikipedia_summary("Colosseum", city="Rome")["found"] is False
+    get_wikipedia_summary("Colosseum", city="Rome")
+
+    assert mock_get.call_count == 2
+
+
+@patch("app.tools.wikipedia.transport.get")
+def test_wikipedia_transient_errors_are_not_cached(mock_get):
+    mock_get.return_value.status_code = 503
+
+    get_wikipedia_summary("Colosseum")
+    get_wikipedia_summary("Colosseum")
+
+    assert mock_get.call_count == 2
+
+
+@patch("app.tools.wikipedia.transport.get")
+def test_wikipedia_warm_cache_roundtrip(mock_get, tmp_path):
+    mock_get.side_effect = _query_response
+    get_wikipedia_summary("Colosseum")
+    path = tmp_path / "wikipedia.json"
+
+    assert wikipedia.export_cache(str(path)) == 1
+
+    wikipedia.clear_cache()
+    assert wikipedia.warm_cache(str(path)) == 1
+
+    result = get_wikipedia_summary("Colosseum")
+
+    assert result["found"] is True
+    assert mock_get.call_count == 1